@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare the cost per variant of finding the consequences of a variant
+
+The old approach searched the raw variant line for every SO term, the new
+approach does one pass over the consequence fields of the transcripts.
+
+Usage:
+    python benchmarks/consequences.py [VCF] [REPEATS]
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+from cyvcf2 import VCF
+
+from puzzle.models import Variant
+from puzzle.plugins import VcfPlugin
+from puzzle.utils import get_header
+from puzzle.utils.constants import (SO_TERMS, IMPACT_SEVERITIES, SEVERITY_DICT)
+
+
+def scan_so_terms(variant_obj, raw_variant_line):
+    """The old approach, kept here for comparison"""
+    variant_obj.consequences = [consequence for consequence in SO_TERMS
+                                if consequence in raw_variant_line]
+
+    most_severe_consequence = None
+    most_severe_score = None
+    for consequence in variant_obj.consequences:
+        severity_score = SEVERITY_DICT.get(consequence)
+        if severity_score != None:
+            if most_severe_score:
+                if severity_score < most_severe_score:
+                    most_severe_consequence = consequence
+                    most_severe_score = severity_score
+            else:
+                most_severe_consequence = consequence
+                most_severe_score = severity_score
+    variant_obj.most_severe_consequence = most_severe_consequence
+
+    if variant_obj.most_severe_consequence:
+        variant_obj.impact_severity = IMPACT_SEVERITIES.get(
+            variant_obj.most_severe_consequence)
+
+
+def get_records(plugin, vcf_file_path):
+    """Return the vcf records with their info dicts and transcripts"""
+    records = []
+    for variant in VCF(vcf_file_path):
+        info_dict = dict(variant.INFO)
+        variant_obj = Variant(CHROM=variant.CHROM, POS=variant.POS,
+                              ID=variant.ID, REF=variant.REF,
+                              ALT=variant.ALT[0], QUAL=variant.QUAL,
+                              FILTER=variant.FILTER)
+        plugin._add_transcripts(variant_obj, info_dict)
+        records.append((variant, info_dict, variant_obj))
+    return records
+
+
+def main(vcf_file_path='tests/fixtures/hapmap.vcf', repeats=20):
+    plugin = VcfPlugin()
+    plugin.head = get_header(vcf_file_path)
+    plugin.vep_header = plugin.head.vep_columns
+    plugin.snpeff_header = plugin.head.snpeff_columns
+
+    records = get_records(plugin, vcf_file_path)
+
+    def before():
+        for variant, info_dict, variant_obj in records:
+            # The raw line was created once for the consequences
+            scan_so_terms(variant_obj, str(variant))
+
+    def after():
+        for variant, info_dict, variant_obj in records:
+            plugin._add_consequences(variant_obj, info_dict)
+
+    nr_of_variants = len(records) * repeats
+    print("{0} variants from {1}".format(len(records), vcf_file_path))
+    for name, function in (('before', before), ('after', after)):
+        seconds = min(timeit.repeat(function, number=repeats, repeat=3))
+        print("{0:>8}: {1:8.2f} us/variant".format(
+            name, seconds / nr_of_variants * 1e6))
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    if len(arguments) > 1:
+        arguments[1] = int(arguments[1])
+    main(*arguments)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Measure the cost per variant of formatting vcf variants with logging at
+WARNING
+
+The debug messages in the variant formatting are wrapped in LazyFormat so
+that they are only formatted when they are logged. For comparison the
+messages are also formatted eagerly, like when str.format was called
+before logger.debug.
+
+Usage:
+    python benchmarks/debug_logging.py [VCF] [REPEATS]
+"""
+from __future__ import print_function
+
+import logging
+import sys
+import timeit
+
+from cyvcf2 import VCF
+
+import puzzle.log
+from puzzle.plugins import VcfPlugin
+from puzzle.utils import get_cases, get_header
+
+
+class EagerFormat(puzzle.log.LazyFormat):
+    """The old approach, format the message when it is created"""
+    __slots__ = ('message',)
+
+    def __init__(self, template, *args, **kwargs):
+        super(EagerFormat, self).__init__(template, *args, **kwargs)
+        self.message = template.format(*args, **kwargs)
+
+    def __str__(self):
+        return self.message
+
+
+def set_format(message_class):
+    """Use message_class for the debug messages in all puzzle modules"""
+    for name, module in list(sys.modules.items()):
+        if (name.startswith('puzzle') and module is not None and
+                getattr(module, 'LazyFormat', None) is not None):
+            module.LazyFormat = message_class
+
+
+def main(vcf_file_path='tests/fixtures/hapmap.vcf', repeats=20):
+    logging.basicConfig(level=logging.WARNING)
+
+    case_obj = get_cases(vcf_file_path)[0]
+    plugin = VcfPlugin()
+    plugin.add_case(case_obj)
+    plugin.head = get_header(vcf_file_path)
+    plugin.vep_header = plugin.head.vep_columns
+    plugin.snpeff_header = plugin.head.snpeff_columns
+
+    records = list(VCF(vcf_file_path))
+
+    def format_variants():
+        for index, variant in enumerate(records, 1):
+            plugin._format_variants(variant, index, case_obj)
+
+    nr_of_variants = len(records) * repeats
+    print("{0} variants from {1}".format(len(records), vcf_file_path))
+    for name, message_class in (('eager', EagerFormat),
+                                ('lazy', puzzle.log.LazyFormat)):
+        set_format(message_class)
+        seconds = min(timeit.repeat(format_variants, number=repeats,
+                                    repeat=3))
+        print("{0:>8}: {1:8.2f} us/variant".format(
+            name, seconds / nr_of_variants * 1e6))
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    if len(arguments) > 1:
+        arguments[1] = int(arguments[1])
+    main(*arguments)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare the time and memory used to build variant models
+
+Each variant gets three transcripts and three genotypes, like a variant
+from a trio. The old models, where every model was a DotDict that stored
+each key both in the dictionary and in __dict__, are kept here for
+comparison. Now transcripts and genotypes are slotted records. Each
+implementation runs in its own process so that the memory is measured
+separately.
+
+Usage:
+    python benchmarks/models.py [NR_OF_VARIANTS]
+"""
+from __future__ import print_function
+
+import logging
+import multiprocessing
+import resource
+import sys
+import time
+
+from puzzle.models import Variant, Transcript, Genotype
+
+logger = logging.getLogger(__name__)
+
+
+class OldDotDict(dict):
+    """The old approach, kept here for comparison"""
+    def __init__(self, *args, **kwargs):
+        super(OldDotDict, self).__init__(*args, **kwargs)
+        for arg in args:
+            if isinstance(arg, dict):
+                for key, value in arg.iteritems():
+                    self[key] = value
+
+        if kwargs:
+            for key, value in kwargs.iteritems():
+                self[key] = value
+
+    def __getattr__(self, attr):
+        return self.get(attr)
+
+    def __setattr__(self, key, value):
+        self.__setitem__(key, value)
+
+    def __setitem__(self, key, value):
+        super(OldDotDict, self).__setitem__(key, value)
+        self.__dict__.update({key: value})
+
+
+class OldVariant(OldDotDict):
+    def __init__(self, CHROM, POS, ID, REF, ALT, QUAL, FILTER):
+        super(OldVariant, self).__init__(CHROM=CHROM, POS=POS, ID=ID, REF=REF,
+                                         ALT=ALT, QUAL=QUAL, FILTER=FILTER)
+        variant_id = '_'.join([CHROM, str(POS), REF, ALT])
+        logger.debug("Updating variant id to {0}".format(variant_id))
+        self['variant_id'] = variant_id
+        for key in ('index', 'thousand_g', 'max_freq', 'cadd_score',
+                    'most_severe_consequence', 'rank_score', 'sv_type',
+                    'sv_len', 'stop_chrom', 'stop', 'cytoband_start',
+                    'cytoband_stop'):
+            self[key] = None
+        for key in ('consequences', 'impact_severities', 'frequencies',
+                    'severities', 'transcripts', 'individuals', 'genes',
+                    'gene_symbols', 'compounds', 'genetic_models'):
+            self[key] = []
+
+    def add_transcript(self, transcript):
+        logger.debug("Adding transcript {0} to variant {1}".format(
+            transcript, self['variant_id']))
+        self['transcripts'].append(transcript)
+
+    def add_individual(self, genotype):
+        logger.debug("Adding genotype {0} to variant {1}".format(
+            genotype, self['variant_id']))
+        self['individuals'].append(genotype)
+
+
+class OldTranscript(OldDotDict):
+    def __init__(self, **kwargs):
+        for key in ('ensembl_id', 'biotype', 'strand', 'sift', 'polyphen',
+                    'exon', 'HGVSc', 'HGVSp', 'GMAF', 'ExAC_MAF'):
+            kwargs.setdefault(key, None)
+        super(OldTranscript, self).__init__(**kwargs)
+
+
+class OldGenotype(OldDotDict):
+    def __init__(self, **kwargs):
+        for key in ('ref_depth', 'alt_depth', 'genotype_quality', 'depth'):
+            kwargs.setdefault(key, '.')
+        for key in ('supporting_evidence', 'pe_support', 'sr_support'):
+            kwargs.setdefault(key, '0')
+        kwargs.setdefault('case_id', None)
+        kwargs.setdefault('phenotype', None)
+        super(OldGenotype, self).__init__(**kwargs)
+
+
+def build_variants(nr_of_variants, variant_class, transcript_class,
+                   genotype_class):
+    """Build variants with transcripts and genotypes"""
+    variants = []
+    for index in range(nr_of_variants):
+        variant_obj = variant_class(CHROM='1', POS=index, ID='.', REF='A',
+                                    ALT='T', QUAL=100.0, FILTER='PASS')
+        variant_obj.index = index
+        for transcript_index in range(3):
+            variant_obj.add_transcript(transcript_class(
+                hgnc_symbol='ADK', transcript_id=str(transcript_index),
+                consequence='missense_variant'))
+        for sample_id in ('father', 'mother', 'child'):
+            variant_obj.add_individual(genotype_class(
+                sample_id=sample_id, genotype='0/1'))
+        variants.append(variant_obj)
+    return variants
+
+
+def measure(queue, nr_of_variants, classes):
+    """Build the variants and report the time and the memory used"""
+    start_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start_time = time.time()
+    variants = build_variants(nr_of_variants, *classes)
+    seconds = time.time() - start_time
+    memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_memory
+    queue.put((seconds, memory, len(variants)))
+
+
+def main(nr_of_variants=100000):
+    implementations = (
+        ('before', (OldVariant, OldTranscript, OldGenotype)),
+        ('after', (Variant, Transcript, Genotype)),
+    )
+    print("{0} variants with 3 transcripts and 3 genotypes".format(
+        nr_of_variants))
+    for name, classes in implementations:
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=measure, args=(queue, nr_of_variants, classes))
+        process.start()
+        seconds, memory, _ = queue.get()
+        process.join()
+        print("{0:>8}: {1:6.2f} s {2:8.2f} us/variant {3:8.1f} MB".format(
+            name, seconds, seconds / nr_of_variants * 1e6, memory / 1024.0))
+
+
+if __name__ == '__main__':
+    arguments = [int(argument) for argument in sys.argv[1:]]
+    main(*arguments)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Build synthetic variant sources of any size from a small template
+
+The records of the template are repeated until the wanted number of
+records is reached. The records of each contig are spread out with a fixed
+distance so that the file stays sorted and every variant gets a unique id.
+The contigs get as large a share of the records as they have in the
+template. The END of a structural variant is moved with its position.
+
+Usage:
+    python benchmarks/synthetic.py vcf NR_OF_RECORDS OUT_VCF [TEMPLATE_VCF]
+    python benchmarks/synthetic.py gemini NR_OF_RECORDS OUT_DB TEMPLATE_DB
+"""
+from __future__ import print_function
+
+import gzip
+import shutil
+import sqlite3
+import sys
+from collections import OrderedDict
+from contextlib import closing
+
+# The distance between two synthetic records on a contig
+STEP = 1000
+# The first position on each contig
+START = 10000
+
+TEMPLATE_VCF = 'tests/fixtures/hapmap.vcf'
+TEMPLATE_SV_VCF = 'tests/fixtures/hapmap.sv.vep.vcf.gz'
+
+
+def _open(file_path):
+    if file_path.endswith('.gz'):
+        return gzip.open(file_path, 'rb')
+    return open(file_path, 'r')
+
+
+def _spread(counts, nr_of_records):
+    """Return how many records each contig gets
+
+        Args:
+            counts (OrderedDict): The number of template records per contig
+            nr_of_records (int): The number of records to make
+
+        Returns:
+            shares (OrderedDict): The number of records per contig
+    """
+    total = sum(counts.values())
+    shares = OrderedDict(
+        (contig, nr_of_records * count // total)
+        for contig, count in counts.items())
+    # Give the records that are left after rounding to the first contigs
+    left = nr_of_records - sum(shares.values())
+    for contig in list(shares)[:left]:
+        shares[contig] += 1
+    return shares
+
+
+def _move_end(info, old_position, new_position):
+    """Move the END in an INFO field as far as the position is moved"""
+    entries = info.split(';')
+    for number, entry in enumerate(entries):
+        if entry.startswith('END='):
+            end = int(entry[4:]) - old_position + new_position
+            entries[number] = "END={0}".format(end)
+    return ';'.join(entries)
+
+
+def write_vcf(nr_of_records, out_path, template_path=TEMPLATE_VCF):
+    """Write a vcf with nr_of_records records made from a template vcf
+
+        Args:
+            nr_of_records (int): The number of records to write
+            out_path (str): Where to write the vcf
+            template_path (str): A sorted vcf
+    """
+    header = []
+    records = OrderedDict()
+    with _open(template_path) as handle:
+        for line in handle:
+            if line.startswith('#'):
+                header.append(line)
+                continue
+            fields = line.rstrip('\n').split('\t')
+            records.setdefault(fields[0], []).append(fields)
+
+    shares = _spread(OrderedDict((contig, len(contig_records)) for
+                                 contig, contig_records in records.items()),
+                     nr_of_records)
+    with open(out_path, 'w') as out_handle:
+        out_handle.writelines(header)
+        for contig, share in shares.items():
+            template = records[contig]
+            for number in range(share):
+                fields = list(template[number % len(template)])
+                position = START + number * STEP
+                fields[7] = _move_end(fields[7], int(fields[1]), position)
+                fields[1] = str(position)
+                fields[2] = '.'
+                out_handle.write('\t'.join(fields) + '\n')
+
+
+def write_gemini(nr_of_records, out_path, template_path):
+    """Write a gemini database with nr_of_records variants from a template
+
+        The template is copied and the rows of the variants and
+        variant_impacts tables are repeated with new variant ids and
+        positions.
+
+        Args:
+            nr_of_records (int): The number of variants to write
+            out_path (str): Where to write the database
+            template_path (str): A gemini database
+    """
+    shutil.copyfile(template_path, out_path)
+    with closing(sqlite3.connect(out_path)) as connection:
+        connection.row_factory = sqlite3.Row
+        variants = connection.execute(
+            "SELECT * FROM variants ORDER BY variant_id").fetchall()
+        impacts = {}
+        for impact in connection.execute("SELECT * FROM variant_impacts"):
+            impacts.setdefault(impact['variant_id'], []).append(impact)
+        connection.execute("DELETE FROM variants")
+        connection.execute("DELETE FROM variant_impacts")
+
+        by_contig = OrderedDict()
+        for variant in variants:
+            by_contig.setdefault(variant['chrom'], []).append(variant)
+        shares = _spread(OrderedDict((contig, len(contig_variants)) for
+                                     contig, contig_variants in
+                                     by_contig.items()), nr_of_records)
+
+        variant_columns = variants[0].keys()
+        variant_insert = "INSERT INTO variants ({0}) VALUES ({1})".format(
+            ', '.join(variant_columns), ', '.join('?' * len(variant_columns)))
+        variant_id = 0
+        for contig, share in shares.items():
+            template = by_contig[contig]
+            for number in range(share):
+                variant_id += 1
+                variant = dict(zip(variant_columns,
+                                   template[number % len(template)]))
+                template_id = variant['variant_id']
+                length = variant['end'] - variant['start']
+                variant['variant_id'] = variant_id
+                variant['start'] = START + number * STEP
+                variant['end'] = variant['start'] + length
+                connection.execute(variant_insert,
+                                   [variant[column] for column
+                                    in variant_columns])
+                for impact in impacts.get(template_id, []):
+                    impact = dict(zip(impact.keys(), impact))
+                    impact['variant_id'] = variant_id
+                    connection.execute(
+                        "INSERT INTO variant_impacts ({0}) VALUES ({1})"
+                        .format(', '.join(impact), ', '.join('?' * len(impact))),
+                        list(impact.values()))
+        connection.commit()
+
+
+def main(source_type, nr_of_records, out_path, template_path=None):
+    if source_type == 'gemini':
+        write_gemini(nr_of_records, out_path, template_path)
+    else:
+        write_vcf(nr_of_records, out_path, template_path or TEMPLATE_VCF)
+    print("Wrote {0} records to {1}".format(nr_of_records, out_path))
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    arguments[1] = int(arguments[1])
+    main(*arguments)
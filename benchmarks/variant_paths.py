@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Measure the vcf and gemini variant paths on synthetic sources
+
+For each size and template a synthetic source is built with
+benchmarks/synthetic.py. The synthetic vcfs are bgzipped with a tabix
+index, and the snv and the sv templates are both used by default, so that
+every filter of the vcf plugin is measured. The following is measured:
+
+    first_page      the first 30 variants without filters
+    deep_page       30 variants close to the end of the source
+    lookup          one variant in the middle, by id
+    format          the time to format one vcf record
+    filter_<name>   how many records per second a filter is applied to,
+                    for each filter that the plugin can use, the sv
+                    filters with the sv template
+
+The synthetic sources are kept in the data directory and reused. With
+--save the results are written as json, with --compare they are shown
+next to the results of an earlier run so that regressions stand out.
+
+Usage:
+    python benchmarks/variant_paths.py [--sizes 10000,100000,1000000]
+        [--templates VCF,SV_VCF] [--gemini TEMPLATE_DB] [--data-dir DIR]
+        [--save FILE] [--compare FILE]
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+from cyvcf2 import VCF
+
+from puzzle.plugins import VcfPlugin
+from puzzle.utils import get_cases, get_header, get_variant_type
+from puzzle.utils.tabix import bgzip_vcf, get_tabix_path
+
+from synthetic import write_gemini, write_vcf, TEMPLATE_VCF, TEMPLATE_SV_VCF
+
+try:
+    from puzzle.plugins import GeminiPlugin
+except ImportError:
+    GeminiPlugin = None
+
+SIZES = (10000, 100000, 1000000)
+PAGE_SIZE = 30
+DATA_DIR = os.path.join(tempfile.gettempdir(), 'puzzle-benchmarks')
+
+# The filter flag of the plugin, the name of the measure and the filters
+FILTERS = (
+    ('can_filter_gene', 'gene', {'gene_ids': ['TECTA', 'AR', 'ADK']}),
+    ('can_filter_frequency', 'frequency', {'frequency': 0.01}),
+    ('can_filter_cadd', 'cadd', {'cadd': 10}),
+    ('can_filter_consequence', 'consequence',
+     {'consequence': ['missense_variant']}),
+    ('can_filter_impact_severity', 'impact_severity',
+     {'impact_severities': ['HIGH']}),
+    ('can_filter_inheritance', 'inheritance', {'genetic_models': ['AR_hom']}),
+    ('can_filter_sv', 'sv_type', {'sv_types': ['DEL']}),
+    ('can_filter_sv_len', 'sv_len', {'sv_len': 1000}),
+    ('can_filter_range', 'range',
+     {'range': {'chromosome': '1', 'start': 1, 'end': 10000000}}),
+)
+SV_FILTERS = ('can_filter_sv', 'can_filter_sv_len')
+
+
+def best_of(function, repeat):
+    """Return the shortest time of repeat calls to function"""
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        times.append(time.time() - start)
+    return min(times)
+
+
+def get_filters(plugin):
+    """Yield the name and filters of the filters the plugin can use"""
+    for flag, name, filters in FILTERS:
+        if not plugin.filters.get(flag):
+            continue
+        if flag in SV_FILTERS and plugin.variant_type != 'sv':
+            continue
+        yield name, filters
+
+
+def measure_plugin(plugin, case_id, nr_of_records, repeat):
+    """Measure the variant paths of a plugin with one case
+
+        Returns:
+            results (dict): Seconds for the latencies and records per second
+                            for the filters
+    """
+    results = OrderedDict()
+    results['first_page'] = best_of(
+        lambda: plugin.variants(case_id, count=PAGE_SIZE), repeat)
+
+    deep_skip = max(nr_of_records - PAGE_SIZE, 0)
+    results['deep_page'] = best_of(
+        lambda: plugin.variants(case_id, skip=deep_skip, count=PAGE_SIZE),
+        repeat)
+
+    middle = plugin.variants(case_id, skip=nr_of_records // 2, count=1)
+    variant_id = middle.variants[0].variant_id
+    # The first lookup builds the variant index of a vcf
+    plugin.variant(case_id, variant_id)
+    results['lookup'] = best_of(lambda: plugin.variant(case_id, variant_id),
+                                repeat)
+
+    for name, filters in get_filters(plugin):
+        seconds = best_of(
+            lambda: sum(1 for _ in plugin.iter_variants(case_id,
+                                                        dict(filters))),
+            repeat)
+        results["filter_{0}".format(name)] = nr_of_records / seconds
+    return results
+
+
+def measure_format(vcf_file_path, case_obj, nr_of_records=1000):
+    """Return the seconds it takes to format one vcf record"""
+    plugin = VcfPlugin(case_obj.variant_type)
+    plugin.add_case(case_obj)
+    plugin.head = get_header(vcf_file_path)
+    plugin.vep_header = plugin.head.vep_columns
+    plugin.snpeff_header = plugin.head.snpeff_columns
+
+    records = []
+    for variant in VCF(vcf_file_path):
+        records.append(variant)
+        if len(records) == nr_of_records:
+            break
+
+    def format_records():
+        for index, variant in enumerate(records, 1):
+            plugin._format_variants(variant, index, case_obj)
+
+    return best_of(format_records, 3) / len(records)
+
+
+def get_template_name(template_path):
+    """Return the name of a template without its extensions"""
+    template_name = os.path.basename(template_path)
+    if template_name.endswith('.gz'):
+        template_name = template_name[:-3]
+    return os.path.splitext(template_name)[0]
+
+
+def measure_vcf(nr_of_records, data_dir, template_path, repeat):
+    vcf_file_path = os.path.join(data_dir, "{0}-{1}.vcf.gz".format(
+        get_template_name(template_path), nr_of_records))
+    if not get_tabix_path(vcf_file_path):
+        plain_path = vcf_file_path[:-3]
+        write_vcf(nr_of_records, plain_path, template_path)
+        bgzip_vcf(plain_path, vcf_file_path)
+        os.remove(plain_path)
+
+    variant_type = get_variant_type(vcf_file_path)
+    case_obj = get_cases(vcf_file_path, variant_type=variant_type)[0]
+    plugin = VcfPlugin(variant_type)
+    plugin.index_dir = data_dir
+    plugin.add_case(case_obj)
+
+    results = measure_plugin(plugin, case_obj.case_id, nr_of_records, repeat)
+    results['format'] = measure_format(vcf_file_path, case_obj)
+    return results
+
+
+def measure_gemini(nr_of_records, data_dir, template_path, repeat):
+    db_path = os.path.join(data_dir, "{0}-{1}.db".format(
+        get_template_name(template_path), nr_of_records))
+    if not os.path.exists(db_path):
+        write_gemini(nr_of_records, db_path, template_path)
+
+    variant_type = get_variant_type(db_path)
+    case_obj = get_cases(db_path, variant_type=variant_type,
+                         variant_mode='gemini')[0]
+    plugin = GeminiPlugin(variant_type)
+    plugin.add_case(case_obj)
+    return measure_plugin(plugin, case_obj.case_id, nr_of_records, repeat)
+
+
+def format_result(name, value):
+    """Return a measure with its unit"""
+    if name.startswith('filter_'):
+        return "{0:12.0f} records/s".format(value)
+    if name == 'format':
+        return "{0:12.1f} us/record".format(value * 1e6)
+    return "{0:12.2f} ms".format(value * 1e3)
+
+
+def print_results(results, baseline=None):
+    for key in results:
+        print(key)
+        for name in results[key]:
+            value = results[key][name]
+            line = "  {0:<24}{1}".format(name, format_result(name, value))
+            old_value = (baseline or {}).get(key, {}).get(name)
+            if old_value:
+                # Higher is better for throughput, lower for time
+                if name.startswith('filter_'):
+                    ratio = old_value / value
+                else:
+                    ratio = value / old_value
+                line += "  {0:6.2f}x the time of the baseline".format(ratio)
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                        help="Number of records, separated by commas")
+    parser.add_argument('--templates',
+                        default=','.join([TEMPLATE_VCF, TEMPLATE_SV_VCF]),
+                        help="The vcfs that the synthetic vcfs are made "
+                        "from, separated by commas")
+    parser.add_argument('--gemini',
+                        help="A gemini database to make synthetic databases "
+                        "from, gemini is skipped if not given")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help="Write the results to a json file")
+    parser.add_argument('--compare',
+                        help="Compare with the results in a json file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if not os.path.exists(args.data_dir):
+        os.makedirs(args.data_dir)
+
+    results = OrderedDict()
+    for nr_of_records in [int(size) for size in args.sizes.split(',')]:
+        # Scanning the large sources is slow, measure them once
+        repeat = args.repeat if nr_of_records < 100000 else 1
+        for template_path in args.templates.split(','):
+            results["vcf {0} {1}".format(
+                get_template_name(template_path), nr_of_records)] = (
+                    measure_vcf(nr_of_records, args.data_dir, template_path,
+                                repeat))
+        if args.gemini and GeminiPlugin is None:
+            print("gemini is not installed, skipping gemini")
+        elif args.gemini:
+            results["gemini {0}".format(nr_of_records)] = measure_gemini(
+                nr_of_records, args.data_dir, args.gemini, repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
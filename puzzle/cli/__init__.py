@@ -1,5 +1,5 @@
 from .utils import (version, family_file, family_type, verbose, root, 
- mode, variant_type, phenomizer)
+ mode, variant_type, phenomizer, tabix, index_cases)
 
 from .base import base
 from .init import init
@@ -7,4 +7,5 @@ from .delete import delete
 from .load import load
 from .individuals import individuals
 from .cases import cases
-from .view import view
\ No newline at end of file
+from .view import view
+from .export import export
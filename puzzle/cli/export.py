@@ -0,0 +1,188 @@
+import os
+import logging
+
+import click
+
+from . import (base, root)
+
+from puzzle.plugins import SqlStore, VcfPlugin
+try:
+    from puzzle.plugins import GeminiPlugin
+    GEMINI = True
+except ImportError:
+    GEMINI = False
+
+from puzzle.utils import (get_file_type, get_variant_type, get_cases)
+from puzzle.utils.serialize import (get_tsv_header, to_tsv_line,
+                                    get_vcf_header, to_vcf_line,
+                                    to_json_line)
+
+logger = logging.getLogger(__name__)
+
+
+def get_filters(gene_symbols=None, frequency=None, cadd=None, sv_len=None,
+                consequences=None, inheritance_models=None, sv_types=None,
+                gene_lists=None, impact_severities=None, gemini_query=None,
+                region=None):
+    """Return the filters for the plugins from the export options
+
+        The filters are the same as the ones that the variants view builds
+        with parse_filters.
+
+        Returns:
+            filters (dict): A dictionary with filters
+    """
+    genes = []
+    for gene_symbol in gene_symbols or []:
+        genes.extend(gene_symbol.split(','))
+
+    variant_range = None
+    if region:
+        chromosome, raw_pos = region.split(':')
+        start, end = map(int, raw_pos.split('-'))
+        variant_range = {'chromosome': chromosome, 'start': start,
+                         'end': end}
+
+    return {
+        'gene_ids': genes or None,
+        'frequency': frequency,
+        'cadd': cadd,
+        'sv_len': sv_len,
+        'consequence': list(consequences or []),
+        'genetic_models': list(inheritance_models or []),
+        'sv_types': list(sv_types or []),
+        'gene_lists': list(gene_lists or []),
+        'impact_severities': list(impact_severities or []),
+        'gemini_query': gemini_query,
+        'range': variant_range,
+    }
+
+
+def export_lines(variants, output_format):
+    """Yield the lines of an export
+
+        Args:
+            variants (iterable): The variants to export
+            output_format (str): 'tsv', 'vcf' or 'json'
+
+        Yields:
+            line (str)
+    """
+    if output_format == 'json':
+        for variant_obj in variants:
+            yield to_json_line(variant_obj)
+    elif output_format == 'vcf':
+        yield get_vcf_header()
+        for variant_obj in variants:
+            yield to_vcf_line(variant_obj)
+    else:
+        yield get_tsv_header()
+        for variant_obj in variants:
+            yield to_tsv_line(variant_obj)
+
+
+@base.command()
+@click.argument('variant-source', type=click.Path(exists=True),
+                required=False)
+@click.option('-c', '--case-id',
+    help="Case to export, the first case of the variant source if not given"
+)
+@click.option('-o', '--outfile',
+    type=click.File('w'),
+    default='-',
+    help="Where to write the variants, stdout if not given"
+)
+@click.option('--format', 'output_format',
+    type=click.Choice(['tsv', 'vcf', 'json']),
+    default='tsv',
+    show_default=True
+)
+@click.option('-g', '--gene-symbol', multiple=True)
+@click.option('--frequency', type=float,
+    help="Highest population frequency"
+)
+@click.option('--cadd', type=float, help="Lowest CADD score")
+@click.option('--sv-len', type=float,
+    help="Shortest structural variant"
+)
+@click.option('--consequence', multiple=True)
+@click.option('--inheritance-model', multiple=True)
+@click.option('--sv-type', multiple=True)
+@click.option('--gene-list', multiple=True,
+    help="Id of a gene list in the database"
+)
+@click.option('--impact-severity', multiple=True)
+@click.option('--gemini-query')
+@click.option('--region', help="A region like 1:1000-2000")
+@click.option('--processes', type=int,
+    help="Filter the regions of tabix indexed vcfs in parallel"
+)
+@root
+@click.pass_context
+def export(ctx, variant_source, case_id, outfile, output_format, gene_symbol,
+           frequency, cadd, sv_len, consequence, inheritance_model, sv_type,
+           gene_list, impact_severity, gemini_query, region, processes, root):
+    """
+    Export the variants that follows the filters.
+
+    The variants are written as they are read, so an export of any size
+    uses little memory. With --processes a few regions per process are
+    filtered ahead of the writer and held in memory.
+
+    If no variant source is given the case is read from the database.
+    """
+    filters = get_filters(
+        gene_symbols=gene_symbol, frequency=frequency, cadd=cadd,
+        sv_len=sv_len, consequences=consequence,
+        inheritance_models=inheritance_model, sv_types=sv_type,
+        gene_lists=gene_list, impact_severities=impact_severity,
+        gemini_query=gemini_query, region=region
+    )
+
+    if variant_source is None:
+        root = root or ctx.obj.get('root') or os.path.expanduser("~/.puzzle")
+        db_path = os.path.join(root, 'puzzle_db.sqlite3')
+        logger.info("db path is: {}".format(db_path))
+        if not os.path.exists(db_path):
+            logger.warn("database not initialized, run 'puzzle init'")
+            ctx.abort()
+        if not case_id:
+            logger.error("A case id is needed to export from the database")
+            ctx.abort()
+
+        adapter = SqlStore(db_path, processes=processes)
+    else:
+        if gene_list:
+            logger.error("Gene lists can only be used with the database")
+            ctx.abort()
+
+        mode = get_file_type(variant_source)
+        if mode == 'unknown':
+            logger.error("File has to be vcf or gemini db")
+            ctx.abort()
+
+        variant_type = get_variant_type(variant_source)
+        if mode == 'gemini':
+            if not GEMINI:
+                logger.error("Need to have gemini installed to use gemini "
+                             "plugin")
+                ctx.abort()
+            adapter = GeminiPlugin(variant_type)
+        else:
+            adapter = VcfPlugin(variant_type, processes=processes)
+
+        for case_obj in get_cases(variant_source, variant_type=variant_type,
+                                  variant_mode=mode):
+            adapter.add_case(case_obj)
+        case_id = case_id or adapter.cases()[0].case_id
+
+    case_obj = adapter.case(case_id)
+    if case_obj is None:
+        logger.error("Case {0} not found".format(case_id))
+        ctx.abort()
+
+    logger.info("Export variants of {0} as {1}".format(case_id,
+                                                       output_format))
+    variants = adapter.iter_variants(case_id, filters)
+    for line in export_lines(variants, output_format):
+        outfile.write(line)
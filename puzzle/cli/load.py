@@ -3,7 +3,7 @@ import os
 import logging
 import click
 
-from . import (base, root, family_file, family_type)
+from . import (base, root, family_file, family_type, tabix, index_cases)
 
 from puzzle.plugins import SqlStore
 
@@ -13,7 +13,8 @@ try:
 except ImportError:
     GEMINI=False
 
-from puzzle.utils import (get_file_type, get_variant_type, get_cases)
+from puzzle.utils import (get_file_type, get_variant_type, get_cases,
+                          build_variant_index, get_index_path)
 
 from sqlite3 import DatabaseError
 
@@ -25,9 +26,15 @@ logger = logging.getLogger(__name__)
 )
 @family_file
 @family_type
+@click.option('--index',
+    is_flag=True,
+    help="Build the variant index and the sidecar for a vcf. The sidecar"\
+    " is used to filter variants without reading the vcf"
+)
+@tabix
 @root
 @click.pass_context
-def load(ctx, variant_source, family_file, family_type, root):
+def load(ctx, variant_source, family_file, family_type, index, tabix, root):
     """
     Load a variant source into the database.
 
@@ -35,6 +42,9 @@ def load(ctx, variant_source, family_file, family_type, root):
 
     1. VCF: If a vcf file is used it can be loaded with a ped file
     2. GEMINI: Ped information will be retreived from the gemini db
+
+    With --tabix a vcf without a tabix index is bgzipped and indexed into
+    the root directory and the cases use the indexed copy.
     """
     root = root or ctx.obj.get('root') or os.path.expanduser("~/.puzzle")
 
@@ -84,6 +94,9 @@ def load(ctx, variant_source, family_file, family_type, root):
         logger.warning("No cases found")
         ctx.abort()
 
+    if tabix:
+        index_cases(cases, root)
+
     logger.info("Initializing sqlite plugin")
     store = SqlStore(db_path)
 
@@ -95,3 +108,12 @@ def load(ctx, variant_source, family_file, family_type, root):
         # extract case information
         logger.debug("adding case: {} to puzzle db".format(case_obj.case_id))
         store.add_case(case_obj, vtype=variant_type, mode=mode)
+
+    if index and mode == 'vcf':
+        # The cases use the indexed copy of the vcf with --tabix
+        variant_source = cases[0].variant_source
+        index_path = get_index_path(variant_source, index_dir=store.index_dir)
+        build_variant_index(variant_source, index_path)
+
+        plugin, case_id = store.select_plugin(cases[0])
+        plugin.build_sidecar(variant_source)
@@ -1,6 +1,13 @@
+import logging
+import os
+
 import click
 import puzzle
 
+from puzzle.utils import get_indexed_vcf
+
+logger = logging.getLogger(__name__)
+
 root = click.option('--root', '-r',
                         type=click.Path(),
                         help="Path to where to find variant source(s)"
@@ -39,4 +46,41 @@ phenomizer = click.option('--phenomizer',
                 nargs=2, 
                 help='Phenomizer username/password',
                 envvar='PHENOMIZER_AUTH'
-                )
\ No newline at end of file
+                )
+
+tabix = click.option('--tabix',
+                is_flag=True,
+                help="Bgzip and tabix index vcfs into the root directory, "\
+                "regions and genes are then read with region queries"
+                )
+
+
+def index_cases(cases, root):
+    """Use tabix indexed copies of the vcfs of cases
+
+        The vcfs that are not tabix indexed are bgzipped and indexed into
+        the vcfs directory of the root, and the cases and their individuals
+        are pointed to the copies.
+
+        Args:
+            cases (iterable): Case objects, from get_cases or the database
+            root (str): The puzzle root directory
+    """
+    out_dir = os.path.join(root, 'vcfs')
+    for case_obj in cases:
+        if case_obj.variant_mode != 'vcf' or case_obj.tabix_index:
+            continue
+        try:
+            indexed_path = get_indexed_vcf(case_obj.variant_source, out_dir)
+        except (IOError, ValueError) as error:
+            logger.warning("Could not index {0}: {1}".format(
+                case_obj.variant_source, error))
+            continue
+
+        logger.info("Case {0} uses {1}".format(case_obj.case_id,
+                                               indexed_path))
+        case_obj.variant_source = indexed_path
+        case_obj.compressed = True
+        case_obj.tabix_index = True
+        for individual in case_obj.individuals:
+            individual.variant_source = indexed_path
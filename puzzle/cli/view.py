@@ -8,7 +8,8 @@ import logging
 
 from path import path
 
-from . import (base, family_file, family_type, version, root, phenomizer)
+from . import (base, family_file, family_type, version, root, phenomizer,
+               tabix, index_cases)
 
 from puzzle.plugins import SqlStore, VcfPlugin
 try:
@@ -33,6 +34,14 @@ logger = logging.getLogger(__name__)
 @click.option('--debug', is_flag=True)
 @click.option('-p', '--pattern', default='*', show_default=True)
 @click.option('--no-browser', is_flag=True, help='Prevent auto-opening browser')
+@click.option('--processes', type=int,
+              help='Filter the contigs of tabix indexed vcfs in parallel')
+@click.option('--instrument', is_flag=True,
+              help='Add Server-Timing headers and serve /debug/stats')
+@click.option('--profile-dir', type=click.Path(),
+              help='Dump a cProfile of each request here, implies '
+                   '--instrument')
+@tabix
 @phenomizer
 @family_file
 @family_type
@@ -40,7 +49,8 @@ logger = logging.getLogger(__name__)
 @root
 @click.pass_context
 def view(ctx, host, port, debug, pattern, family_file, family_type,
-         variant_source, root, no_browser, phenomizer):
+         variant_source, root, no_browser, phenomizer, processes, instrument,
+         profile_dir, tabix):
     """Visualize DNA variant resources.
 
     1. Look for variant source(s) to visualize and inst. the right plugin
@@ -64,20 +74,26 @@ def view(ctx, host, port, debug, pattern, family_file, family_type,
             logger.error("'root' can't be a file")
             ctx.abort()
 
-        store = SqlStore(db_path, phenomizer_auth=phenomizer_auth)
+        store = SqlStore(db_path, phenomizer_auth=phenomizer_auth,
+                         processes=processes)
         for case_obj in store.cases():
             if case_obj.variant_mode == 'gemini':
                 if not GEMINI:
                     logger.error("Need to have gemini instaled to view gemini database")
                     ctx.abort()
 
+        if tabix and main_loop:
+            index_cases(store.cases(), root)
+            store.save()
+
     else:
         logger.info("Using in memory database")
         tmpdir = tempfile.mkdtemp()
         tmpdb = os.path.join(tmpdir, 'puzzle.sqlite3')
         logger.info("building database: {}".format(tmpdb))
         store = SqlStore("sqlite:///{}".format(tmpdb),
-                         phenomizer_auth=phenomizer_auth)
+                         phenomizer_auth=phenomizer_auth,
+                         processes=processes)
         if main_loop:
             store.set_up()
             cases = []
@@ -119,6 +135,9 @@ def view(ctx, host, port, debug, pattern, family_file, family_type,
 
                             cases.append(case)
 
+            if tabix:
+                index_cases(cases, root)
+
             for case_obj in cases:
                 if store.case(case_obj.case_id) is not None:
                     logger.warn("{} already exists in the database"
@@ -132,6 +151,8 @@ def view(ctx, host, port, debug, pattern, family_file, family_type,
     logger.debug("Plugin setup was succesfull")
     BaseConfig.PUZZLE_BACKEND = store
     BaseConfig.UPLOAD_DIR = os.path.join(root, 'resources')
+    BaseConfig.INSTRUMENTATION = instrument or bool(profile_dir)
+    BaseConfig.PROFILE_DIR = profile_dir
 
     app = create_app(config_obj=BaseConfig)
 
@@ -29,3 +29,23 @@ def configure_stream(level='WARNING'):
 
     root_logger.addHandler(console)
     return root_logger
+
+
+class LazyFormat(object):
+    """A log message that is formatted with str.format when it is emitted
+
+    Use it for debug messages in code that runs once per variant, the
+    arguments are not formatted unless the message is logged.
+
+    Example:
+        logger.debug(LazyFormat("Adding transcript {0}", transcript))
+    """
+    __slots__ = ('template', 'args', 'kwargs')
+
+    def __init__(self, template, *args, **kwargs):
+        self.template = template
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return self.template.format(*self.args, **self.kwargs)
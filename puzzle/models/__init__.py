@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from .dotdict import DotDict
+from .record import Record
 from .mixins import PedigreeHumanMixin
 from .individual import Individual
 from .case import Case
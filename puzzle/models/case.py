@@ -4,6 +4,8 @@ from .dotdict import DotDict
 
 class Case(DotDict):
     """Case representation."""
+    __slots__ = ()
+
     def __init__(self, case_id, name=None, variant_source=None,
                  variant_type='snv', variant_mode='vcf', compressed=False,
                  tabix_index=False):
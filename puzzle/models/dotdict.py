@@ -2,34 +2,24 @@
 
 
 class DotDict(dict):
-    """
+    """A dictionary where the keys can be read and set as attributes
+
+    The values are only stored in the dictionary. Subclasses should set
+    ``__slots__ = ()`` so that the instances do not get a ``__dict__``.
+
     Example:
     test = DotDict(last_name='Pool', age=24, sports=['Soccer'])
     """
-    def __init__(self, *args, **kwargs):
-        super(DotDict, self).__init__(*args, **kwargs)
-        for arg in args:
-            if isinstance(arg, dict):
-                for key, value in arg.iteritems():
-                    self[key] = value
-
-        if kwargs:
-            for key, value in kwargs.iteritems():
-                self[key] = value
+    __slots__ = ()
 
     def __getattr__(self, attr):
+        # Special names are looked up by pickle and copy, they are not keys
+        if attr.startswith('__'):
+            raise AttributeError(attr)
         return self.get(attr)
 
     def __setattr__(self, key, value):
-        self.__setitem__(key, value)
-
-    def __setitem__(self, key, value):
-        super(DotDict, self).__setitem__(key, value)
-        self.__dict__.update({key: value})
+        self[key] = value
 
     def __delattr__(self, item):
-        self.__delitem__(item)
-
-    def __delitem__(self, key):
-        super(DotDict, self).__delitem__(key)
-        del self.__dict__[key]
+        del self[item]
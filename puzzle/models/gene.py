@@ -9,6 +9,8 @@ logger = logging.getLogger(__name__)
 
 class Gene(DotDict):
     """Class that holds information about a Gene"""
+    __slots__ = ()
+
     def __init__(self, symbol, omim_number=None, ensembl_id=None, 
                 description=None, chrom=None, start=None, stop=None,
                 location=None, hi_score=None, constraint_score=None,
@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 import logging
 
-from . import (DotDict, PedigreeHumanMixin)
+from . import (Record, PedigreeHumanMixin)
 
 logger = logging.getLogger(__name__)
 
-class Genotype(DotDict, PedigreeHumanMixin):
+class Genotype(Record, PedigreeHumanMixin):
     """Class that holds information about a genotype call"""
+    __slots__ = ('sample_id', 'genotype', 'case_id', 'phenotype', 'ref_depth',
+                 'alt_depth', 'depth', 'genotype_quality',
+                 'supporting_evidence', 'pe_support', 'sr_support')
+
     def __init__(self, sample_id, genotype, case_id=None, phenotype=None,
                 ref_depth='.', alt_depth='.', genotype_quality='.', depth='.',
                 supporting_evidence='0', pe_support='0', sr_support='0'):
@@ -5,6 +5,8 @@ from .dotdict import DotDict
 
 class Individual(DotDict, PedigreeHumanMixin):
     """Individual representation."""
+    __slots__ = ()
+
     def __init__(self, ind_id, case_id=None, mother=None,
                  father=None, sex=None, phenotype=None, ind_index=None,
                  variant_source=None, bam_path=None):
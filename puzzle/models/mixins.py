@@ -2,6 +2,8 @@
 
 
 class PedigreeHumanMixin(object):
+    __slots__ = ()
+
     @property
     def sex_human(self):
         """Return a human readable string for the sex."""
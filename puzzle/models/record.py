@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+
+class Record(object):
+    """A compact model with a fixed set of fields
+
+    The values are stored in slots, so a record does not carry a
+    dictionary. Records can be read like a DotDict, with attributes, keys
+    and ``get``, which is what the templates use. Fields that are not
+    declared can not be set.
+
+    Subclasses list their fields in ``__slots__``.
+
+    Example:
+    class Point(Record):
+        __slots__ = ('x', 'y')
+    """
+    __slots__ = ()
+
+    def __init__(self, **kwargs):
+        for field in self.__slots__:
+            setattr(self, field, kwargs.pop(field, None))
+        if kwargs:
+            raise TypeError("Unknown fields for {0}: {1}".format(
+                type(self).__name__, ', '.join(sorted(kwargs))))
+
+    def __getattr__(self, attr):
+        # Only called for names that are not fields, like DotDict
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return None
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def get(self, key, default=None):
+        """Return the value of a field, default if there is no such field"""
+        if key in self.__slots__:
+            return getattr(self, key)
+        return default
+
+    def keys(self):
+        return list(self.__slots__)
+
+    def values(self):
+        return [getattr(self, field) for field in self.__slots__]
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in self.__slots__]
+
+    def to_dict(self):
+        """Return the fields as a dictionary"""
+        return dict(self.items())
+
+    def __repr__(self):
+        return "{0}({1})".format(type(self).__name__, ', '.join(
+            "{0}={1!r}".format(field, value) for field, value in self.items()))
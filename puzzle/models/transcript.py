@@ -1,13 +1,17 @@
 # -*- coding: utf-8 -*-
 import logging
 
-from .dotdict import DotDict
+from .record import Record
 
 logger = logging.getLogger(__name__)
 
 
-class Transcript(DotDict):
+class Transcript(Record):
     """Class that holds information about a transcript"""
+    __slots__ = ('hgnc_symbol', 'transcript_id', 'consequence', 'ensembl_id',
+                 'biotype', 'strand', 'sift', 'polyphen', 'exon', 'HGVSc',
+                 'HGVSp', 'GMAF', 'ExAC_MAF')
+
     def __init__(self, hgnc_symbol, transcript_id, consequence, ensembl_id=None, biotype=None, 
                 strand=None, sift=None, polyphen=None, exon=None, HGVSc=None, 
                 HGVSp=None, GMAF=None, ExAC_MAF=None):
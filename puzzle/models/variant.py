@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 import logging
 import hashlib
+
+from puzzle.log import LazyFormat
 from . import (DotDict, Transcript, Gene, Compound, Genotype)
 
 logger = logging.getLogger(__name__)
@@ -8,37 +10,40 @@ logger = logging.getLogger(__name__)
 
 class Variant(DotDict):
     """docstring for Variant"""
+    __slots__ = ()
+
     def __init__(self, CHROM, POS, ID, REF, ALT, QUAL, FILTER):
-        super(Variant, self).__init__(CHROM=CHROM, POS=POS, ID=ID, REF=REF,
-                                      ALT=ALT, QUAL=QUAL, FILTER=FILTER)
+        # All keys are set with one update, DotDict does not override
+        # __setitem__
+        super(Variant, self).__init__(
+            CHROM=CHROM, POS=POS, ID=ID, REF=REF, ALT=ALT, QUAL=QUAL,
+            FILTER=FILTER,
+            index=None,
+            thousand_g=None,  # float
+            max_freq=None,  # float
+            cadd_score=None,  # float
+            consequences=[],
+            most_severe_consequence=None,  # str
+            impact_severities=[],  # List of severities
+            rank_score=None,  # float
+            frequencies=[],
+            severities=[],
+            transcripts=[],  # List of Transcripts
+            individuals=[],  # List of Genotypes
+            genes=[],  # List of Genes
+            gene_symbols=[],  # List of gene symbols
+            compounds=[],  # List of Compounds
+            genetic_models=[],  # List of genetic models followed
+            #SV specific fields:
+            sv_type=None,
+            sv_len=None,
+            stop_chrom=None,
+            stop=None,
+            cytoband_start=None,
+            cytoband_stop=None,
+        )
 
         self._set_variant_id()
-        self['index'] = None
-
-        self['thousand_g'] = None  # float
-        self['max_freq'] = None  # float
-        self['cadd_score'] = None  # float
-        self['consequences'] = []
-        self['most_severe_consequence'] = None  # str
-        self['impact_severities'] = []  # List of severities
-        self['rank_score'] = None  # float
-
-        self['frequencies'] = []
-        self['severities'] = []
-        self['transcripts'] = []  # List of Transcripts
-        self['individuals'] = []  # List of Genotypes
-        self['genes'] = []  # List of Genes
-        self['gene_symbols'] = []  # List of gene symbols
-        self['compounds'] = []  # List of Compounds
-        self['genetic_models'] = []  # List of genetic models followed
-        #SV specific fields:
-        self['sv_type'] = None
-        self['sv_len'] = None
-        self['stop_chrom'] = None
-        self['stop'] = None
-        self['cytoband_start'] = None
-        self['cytoband_stop'] = None
-        self['consequences'] = []
 
     @property
     def nr_genes(self):
@@ -84,7 +89,8 @@ class Variant(DotDict):
             Args:
                 name (str): The name of the frequency field
         """
-        logger.debug("Adding frequency {0} with value {1} to variant {2}".format(
+        logger.debug(LazyFormat(
+            "Adding frequency {0} with value {1} to variant {2}",
             name, value, self['variant_id']))
         self['frequencies'].append({'label': name, 'value': value})
 
@@ -115,7 +121,8 @@ class Variant(DotDict):
                 name (str): The name of the severity
                 value : The value of the severity
         """
-        logger.debug("Adding severity {0} with value {1} to variant {2}".format(
+        logger.debug(LazyFormat(
+            "Adding severity {0} with value {1} to variant {2}",
             name, value, self['variant_id']))
         self['severities'].append({name: value})
 
@@ -127,7 +134,7 @@ class Variant(DotDict):
             Args:
                 genotype (dict): A genotype dictionary
         """
-        logger.debug("Adding genotype {0} to variant {1}".format(
+        logger.debug(LazyFormat("Adding genotype {0} to variant {1}",
             genotype, self['variant_id']))
         self['individuals'].append(genotype)
 
@@ -139,7 +146,7 @@ class Variant(DotDict):
             Args:
                 transcript (dict): A transcript dictionary
         """
-        logger.debug("Adding transcript {0} to variant {1}".format(
+        logger.debug(LazyFormat("Adding transcript {0} to variant {1}",
             transcript, self['variant_id']))
         self['transcripts'].append(transcript)
 
@@ -152,7 +159,7 @@ class Variant(DotDict):
                 gene (dict): A gene dictionary
 
         """
-        logger.debug("Adding gene {0} to variant {1}".format(
+        logger.debug(LazyFormat("Adding gene {0} to variant {1}",
             gene, self['variant_id']))
         self['genes'].append(gene)
 
@@ -165,7 +172,7 @@ class Variant(DotDict):
                 compound (dict): A compound dictionary
 
         """
-        logger.debug("Adding compound {0} to variant {1}".format(
+        logger.debug(LazyFormat("Adding compound {0} to variant {1}",
             compound, self['variant_id']))
         self['compounds'].append(compound)
 
@@ -188,7 +195,7 @@ class Variant(DotDict):
                 self.ALT
                 ])
 
-        logger.debug("Updating variant id to {0}".format(
+        logger.debug(LazyFormat("Updating variant id to {0}",
             variant_id))
 
         self['variant_id'] = variant_id
@@ -1,11 +1,16 @@
+import functools
+import os
+
 from puzzle.utils import (get_gene_info, get_cytoband_coord)
+from puzzle.utils.counter import VARIANT_COUNTS, get_filter_signature
+from puzzle.utils.get_file_info import get_file_fingerprint
 
 
 class BaseVariantMixin(object):
     """Base class for variant mixins"""
     
-    def variants(self, case_id, skip=0, count=30, filters=None):
-        """Return a results tuple with variants and nr_of_variants.
+    def variants(self, case_id, skip=0, count=30, filters=None, cursor=None):
+        """Return a results tuple with variants, nr_of_variants and cursor.
 
         """
         raise NotImplementedError
@@ -13,6 +18,102 @@ class BaseVariantMixin(object):
     def variant(self, variant_id):
         """Return a specific variant."""
         raise NotImplementedError
+
+    def cached_variants(self, case_id, filters=None, skip=0, count=1000,
+                        cursor=None):
+        """Return a page of variants from a kept result of the filters
+
+        Plugins that keep the results of the filters they have counted
+        can read a page without filtering the variants again.
+
+        Args:
+            case_id (str): A case id
+            filters (dict): A dictionary with filters
+            skip (int): Skip first variants
+            count (int): The number of variants to return
+            cursor (str): Cursor from a previous result
+
+        Returns:
+            puzzle.constants.Results: None if the result is not kept
+        """
+        return None
+
+    def iter_variants(self, case_id, filters=None, page_size=1000):
+        """Yield the variants that follows the filters
+
+        The variants are read page by page, so only one page is kept in
+        memory. Plugins that can read the variants one by one should
+        override this.
+
+        Args:
+            case_id (str): A case id
+            filters (dict): A dictionary with filters
+            page_size (int): The number of variants to read at a time
+
+        Yields:
+            variant_obj (puzzle.models.Variant)
+        """
+        skip = 0
+        cursor = None
+        while True:
+            result = self.variants(case_id, skip=skip, count=page_size,
+                                   filters=dict(filters or {}), cursor=cursor)
+            for variant_obj in result.variants:
+                yield variant_obj
+            skip += len(result.variants)
+            cursor = result.cursor
+            if len(result.variants) < page_size:
+                return
+
+    def count_variants(self, case_id, filters=None, page_size=1000):
+        """Return the number of variants that follows the filters
+
+        The variants are read page by page, plugins that can count faster
+        should override this.
+
+        Args:
+            case_id (str): A case id
+            filters (dict): A dictionary with filters
+            page_size (int): The number of variants to read at a time
+
+        Returns:
+            nr_of_variants (int)
+        """
+        return sum(1 for _ in self.iter_variants(case_id, filters,
+                                                 page_size=page_size))
+
+    def variant_count(self, case_id, filters=None):
+        """Return the exact number of variants if it is known
+
+        If the variants of the case and filters have not been counted the
+        count is started on a worker thread, and the number can be fetched
+        again later.
+
+        Args:
+            case_id (str): A case id
+            filters (dict): A dictionary with filters
+
+        Returns:
+            nr_of_variants (int): The number of variants or None if the
+                                  count is not ready
+        """
+        filters = dict(filters or {})
+        key = self._count_key(case_id, filters)
+        nr_of_variants = VARIANT_COUNTS.get(key)
+        if nr_of_variants is None:
+            VARIANT_COUNTS.submit(key, functools.partial(
+                self.count_variants, case_id, filters))
+        return nr_of_variants
+
+    def _count_key(self, case_id, filters):
+        """Return the key of a count or a cached result, it changes when
+        the variant source is modified"""
+        variant_source = self.case(case_id).variant_source
+        fingerprint = None
+        if variant_source and os.path.exists(variant_source):
+            fingerprint = get_file_fingerprint(variant_source)
+        return (type(self).__name__, self.variant_type, case_id,
+                variant_source, fingerprint, get_filter_signature(filters))
     
     def _get_genes(self, variant):
         """Add the genes for a variant
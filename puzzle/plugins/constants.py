@@ -1,2 +1,4 @@
 from collections import namedtuple
-Results = namedtuple('Results', 'variants nr_of_variants')
\ No newline at end of file
+Results = namedtuple('Results', 'variants nr_of_variants cursor')
+# Plugins that can not continue a previous scan return results without cursor
+Results.__new__.__defaults__ = (None,)
@@ -1,18 +1,27 @@
+import itertools
 import logging
 
+import numpy as np
+
 from gemini import GeminiQuery
 
+from puzzle.log import LazyFormat
 from puzzle.plugins import BaseVariantMixin
 from puzzle.plugins.constants import Results
 
 from puzzle.models import (Compound, Variant, Gene, Genotype, Transcript,)
 from puzzle.utils import (get_most_severe_consequence, get_omim_number,
-                          get_cytoband_coord)
+                          get_cytoband_coord, get_gene_symbols_batch)
+from puzzle.utils.cursor import (encode_cursor, decode_cursor)
+from puzzle.utils.timing import span
 
 from . import VariantExtras
 
 logger = logging.getLogger(__name__)
 
+# The gemini genotype types for heterozygous and homozygous alternative calls
+VARIANT_GT_TYPES = (1, 3)
+
 class VariantMixin(BaseVariantMixin, VariantExtras):
     """Class to store variant specific functions for gemini plugin"""
 
@@ -32,7 +41,7 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
         else:
             return "{0} WHERE {1}".format(query, extra_info)
 
-    def variants(self, case_id, skip=0, count=1000, filters=None):
+    def variants(self, case_id, skip=0, count=1000, filters=None, cursor=None):
         """Return count variants for a case.
 
         This function needs to have different behaviours based on what is asked
@@ -43,6 +52,10 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
         So the minimal case is to just show what is asked for in the variants
         interface.
 
+        All filters are compiled into the sql query. Unless a custom gemini
+        query is used the variants are ordered on variant id and the returned
+        cursor continues after the last variant of the page.
+
             Args:
                 case_id (str): A gemini db
                 skip (int): Skip first variants
@@ -54,18 +67,20 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
                     cadd: None (float),
                     consequence: [] (list of consequences),
                     impact_severities: [] (list of consequences),
-                    genetic_models [] (list of genetic models)
+                    genetic_models [] (list of genetic models),
+                    sv_len: None (float),
                 }
+                cursor (str): Cursor from a previous result, skip is ignored
+                              if a cursor is given
             Returns:
-                puzzle.constants.Results : Named tuple with variants and
-                                           nr_of_variants
+                puzzle.constants.Results : Named tuple with variants,
+                                           nr_of_variants and a cursor to
+                                           the next page
 
         """
         filters = filters or {}
         logger.debug("Looking for variants in {0}".format(case_id))
 
-        limit = count + skip
-
         gemini_query = filters.get('gemini_query') or "SELECT * from variants v"
 
         any_filter = False
@@ -110,38 +125,98 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
                            )
             gemini_query = self.build_gemini_query(gemini_query, range_string)
 
+        if filters.get('consequence'):
+            consequence_string = "v.variant_id IN (SELECT i.variant_id FROM "\
+                "variant_impacts i WHERE {0})".format(' OR '.join(
+                    self._consequence_clause(consequence)
+                    for consequence in filters['consequence']))
+            gemini_query = self.build_gemini_query(gemini_query,
+                                                   consequence_string)
+
+        if filters.get('impact_severities'):
+            severities = set([severity.strip()
+                    for severity in filters['impact_severities']])
+            # gemini calls the medium severity MED
+            if 'MEDIUM' in severities:
+                severities.add('MED')
+            severity_string = "v.impact_severity IN ({0})".format(
+                ', '.join(self._sql_string(severity)
+                          for severity in sorted(severities)))
+            gemini_query = self.build_gemini_query(gemini_query,
+                                                   severity_string)
+
+        if filters.get('sv_len'):
+            # Translocations have infinite length
+            sv_len_string = "(v.end - v.start >= {0} OR v.alt LIKE "\
+                            "'%:%')".format(int(filters['sv_len']))
+            gemini_query = self.build_gemini_query(gemini_query,
+                                                   sv_len_string)
+
+        index = 0
+        # Custom queries can have their own ordering so they are not paged
+        # in the database
+        use_keyset = not filters.get('gemini_query')
+        if use_keyset:
+            position = decode_cursor(cursor)
+            if position:
+                keyset_string = "v.variant_id > {0}".format(
+                    int(position['variant_id']))
+                gemini_query = self.build_gemini_query(gemini_query,
+                                                       keyset_string)
+                index = position.get('index', 0)
+                skip = 0
+
+            gemini_query += " ORDER BY v.variant_id"
+
+            # Snvs without a call in the case are removed after the query
+            if self.case(case_id).variant_type == 'sv':
+                gemini_query += " LIMIT {0} OFFSET {1}".format(count, skip)
+                index += skip
+                skip = 0
+
+        logger.debug("Gemini query: {0}".format(gemini_query))
         filtered_variants = self._variants(
             case_id=case_id,
             gemini_query=gemini_query,
+            batch_size=skip + count,
+            index=index,
         )
 
-        if filters.get('consequence'):
-            consequences = set(filters['consequence'])
+        variants = list(itertools.islice(filtered_variants, skip,
+                                         skip + count))
 
-            filtered_variants = (variant for variant in filtered_variants if
-                set(variant.consequences).intersection(consequences))
+        next_cursor = None
+        if use_keyset and variants and len(variants) == count:
+            next_cursor = encode_cursor({
+                'variant_id': int(variants[-1].variant_id),
+                'index': variants[-1].index,
+                'count': variants[-1].index,
+            })
 
-        if filters.get('impact_severities'):
-            severities = set([severity.strip()
-                    for severity in filters['impact_severities']])
-            new_filtered_variants = []
-            filtered_variants = (variant for variant in filtered_variants if
-                set([variant.impact_severity]).intersection(severities))
+        return Results(variants, len(variants), next_cursor)
 
-        if filters.get('sv_len'):
-            sv_len = int(filters['sv_len'])
-            filtered_variants = (variant for variant in filtered_variants if
-                variant.sv_len >= sv_len)
-
-        variants = []
-        for index, variant_obj in enumerate(filtered_variants):
-            if index >= skip:
-                if index < limit:
-                    variants.append(variant_obj)
-                else:
-                    break
+    @staticmethod
+    def _sql_string(value):
+        """Quote a string for a sql query"""
+        return "'{0}'".format(value.replace("'", "''"))
+
+    def _consequence_clause(self, consequence):
+        """Return sql that matches a consequence in variant_impacts
 
-        return Results(variants, len(variants))
+            impact_so can hold several consequences separated by '&'
+
+            Args:
+                consequence (str): A SO term
+
+            Returns:
+                clause (str)
+        """
+        return "(i.impact_so = {0} OR i.impact_so LIKE {1} OR "\
+               "i.impact_so LIKE {2} OR i.impact_so LIKE {3})".format(
+                   self._sql_string(consequence),
+                   self._sql_string("{0}&%".format(consequence)),
+                   self._sql_string("%&{0}".format(consequence)),
+                   self._sql_string("%&{0}&%".format(consequence)))
 
     def variant(self, case_id, variant_id):
         """Return a specific variant.
@@ -172,7 +247,8 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
         self.variant_type = case_obj.variant_type
 
         gq = GeminiQuery(self.db)
-        gq.run(gemini_query)
+        with span('gemini_query'):
+            gq.run(gemini_query)
 
         for gemini_variant in gq:
             variant = self._format_variant(
@@ -186,13 +262,19 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
 
         return None
 
-    def _variants(self, case_id, gemini_query):
+    def _variants(self, case_id, gemini_query, batch_size=1000, index=0):
         """Return variants found in the gemini database
 
+            The rows are read in batches and the transcripts for all variants
+            in a batch are fetched with one query.
+
             Args:
                 case_id (str): The case for which we want to see information
                 gemini_query (str): What variants should be chosen
-                filters (dict): A dictionary with filters
+                batch_size (int): The number of variants to fetch
+                                  transcripts for at a time
+                index (int): The index of the variant before the first
+                             variant
 
             Yields:
                 variant_obj (dict): A Variant formatted dictionary
@@ -206,36 +288,81 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
         self.db = case_obj.variant_source
         self.variant_type = case_obj.variant_type
 
-        gq = GeminiQuery(self.db)
+        ind_indexes = self._get_ind_indexes(individuals)
 
-        gq.run(gemini_query)
+        gq = GeminiQuery(self.db)
+        with span('gemini_query'):
+            gq.run(gemini_query)
 
-        index = 0
+        batch = []
         for gemini_variant in gq:
-            variant = None
-
             # Check if variant is non ref in the individuals
-            is_variant = self._is_variant(gemini_variant, individuals)
+            if (self.variant_type == 'snv' and
+                    not self._has_variant_call(gemini_variant, ind_indexes)):
+                continue
 
-            if self.variant_type == 'snv' and not is_variant:
-                variant = None
+            batch.append(gemini_variant)
+            if len(batch) >= batch_size:
+                for variant in self._format_batch(case_id, batch, individuals,
+                                                  index):
+                    index += 1
+                    yield variant
+                batch = []
 
-            else:
-                index += 1
-                logger.debug("Updating index to: {0}".format(index))
-                variant = self._format_variant(
-                        case_id=case_id,
-                        gemini_variant=gemini_variant,
-                        individual_objs=individuals,
-                        index=index
-                        )
+        for variant in self._format_batch(case_id, batch, individuals, index):
+            yield variant
 
-            if variant:
+    def _format_batch(self, case_id, gemini_variants, individual_objs,
+                      index=0):
+        """Format a batch of gemini variants
 
-                yield variant
+            Args:
+                case_id (str): related case id
+                gemini_variants (list(GeminiQueryRow)): The gemini variants
+                individual_objs (list(dict)): A list of Individuals
+                index(int): The index of the variant before the batch
+
+            Yields:
+                variant (dict): A Variant object
+        """
+        transcripts = {}
+        if self.variant_type == 'snv':
+            transcripts = self._get_transcripts(
+                [gemini_variant['variant_id'] for gemini_variant in
+                 gemini_variants])
+            # Fetch the genes of the whole batch with one query
+            self._prefetch_genes(itertools.chain.from_iterable(
+                transcripts.values()))
+
+        gene_symbols = {}
+        if self.variant_type == 'sv':
+            # Structural variants have no transcripts, find the overlapping
+            # genes for the whole batch at once
+            batch_symbols = get_gene_symbols_batch(
+                [gemini_variant['chrom'] for gemini_variant in gemini_variants],
+                [gemini_variant['start'] for gemini_variant in gemini_variants],
+                [gemini_variant['end'] for gemini_variant in gemini_variants])
+            for gemini_variant, symbols in zip(gemini_variants,
+                                               batch_symbols):
+                gene_symbols[gemini_variant['variant_id']] = symbols
+
+        for gemini_variant in gemini_variants:
+            index += 1
+            logger.debug(LazyFormat("Updating index to: {0}", index))
+            yield self._format_variant(
+                    case_id=case_id,
+                    gemini_variant=gemini_variant,
+                    individual_objs=individual_objs,
+                    index=index,
+                    transcripts=transcripts.get(
+                        gemini_variant['variant_id'], []),
+                    gene_symbols=gene_symbols.get(
+                        gemini_variant['variant_id'])
+                    )
 
     def _format_variant(self, case_id, gemini_variant, individual_objs,
-                        index=0, add_all_info=False):
+                        index=0, add_all_info=False, transcripts=None,
+                        gene_symbols=None):
         """Make a puzzle variant from a gemini variant
 
             Args:
@@ -243,6 +370,10 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
                 gemini_variant (GeminiQueryRow): The gemini variant
                 individual_objs (list(dict)): A list of Individuals
                 index(int): The index of the variant
+                transcripts (list): The transcripts of the variant, fetched
+                                    from the database if None
+                gene_symbols (set): The genes that a variant without
+                                    transcripts overlaps, looked up if None
 
             Returns:
                 variant (dict): A Variant object
@@ -265,7 +396,7 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
 
         # Use the gemini id for fast search
         variant.update_variant_id(gemini_variant['variant_id'])
-        logger.debug("Creating a variant object of variant {0}".format(
+        logger.debug(LazyFormat("Creating a variant object of variant {0}",
             variant.variant_id))
 
         variant['index'] = index
@@ -288,7 +419,7 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
         else:
             ### Consequence and region annotations
             #Add the transcript information
-            self._add_transcripts(variant, gemini_variant)
+            self._add_transcripts(variant, gemini_variant, transcripts)
             self._add_thousand_g(variant, gemini_variant)
             self._add_exac(variant, gemini_variant)
             self._add_gmaf(variant, gemini_variant)
@@ -307,7 +438,7 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
                 variant.add_severity('SIFT', sift)
 
         #Add the genes based on the hgnc symbols
-        self._add_hgnc_symbols(variant)
+        self._add_hgnc_symbols(variant, gene_symbols)
         if self.variant_type == 'snv':
             self._add_genes(variant)
 
@@ -332,12 +463,31 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
         Returns:
             bool : If any of the individuals has the variant
         """
+        return self._has_variant_call(gemini_variant,
+                                      self._get_ind_indexes(ind_objs))
 
-        indexes = (ind.ind_index for ind in ind_objs)
-        #Check if any individual have a heterozygous or homozygous variant call
-        for index in indexes:
-            gt_call = gemini_variant['gt_types'][index]
-            if (gt_call == 1 or gt_call == 3):
-                return True
+    def _get_ind_indexes(self, ind_objs):
+        """Return the genotype columns of the individuals as an array
+
+        Args:
+            ind_objs (list(puzzle.models.individual)): A list of individuals
+
+        Returns:
+            numpy.ndarray
+        """
+        return np.array([ind.ind_index for ind in ind_objs
+                         if ind.ind_index is not None], dtype=int)
+
+    def _has_variant_call(self, gemini_variant, ind_indexes):
+        """Check if any of the individuals has a variant call
 
-        return False
+        Args:
+            gemini_variant (GeminiQueryRow): The gemini variant
+            ind_indexes (numpy.ndarray): Genotype columns of the individuals
+
+        Returns:
+            bool
+        """
+        #Check if any individual have a heterozygous or homozygous variant call
+        gt_types = np.asarray(gemini_variant['gt_types'])
+        return bool(np.in1d(gt_types[ind_indexes], VARIANT_GT_TYPES).any())
@@ -1,5 +1,7 @@
 import logging
 
+from puzzle.log import LazyFormat
+
 logger = logging.getLogger(__name__)
 
 class FrequenciesExtras(object):
@@ -15,7 +17,7 @@ class FrequenciesExtras(object):
         
         thousand_g = gemini_variant['aaf_1kg_all']
         if thousand_g:
-            logger.debug("Updating thousand_g to: {0}".format(
+            logger.debug(LazyFormat("Updating thousand_g to: {0}",
                 thousand_g))
             variant_obj.thousand_g = float(thousand_g)
             variant_obj.add_frequency('1000GAF', variant_obj.get('thousand_g'))
@@ -45,6 +47,6 @@ class FrequenciesExtras(object):
         if exac:
             exac = float(exac)
             variant_obj.add_frequency('ExAC', exac)
-            logger.debug("Updating ExAC to: {0}".format(
+            logger.debug(LazyFormat("Updating ExAC to: {0}",
                 exac))
     
\ No newline at end of file
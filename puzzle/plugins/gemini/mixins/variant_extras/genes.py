@@ -1,20 +1,27 @@
-from puzzle.utils import (get_gene_info, get_gene_symbols)
+from puzzle.utils import (get_gene_info, get_gene_symbols, get_genes)
 
 
 class GeneExtras(object):
     """Methods for genes"""
     
-    def _add_hgnc_symbols(self, variant_obj):
+    def _add_hgnc_symbols(self, variant_obj, gene_symbols=None):
         """Add hgnc symbols to the variant
         
             If there are transcripts use the symbols found here,
             otherwise use phizz to get the gene ids.
+
+            Args:
+                variant_obj (puzzle.models.Variant)
+                gene_symbols (set): Symbols of the genes that the variant
+                                    overlaps if they are already known
         """
         hgnc_symbols = set()
         if variant_obj.transcripts:
             for transcript in variant_obj.transcripts:
                 if transcript.hgnc_symbol:
                     hgnc_symbols.add(transcript.hgnc_symbol)
+        elif gene_symbols is not None:
+            hgnc_symbols = gene_symbols
         else:
             chrom = variant_obj.CHROM
             start = variant_obj.start
@@ -47,4 +54,22 @@ class GeneExtras(object):
             
         for gene in genes:
             variant_obj.add_gene(gene)
-        
\ No newline at end of file
+
+    def _prefetch_genes(self, transcripts):
+        """Fetch the genes for a number of transcripts at once
+
+            The genes are cached so that adding genes to the variants of
+            the transcripts does not query the database again.
+
+            Args:
+                transcripts (iterable): Transcripts of one or more variants
+        """
+        ensembl_ids = set()
+        hgnc_symbols = set()
+        for transcript in transcripts:
+            if transcript.ensembl_id:
+                ensembl_ids.add(transcript.ensembl_id)
+            if transcript.hgnc_symbol:
+                hgnc_symbols.add(transcript.hgnc_symbol)
+
+        get_genes(ensembl_ids=ensembl_ids, hgnc_symbols=hgnc_symbols)
@@ -1,11 +1,13 @@
 from puzzle.models import (Transcript)
 from gemini import GeminiQuery
 
+from puzzle.utils.timing import span
+
 
 class TranscriptExtras(object):
     """Collect the methods that deals with transcripts"""
 
-    def _add_transcripts(self, variant_obj, gemini_variant):
+    def _add_transcripts(self, variant_obj, gemini_variant, transcripts=None):
         """
         Add all transcripts for a variant
 
@@ -13,18 +15,41 @@ class TranscriptExtras(object):
 
             Args:
                 gemini_variant (GeminiQueryRow): The gemini variant
+                transcripts (list): Transcripts that are already fetched with
+                                    _get_transcripts. If None the transcripts
+                                    are fetched from the database.
+
+        """
+        if transcripts is None:
+            variant_id = gemini_variant['variant_id']
+            transcripts = self._get_transcripts([variant_id]).get(
+                variant_id, [])
+
+        for transcript in transcripts:
+            variant_obj.add_transcript(transcript)
 
-            Yields:
-                transcript (puzzle.models.Transcript)
+    def _get_transcripts(self, variant_ids):
+        """Fetch the transcripts for a number of variants with one query
 
+            Args:
+                variant_ids (list): Gemini variant ids
+
+            Returns:
+                transcripts (dict): A list of transcripts per variant id
         """
-        query = "SELECT * from variant_impacts WHERE variant_id = {0}".format(
-            gemini_variant['variant_id']
-        )
+        transcripts = {}
+        if not variant_ids:
+            return transcripts
+
+        query = "SELECT * from variant_impacts WHERE variant_id IN ({0}) "\
+                "ORDER BY variant_id, anno_id".format(
+                    ', '.join(str(int(variant_id))
+                              for variant_id in variant_ids))
 
         gq = GeminiQuery(self.db)
-        gq.run(query)
-        
+        with span('gemini_query'):
+            gq.run(query)
+
         for gemini_transcript in gq:
             transcript = Transcript(
                 hgnc_symbol=gemini_transcript['gene'],
@@ -36,5 +61,7 @@ class TranscriptExtras(object):
                 HGVSc=gemini_transcript['codon_change'],
                 HGVSp=', '.join([gemini_transcript['aa_change'] or '', gemini_transcript['aa_length'] or ''])
                 )
-            variant_obj.add_transcript(transcript)
+            transcripts.setdefault(gemini_transcript['variant_id'], []).append(
+                transcript)
 
+        return transcripts
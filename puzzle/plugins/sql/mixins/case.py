@@ -57,6 +57,7 @@ class CaseMixin(BaseCaseMixin):
         for ind_obj in case_obj.individuals:
             self.delete_individual(ind_obj)
         logger.info("Deleting case {0} from database".format(case_obj.case_id))
+        self.invalidate_plugin(case_obj.case_id)
         self.session.delete(case_obj)
         self.save()
         return case_obj
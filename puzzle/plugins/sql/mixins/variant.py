@@ -8,25 +8,59 @@ logger = logging.getLogger(__name__)
 
 
 class VariantMixin(BaseVariantMixin):
-    def variants(self, case_id, skip=0, count=1000, filters=None):
-        """Fetch variants for a case."""
+    def variants(self, case_id, skip=0, count=1000, filters=None, cursor=None):
+        """Fetch variants for a case.
+
+        If the variants of the filters have been counted a page is read
+        from the cached offsets of the result instead of scanning the
+        variant source.
+        """
         filters = filters or {}
         logger.debug("Fetching case with case_id: {0}".format(case_id))
         case_obj = self.case(case_id)
         plugin, case_id = self.select_plugin(case_obj)
         self.filters = plugin.filters
 
+        filters = self._add_gene_lists(filters)
+        # The result is kept when the variants of the filters are counted
+        variants = plugin.cached_variants(case_id, filters, skip, count,
+                                          cursor=cursor)
+        if variants is not None:
+            return variants
+
+        variants = plugin.variants(case_id, skip, count, filters, cursor=cursor)
+        return variants
+
+    def iter_variants(self, case_id, filters=None, page_size=1000):
+        """Yield the variants of a case one by one from its plugin."""
+        case_obj = self.case(case_id)
+        plugin, case_id = self.select_plugin(case_obj)
+        filters = self._add_gene_lists(filters or {})
+        return plugin.iter_variants(case_id, filters, page_size=page_size)
+
+    def variant_count(self, case_id, filters=None):
+        """Return the exact number of variants if the plugin has counted it.
+
+        The count is started in the background if it is not known.
+        """
+        case_obj = self.case(case_id)
+        plugin, case_id = self.select_plugin(case_obj)
+        filters = self._add_gene_lists(filters or {})
+        return plugin.variant_count(case_id, filters)
+
+    def _add_gene_lists(self, filters):
+        """Return the filters with the genes of the gene lists added."""
+        filters = dict(filters)
         gene_lists = (self.gene_list(list_id) for list_id
                       in filters.get('gene_lists', []))
         nested_geneids = (gene_list.gene_ids for gene_list in gene_lists)
         gene_ids = set(itertools.chain.from_iterable(nested_geneids))
 
         if filters.get('gene_ids'):
-            filters['gene_ids'].extend(gene_ids)
+            filters['gene_ids'] = list(filters['gene_ids']) + list(gene_ids)
         else:
             filters['gene_ids'] = gene_ids
-        variants = plugin.variants(case_id, skip, count, filters)
-        return variants
+        return filters
 
     def variant(self, case_id, variant_id):
         """Fetch a single variant from variant source."""
@@ -9,8 +9,11 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
 
+from puzzle.models import Case as BaseCase, Individual as BaseIndividual
 from puzzle.models.sql import BASE
 from puzzle.plugins import VcfPlugin, Plugin
+from puzzle.utils.get_file_info import get_file_fingerprint
+from puzzle.utils.lru import LRUCache
 
 from .mixins import ActionsMixin, CaseMixin, VariantMixin
 
@@ -21,6 +24,9 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# The number of cases that keep a plugin between requests
+PLUGIN_CACHE_SIZE = 16
+
 
 class Store(Plugin, CaseMixin, VariantMixin, ActionsMixin):
 
@@ -34,6 +40,9 @@ class Store(Plugin, CaseMixin, VariantMixin, ActionsMixin):
         uri (Optional[str]): path/URI to the database to connect to
         debug (Optional[bool]): whether to output logging information
         phenomizer_auth (Optional[tuple]): username and password
+        plugin_cache_size (Optional[int]): number of cases to keep plugins for
+        processes (Optional[int]): number of processes that filter the
+            contigs of tabix indexed vcfs
 
     Attributes:
         uri (str): path/URI to the database to connect to
@@ -41,12 +50,18 @@ class Store(Plugin, CaseMixin, VariantMixin, ActionsMixin):
         session (class): SQLAlchemy ORM session, manages persistance
         query (method): SQLAlchemy ORM query builder method
         classes (dict): bound ORM classes
+        plugins (LRUCache): the plugin of each case, with the signature of
+                            the case it was built from
     """
 
     def __init__(self, uri=None, debug=False, vtype='snv',
-                 phenomizer_auth=None):
+                 phenomizer_auth=None, plugin_cache_size=PLUGIN_CACHE_SIZE,
+                 processes=None):
         super(Store, self).__init__()
         self.uri = uri
+        self.index_dir = None
+        self.processes = processes
+        self.plugins = LRUCache(plugin_cache_size)
         if uri:
             self.connect(uri, debug=debug)
         self.variant_type = vtype
@@ -77,6 +92,11 @@ class Store(Plugin, CaseMixin, VariantMixin, ActionsMixin):
 
         self.engine = create_engine(db_uri, **kwargs)
         logger.debug('connection established successfully')
+        # store variant indexes next to a sqlite database file
+        db_file = self.engine.url.database
+        if self.dialect == 'sqlite' and db_file and db_file != ':memory:':
+            db_dir = os.path.dirname(os.path.abspath(db_file))
+            self.index_dir = os.path.join(db_dir, 'indexes')
         # make sure the same engine is propagated to the BASE classes
         BASE.metadata.bind = self.engine
         # start a session
@@ -129,18 +149,97 @@ class Store(Plugin, CaseMixin, VariantMixin, ActionsMixin):
         return self
 
     def select_plugin(self, case_obj):
-        """Select and initialize the correct plugin for the case."""
+        """Select and initialize the correct plugin for the case.
+
+        The plugin of a case is reused between requests, together with
+        the state it has built up. It is replaced when the case, its
+        individuals or the variant source changes.
+
+        Args:
+            case_obj (puzzle.models.sql.Case): the case to fetch variants for
+
+        Returns:
+            plugin, case_id
+        """
+        signature = self._plugin_signature(case_obj)
+        cached = self.plugins.get(case_obj.case_id)
+        if cached is not None and cached[0] == signature:
+            logger.debug("Reusing plugin for case {0}".format(
+                case_obj.case_id))
+            plugin = cached[1]
+        else:
+            plugin = self._build_plugin(case_obj)
+            self.plugins.set(case_obj.case_id, (signature, plugin))
+
+        self.variant_type = case_obj.variant_type
+
+        case_id = case_obj.case_id
+        return plugin, case_id
+
+    def invalidate_plugin(self, case_id):
+        """Drop the plugin of a case so that it is built again on next use."""
+        self.plugins.pop(case_id)
+
+    def _build_plugin(self, case_obj):
+        """Initialize the plugin for a case."""
         if case_obj.variant_mode == 'vcf':
             logger.debug("Using vcf plugin")
-            plugin = VcfPlugin(case_obj.variant_type)
+            plugin = VcfPlugin(case_obj.variant_type,
+                               processes=self.processes)
+            plugin.index_dir = self.index_dir
         elif case_obj.variant_mode == 'gemini':
             logger.debug("Using gemini plugin")
             plugin = GeminiPlugin(case_obj.variant_type)
-        
+
         #Add case to plugin
-        plugin.add_case(case_obj)
+        plugin.add_case(self._plugin_case(case_obj))
+        return plugin
 
-        self.variant_type = case_obj.variant_type
+    @staticmethod
+    def _plugin_case(case_obj):
+        """Copy a case and its individuals for a plugin
 
-        case_id = case_obj.case_id
-        return plugin, case_id
+        The plugin outlives the database session, so it gets plain models
+        instead of the database objects.
+        """
+        plugin_case = BaseCase(
+            case_id=case_obj.case_id,
+            name=case_obj.name,
+            variant_source=case_obj.variant_source,
+            variant_type=case_obj.variant_type,
+            variant_mode=case_obj.variant_mode,
+            compressed=case_obj.compressed,
+            tabix_index=case_obj.tabix_index,
+        )
+        for ind in case_obj.individuals:
+            plugin_case.add_individual(BaseIndividual(
+                ind_id=ind.ind_id,
+                case_id=case_obj.case_id,
+                mother=ind.mother,
+                father=ind.father,
+                sex=ind.sex,
+                phenotype=ind.phenotype,
+                ind_index=ind.ind_index,
+                variant_source=ind.variant_source,
+                bam_path=ind.bam_path,
+            ))
+        return plugin_case
+
+    @staticmethod
+    def _plugin_signature(case_obj):
+        """Return what a plugin depends on for a case
+
+        If the signature of a case changes its plugin is built again.
+        """
+        variant_source = case_obj.variant_source
+        source_fingerprint = None
+        if variant_source and os.path.exists(variant_source):
+            source_fingerprint = get_file_fingerprint(variant_source)
+        individuals = tuple(
+            (ind.ind_id, ind.name, ind.mother, ind.father, ind.sex,
+             ind.phenotype, ind.ind_index, ind.variant_source, ind.bam_path)
+            for ind in case_obj.individuals
+        )
+        return (case_obj.name, variant_source, source_fingerprint,
+                case_obj.variant_type, case_obj.variant_mode,
+                case_obj.compressed, case_obj.tabix_index, individuals)
@@ -1,3 +1,6 @@
 from .variant_extras import VariantExtras
 from .case_mixin import CaseMixin
-from .variant_mixin import VariantMixin
\ No newline at end of file
+from .variant_mixin import VariantMixin
+from .sidecar_mixin import SidecarMixin
+from .shard_mixin import ShardMixin
+from .offset_mixin import OffsetMixin
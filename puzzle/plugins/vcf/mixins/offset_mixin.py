@@ -0,0 +1,172 @@
+import logging
+
+from puzzle.plugins.constants import Results
+from puzzle.utils import get_header
+from puzzle.utils.cursor import (encode_cursor, decode_cursor)
+from puzzle.utils.result_cache import VARIANT_RESULTS
+from puzzle.utils.tabix import get_tabix_path
+from puzzle.utils.vcf_handles import VCF_HANDLES
+
+logger = logging.getLogger(__name__)
+
+
+class OffsetMixin(object):
+    """Methods to read filtered variants from their offsets
+
+        The offset of a variant is a tuple with the record number, the
+        chromosome, the position, the number of the record at the position
+        and where the record starts in a plain vcf, if that is known. The
+        offsets of the variants that follow a set of filters are kept in
+        VARIANT_RESULTS when the variants are counted.
+
+        The index of a variant is its 1-based place in the filtered result.
+    """
+
+    def variant_offsets(self, case_id, filters=None):
+        """Return the offsets of the variants that follows the filters
+
+            The offsets are added to VARIANT_RESULTS. Results of range
+            queries are not kept, they are read from the index already.
+
+            Args:
+                case_id (str): A case id
+                filters (dict): A dictionary with filters
+
+            Returns:
+                offsets (list): The offsets in the order of the vcf
+        """
+        filters = filters or {}
+        case_obj = self.case(case_id=case_id)
+        vcf_file_path = case_obj.variant_source
+
+        self.head = get_header(vcf_file_path)
+        self.vep_header = self.head.vep_columns
+        self.snpeff_header = self.head.snpeff_columns
+
+        sidecar = self._get_sidecar(vcf_file_path)
+        if sidecar:
+            offsets = sidecar.offsets(sidecar.filter(filters))
+        else:
+            offsets = [self._position_offset(variant_position)
+                       for variant_position, _ in self._variants(case_obj,
+                                                                 filters)]
+
+        if not filters.get('range'):
+            VARIANT_RESULTS.set(self._count_key(case_id, filters), offsets)
+        return offsets
+
+    def variants_from_offsets(self, case_id, offsets, skip=0, count=1000,
+                              cursor=None):
+        """Return a page of variants from the offsets of a filtered result
+
+            Only the variants of the page are read from the vcf.
+
+            Args:
+                case_id (str): A case id
+                offsets (list): Offsets from variant_offsets
+                skip (int): Skip first variants
+                count (int): The number of variants to return
+                cursor (str): Cursor from a previous result, skip is ignored
+                              if a cursor is given
+
+            Returns:
+                puzzle.constants.Results
+        """
+        position = decode_cursor(cursor)
+        start = position.get('count', 0) if position else skip
+        page = offsets[start:start + count]
+
+        case_obj = self.case(case_id=case_id)
+        self.head = get_header(case_obj.variant_source)
+        self.vep_header = self.head.vep_columns
+        self.snpeff_header = self.head.snpeff_columns
+
+        result = self._get_offset_variants(case_obj, page, first_index=start)
+
+        next_cursor = None
+        if start + count < len(offsets):
+            next_cursor = encode_cursor(
+                self._offset_position(page[-1], start + len(page)))
+        return Results(result, len(result), next_cursor)
+
+    def _get_offset_variants(self, case_obj, offsets, first_index=0):
+        """Read and format the variants at the offsets
+
+            Tabix indexed files are read with a region query for each
+            position and plain files from the byte offsets of the records.
+            Other files are read up to the last record.
+
+            Args:
+                case_obj (puzzle.models.Case): A case object
+                offsets (list): Offsets in the order of the vcf
+                first_index (int): The number of variants before the first
+                                   offset in the filtered result
+
+            Returns:
+                variants (list(puzzle.models.Variant))
+        """
+        vcf_file_path = case_obj.variant_source
+        by_region = (case_obj.tabix_index and get_tabix_path(vcf_file_path)
+                     and all(offset[1] is not None for offset in offsets))
+        by_byte_offset = all(offset[4] is not None for offset in offsets)
+
+        if by_region:
+            with VCF_HANDLES.handle(vcf_file_path) as vcf:
+                records = []
+                for _, chrom, pos, at_pos, _ in offsets:
+                    region = "{0}:{1}-{1}".format(chrom, pos)
+                    at_position = [variant for variant in vcf(region)
+                                   if variant.POS == pos]
+                    records.append(at_position[at_pos - 1])
+                return self._format_records(case_obj, records, first_index)
+
+        if by_byte_offset:
+            records = self._get_records_at(
+                vcf_file_path, [offset[4] for offset in offsets])
+        else:
+            logger.debug("Reading {0} from the start, index the vcf with "
+                         "tabix to read only the page".format(vcf_file_path))
+            records = (variant for _, variant in self._get_records(
+                vcf_file_path, [offset[0] for offset in offsets]))
+        return self._format_records(case_obj, records, first_index)
+
+    def _format_records(self, case_obj, records, first_index):
+        """Format the records of a page of a filtered result
+
+            The genes of the structural variants of the page are looked up
+            at once.
+        """
+        records = list(records)
+        return [
+            self._format_variants(
+                variant=variant,
+                index=index,
+                case_obj=case_obj,
+                gene_symbols=gene_symbols,
+            ) for index, variant, gene_symbols in self._batch_gene_symbols(
+                enumerate(records, first_index + 1),
+                batch_size=len(records))
+        ]
+
+    @staticmethod
+    def _position_offset(variant_position):
+        """Return the offset of a variant from its scan position"""
+        return (variant_position.get('records'), variant_position['chrom'],
+                variant_position['pos'], variant_position['at_pos'], None)
+
+    @staticmethod
+    def _offset_position(offset, nr_of_variants):
+        """Return the scan position after the variant at an offset
+
+            The position can be encoded to a cursor for VcfPlugin.variants.
+        """
+        records, chrom, pos, at_pos, _ = offset
+        position = {
+            'records': records,
+            'chrom': chrom,
+            'pos': pos,
+            'at_pos': at_pos,
+            'count': nr_of_variants,
+        }
+        return dict((key, value) for key, value in position.items()
+                    if value is not None)
@@ -0,0 +1,214 @@
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+
+from puzzle.utils import get_header
+from puzzle.utils.tabix import (get_tabix_path, get_tabix_extents)
+from puzzle.utils.vcf_handles import VCF_HANDLES
+
+logger = logging.getLogger(__name__)
+
+# The number of bases in a shard
+SHARD_SIZE = 5000000
+# The number of shards per process that are filtered ahead of the reader
+SHARDS_AHEAD = 2
+
+# The worker pools of this process, by number of processes
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _init_worker():
+    """Drop the pooled handles that were copied from the parent process
+
+        A handle that is copied by fork shares its file offset with the
+        parent, so the workers open their own handles.
+    """
+    VCF_HANDLES.clear()
+
+
+def get_shard_pool(processes):
+    """Return the pool of worker processes that filter shards
+
+        The pool is started on first use and kept for the life of the
+        process. It is shared by the plugins with the same number of
+        processes, a store has one plugin per case and should not start a
+        pool for each of them. A pool inherited by fork is not used, the
+        child process starts its own.
+
+        Args:
+            processes (int): The number of worker processes
+
+        Returns:
+            pool (multiprocessing.Pool)
+    """
+    key = (os.getpid(), processes)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            logger.info("Starting {0} processes to filter shards".format(
+                processes))
+            pool = multiprocessing.Pool(processes, initializer=_init_worker)
+            _POOLS[key] = pool
+        return pool
+
+
+def _filter_shard(shard):
+    """Filter the variants of one region, runs in a worker process
+
+        Args:
+            shard (tuple): The plugin class, variant type, case, filters,
+                           region and position of the shard
+
+        Returns:
+            variants (list): (variant_position, variant_obj) tuples of the
+                             variants that start in the region
+    """
+    plugin_class, variant_type, case_obj, filters, region, position = shard
+    plugin = plugin_class(variant_type)
+    plugin.add_case(case_obj)
+    plugin.head = get_header(case_obj.variant_source)
+    plugin.vep_header = plugin.head.vep_columns
+    plugin.snpeff_header = plugin.head.snpeff_columns
+
+    variants = plugin._get_filtered_variants(
+        case_obj.variant_source, filters, position, region=region)
+    return list(plugin._format_filtered(case_obj, filters, variants))
+
+
+class ShardMixin(object):
+    """Methods to filter the regions of a tabix indexed vcf in parallel
+
+        The contigs are split in regions of ``shard_size`` bases and each
+        region is filtered in a worker process. The results are merged in
+        the order of the vcf, and the index of a variant is the same as when
+        the vcf is filtered from start to end.
+
+        The regions are only filtered in parallel if ``processes`` is more
+        than one.
+    """
+    shard_size = SHARD_SIZE
+
+    def _get_shards(self, case_obj, filters, position=None):
+        """Return the regions to filter in parallel
+
+            Args:
+                case_obj (puzzle.models.Case): A case object
+                filters (dict): A dictionary with filters
+                position (dict): Where to continue a previous scan
+
+            Returns:
+                shards (list): (region, position) tuples where region is
+                               (contig, start, end), None if the vcf should
+                               be read from start to end
+        """
+        if not self.processes or self.processes < 2:
+            return None
+        if filters.get('range'):
+            return None
+
+        vcf_file_path = case_obj.variant_source
+        if not (case_obj.tabix_index and get_tabix_path(vcf_file_path)):
+            return None
+        # The genes are read with region queries instead
+        if self._gene_regions(vcf_file_path, filters) is not None:
+            return None
+
+        extents = get_tabix_extents(vcf_file_path)
+        contigs = list(extents)
+        position = position or {}
+        prev_chrom = position.get('chrom')
+        if not prev_chrom:
+            first = 0
+            shards = []
+        elif prev_chrom in extents:
+            # The count is added when the shards are merged
+            shard_position = dict(
+                (key, value) for key, value in position.items()
+                if key not in ('index', 'count'))
+            first = contigs.index(prev_chrom) + 1
+            regions = self._contig_regions(prev_chrom, position['pos'],
+                                           extents[prev_chrom])
+            shards = [(regions[0], shard_position)]
+            shards.extend((region, None) for region in regions[1:])
+        else:
+            return None
+
+        for contig in contigs[first:]:
+            shards.extend((region, None) for region in
+                          self._contig_regions(contig, 1, extents[contig]))
+
+        if len(shards) < 2:
+            return None
+        return shards
+
+    def _contig_regions(self, contig, start, extent):
+        """Split a contig in regions of shard_size bases
+
+            Args:
+                contig (str): The contig name
+                start (int): Where the first region starts
+                extent (int): How far the records of the contig reach
+
+            Returns:
+                regions (list): (contig, start, end) tuples
+        """
+        regions = []
+        while start + self.shard_size <= extent:
+            end = start + self.shard_size - 1
+            regions.append((contig, start, end))
+            start = end + 1
+        regions.append((contig, start, max(start, extent)))
+        return regions
+
+    def _sharded_variants(self, case_obj, filters, shards, position=None):
+        """Yield the variants that follows the filters from shards
+
+            The shards are filtered by the pool of worker processes, see
+            get_shard_pool. The variants of a shard are yielded as soon as
+            it and all shards before it are done. Only a few shards per
+            process are filtered ahead of the caller, so the variants that
+            are held in memory are bounded and no more shards are started
+            when the caller stops reading.
+
+            Args:
+                case_obj (puzzle.models.Case): A case object
+                filters (dict): A dictionary with filters
+                shards (list): (region, position) tuples from _get_shards
+                position (dict): Where to continue a previous scan
+
+            Yields:
+                variant_position (dict), variant_obj (puzzle.models.Variant)
+                see _variants
+        """
+        position = position or {}
+        nr_of_variants = position.get('count', 0)
+
+        logger.info("Filter {0} regions of {1} with {2} processes".format(
+            len(shards), case_obj.variant_source, self.processes))
+        tasks = (
+            (type(self), self.variant_type, case_obj, filters, region,
+             shard_position)
+            for region, shard_position in shards
+        )
+
+        pool = get_shard_pool(self.processes)
+        pending = deque(
+            pool.apply_async(_filter_shard, (task,)) for task in
+            itertools.islice(tasks, self.processes * SHARDS_AHEAD))
+        while pending:
+            variants = pending.popleft().get()
+            for task in itertools.islice(tasks, 1):
+                pending.append(pool.apply_async(_filter_shard, (task,)))
+
+            for variant_position, variant_obj in variants:
+                nr_of_variants += 1
+                variant_obj['index'] = nr_of_variants
+                variant_position['count'] = nr_of_variants
+                # The records are counted per shard, a tabix indexed
+                # vcf is resumed on the position of the last variant
+                variant_position.pop('records', None)
+                yield variant_position, variant_obj
@@ -0,0 +1,181 @@
+import logging
+import os
+import tempfile
+
+from cyvcf2 import VCF
+
+from puzzle.plugins.constants import Results
+from puzzle.utils import get_header, get_file_fingerprint
+from puzzle.utils.cursor import encode_cursor
+from puzzle.utils.sidecar import (get_sidecar_path, get_record_offsets,
+                                  SidecarWriter, VariantSidecar,
+                                  SIDECAR_VERSION)
+
+logger = logging.getLogger(__name__)
+
+
+class SidecarMixin(object):
+    """Methods to filter variants with a columnar sidecar
+
+        A sidecar holds the values that variants are filtered on and where
+        each record is in the vcf. With a sidecar the vcf is only read for
+        the variants that are returned.
+    """
+
+    def build_sidecar(self, vcf_file_path):
+        """Build the sidecar for a vcf
+
+            Args:
+                vcf_file_path (str): Path to vcf
+
+            Returns:
+                sidecar (puzzle.utils.sidecar.VariantSidecar)
+        """
+        logger.info("Building sidecar for {0}".format(vcf_file_path))
+        self.head = get_header(vcf_file_path)
+        self.vep_header = self.head.vep_columns
+        self.snpeff_header = self.head.snpeff_columns
+
+        writer = SidecarWriter(
+            sidecar_path=get_sidecar_path(vcf_file_path, self.index_dir),
+            fingerprint=get_file_fingerprint(vcf_file_path),
+            variant_type=self.variant_type
+        )
+        byte_offsets = get_record_offsets(vcf_file_path)
+        variants = self._batch_gene_symbols(enumerate(VCF(vcf_file_path), 1))
+        for record, variant, gene_symbols in variants:
+            variant_obj = self._format_variants(
+                variant=variant,
+                index=record,
+                case_obj=None,
+                gene_symbols=gene_symbols,
+            )
+            writer.add(record, variant.CHROM, variant.POS, variant_obj,
+                       byte_offset=next(byte_offsets))
+
+        return writer.close()
+
+    def _get_sidecar(self, vcf_file_path):
+        """Return the sidecar of a vcf if there is one that is up to date
+
+            Args:
+                vcf_file_path (str): Path to vcf
+
+            Returns:
+                sidecar (puzzle.utils.sidecar.VariantSidecar) or None
+        """
+        sidecar_path = get_sidecar_path(vcf_file_path, self.index_dir)
+        if not os.path.exists(sidecar_path):
+            return None
+
+        sidecar = VariantSidecar(sidecar_path)
+        if (sidecar.fingerprint != get_file_fingerprint(vcf_file_path) or
+                sidecar.version != SIDECAR_VERSION):
+            logger.info("Sidecar {0} is outdated".format(sidecar_path))
+            return None
+        if sidecar.variant_type != self.variant_type:
+            return None
+
+        return sidecar
+
+    def _sidecar_variants(self, case_obj, sidecar, filters, skip=0, count=1000,
+                          position=None):
+        """Return the variants that follow the filters using a sidecar
+
+            Only the records of the page are read from the vcf, see
+            OffsetMixin._get_offset_variants.
+
+            Args:
+                case_obj (puzzle.models.Case): A case object
+                sidecar (puzzle.utils.sidecar.VariantSidecar)
+                filters (dict): A dictionary with filters
+                skip (int): Skip first variants
+                count (int): The number of variants to return
+                position (dict): Where to continue a previous scan
+
+            Returns:
+                puzzle.constants.Results
+        """
+        records = sidecar.filter(filters)
+        nr_of_variants = 0
+        if position:
+            nr_of_variants = position.get('count', 0)
+            records = records[records > position.get('records', 0)]
+        elif skip:
+            nr_of_variants = skip
+            records = records[skip:]
+
+        page = records[:count]
+        logger.debug("Sidecar selected {0} variants".format(len(records)))
+
+        result = self._get_offset_variants(case_obj, sidecar.offsets(page),
+                                           first_index=nr_of_variants)
+
+        next_cursor = None
+        if len(records) > count:
+            next_cursor = encode_cursor({
+                'records': int(page[-1]),
+                'count': nr_of_variants + len(result),
+            })
+
+        return Results(result, len(result), next_cursor)
+
+    def _get_records(self, vcf_file_path, records):
+        """Yield the records with the given numbers from a vcf
+
+            The vcf is read from the start, this is only used when the
+            records can not be found from their positions or byte offsets.
+
+            Args:
+                vcf_file_path (str): Path to vcf
+                records (list): Sorted 1-based record numbers
+
+            Yields:
+                record (int), variant (cyvcf2.Variant)
+        """
+        if not len(records):
+            return
+
+        wanted = set(int(record) for record in records)
+        last_record = int(records[-1])
+        for record, variant in enumerate(VCF(vcf_file_path), 1):
+            if record in wanted:
+                yield record, variant
+            if record >= last_record:
+                break
+
+    def _get_records_at(self, vcf_file_path, byte_offsets):
+        """Yield the records that start at byte offsets of a plain vcf
+
+            cyvcf2 can only parse records from a file, so the lines of the
+            records are copied to a small vcf with the header of the vcf.
+
+            Args:
+                vcf_file_path (str): Path to a plain vcf
+                byte_offsets (list): Where the records start
+
+            Yields:
+                variant (cyvcf2.Variant)
+        """
+        if not byte_offsets:
+            return
+
+        lines = []
+        with open(vcf_file_path, 'rb') as handle:
+            while True:
+                line = handle.readline()
+                lines.append(line)
+                if not line or line.startswith(b'#CHROM'):
+                    break
+            for byte_offset in byte_offsets:
+                handle.seek(byte_offset)
+                lines.append(handle.readline())
+
+        page_handle, page_path = tempfile.mkstemp(suffix='.vcf')
+        try:
+            with os.fdopen(page_handle, 'wb') as page_file:
+                page_file.writelines(lines)
+            for variant in VCF(page_path):
+                yield variant
+        finally:
+            os.remove(page_path)
@@ -1,6 +1,7 @@
 import logging
 import operator
 
+from puzzle.log import LazyFormat
 from puzzle.models import (Compound)
 
 logger = logging.getLogger(__name__)
@@ -47,7 +48,7 @@ class AnnotationExtras(object):
         """
         cadd_score = info_dict.get('CADD')
         if cadd_score:
-            logger.debug("Updating cadd_score to: {0}".format(
+            logger.debug(LazyFormat("Updating cadd_score to: {0}",
                 cadd_score))
             variant_obj.cadd_score = float(cadd_score)
         ##TODO if cadd score is annotated with vep or snpeff,
@@ -67,8 +68,8 @@ class AnnotationExtras(object):
             for family_annotation in genetic_models_entry.split(','):
                 for genetic_model in family_annotation.split(':')[-1].split('|'):
                     genetic_models.append(genetic_model)
-            logger.debug("Updating genetic models to: {0}".format(
-                ', '.join(genetic_models)))
+            logger.debug(LazyFormat("Updating genetic models to: {0}",
+                genetic_models))
                 
             variant_obj.genetic_models = genetic_models
     
@@ -84,7 +85,7 @@ class AnnotationExtras(object):
         if rank_score_entry:
             for family_annotation in rank_score_entry.split(','):
                 rank_score = family_annotation.split(':')[-1]
-            logger.debug("Updating rank_score to: {0}".format(
+            logger.debug(LazyFormat("Updating rank_score to: {0}",
                 rank_score))
             variant_obj.rank_score = float(rank_score)
     
\ No newline at end of file
@@ -1,61 +1,76 @@
 import logging
 
+from puzzle.log import LazyFormat
 from puzzle.utils.constants import (SO_TERMS, IMPACT_SEVERITIES, SEVERITY_DICT)
 
 logger = logging.getLogger(__name__)
 
 class ConsequenceExtras(object):
     """Methods to handle consequences"""
-    
-    def _add_consequences(self, variant_obj, raw_variant_line):
-        """Add the consequences found for a variant
+
+    def _add_consequences(self, variant_obj, info_dict):
+        """Add the consequences, most severe consequence and impact severity
+
+            All are found in one pass over the consequence fields. The
+            consequences are sorted on severity, most severe first.
 
             Args:
                 variant_obj (puzzle.models.Variant)
-                raw_variant_line (str): A raw vcf variant line
+                info_dict (dict): A info dictionary
         """
-        consequences = []
-        for consequence in SO_TERMS:
-            if consequence in raw_variant_line:
-                consequences.append(consequence)
-        
+        severities = set()
+        for consequence_field in self._get_consequence_fields(
+                variant_obj, info_dict):
+            for consequence in consequence_field.split('&'):
+                severity = SEVERITY_DICT.get(consequence)
+                if severity is not None:
+                    severities.add(severity)
+
+        consequences = [SO_TERMS[rank] for rank in sorted(severities)]
         variant_obj.consequences = consequences
-    
-    def _add_most_severe_consequence(self, variant_obj):
-        """Add the most severe consequence
-        
-        Args:
-            variant_obj (puzzle.models.Variant)
-            
-        """
-        most_severe_consequence = None
-        most_severe_score = None
-
-        for consequence in variant_obj.consequences:
-            logger.debug("Checking severity score for consequence: {0}".format(
-                consequence))
-            
-            severity_score = SEVERITY_DICT.get(consequence)
-            
-            if severity_score != None:
-                if most_severe_score:
-                    if severity_score < most_severe_score:
-                        most_severe_consequence = consequence
-                        most_severe_score = severity_score
-                else:
-                    most_severe_consequence = consequence
-                    most_severe_score = severity_score
-
-        variant_obj.most_severe_consequence = most_severe_consequence
-
-    def _add_impact_severity(self, variant_obj):
-        """Add the impact severity for the most severe consequence
-        
+
+        if consequences:
+            most_severe_consequence = consequences[0]
+            logger.debug(LazyFormat("Updating most severe consequence to: {0}",
+                most_severe_consequence))
+            variant_obj.most_severe_consequence = most_severe_consequence
+            variant_obj.impact_severity = IMPACT_SEVERITIES.get(
+                most_severe_consequence)
+        else:
+            variant_obj.most_severe_consequence = None
+
+    def _get_consequence_fields(self, variant_obj, info_dict):
+        """Return the consequence field of each transcript
+
+            If the transcripts are not parsed, as for structural variants,
+            the fields are read from the VEP or snpEff annotation.
+
             Args:
                 variant_obj (puzzle.models.Variant)
-        
+                info_dict (dict): A info dictionary
+
+            Returns:
+                consequence_fields (list): '&' separated consequences
         """
-        if variant_obj.most_severe_consequence:
-            variant_obj.impact_severity = IMPACT_SEVERITIES.get(
-                variant_obj.most_severe_consequence
-            )
+        if variant_obj.transcripts:
+            return [transcript.consequence for transcript in
+                    variant_obj.transcripts if transcript.consequence]
+
+        annotation = info_dict.get('CSQ')
+        columns = self.vep_header
+        consequence_column = 'Consequence'
+        if not annotation:
+            annotation = info_dict.get('ANN')
+            columns = self.snpeff_header
+            consequence_column = 'Annotation'
+
+        if not (annotation and columns and consequence_column in columns):
+            return []
+
+        index = list(columns).index(consequence_column)
+        consequence_fields = []
+        for transcript_info in annotation.split(','):
+            transcript_info = transcript_info.split('|')
+            if index < len(transcript_info):
+                consequence_fields.append(transcript_info[index])
+        return consequence_fields
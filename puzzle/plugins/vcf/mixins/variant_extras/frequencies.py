@@ -1,5 +1,7 @@
 import logging
 
+from puzzle.log import LazyFormat
+
 logger = logging.getLogger(__name__)
 
 class FrequenciesExtras(object):
@@ -15,7 +17,7 @@ class FrequenciesExtras(object):
         """
         thousand_g = info_dict.get('1000GAF')
         if thousand_g:
-            logger.debug("Updating thousand_g to: {0}".format(
+            logger.debug(LazyFormat("Updating thousand_g to: {0}",
                 thousand_g))
             variant_obj.thousand_g = float(thousand_g)
             variant_obj.add_frequency('1000GAF', variant_obj.get('thousand_g'))
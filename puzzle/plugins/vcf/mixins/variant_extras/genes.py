@@ -1,20 +1,33 @@
-from puzzle.utils import (get_gene_info, get_gene_symbols)
+import itertools
+
+from puzzle.utils import (get_gene_info, get_gene_symbols,
+                          get_gene_symbols_batch)
+
+# The number of structural variants whose genes are looked up at once
+GENE_BATCH_SIZE = 100
 
 
 class GeneExtras(object):
     """Methods for genes"""
     
-    def _add_hgnc_symbols(self, variant_obj):
+    def _add_hgnc_symbols(self, variant_obj, gene_symbols=None):
         """Add hgnc symbols to the variant
         
             If there are transcripts use the symbols found here,
             otherwise use phizz to get the gene ids.
+
+            Args:
+                variant_obj (puzzle.models.Variant)
+                gene_symbols (set): Symbols of the genes that the variant
+                                    overlaps if they are already known
         """
         hgnc_symbols = set()
         if variant_obj.transcripts:
             for transcript in variant_obj.transcripts:
                 if transcript.hgnc_symbol:
                     hgnc_symbols.add(transcript.hgnc_symbol)
+        elif gene_symbols is not None:
+            hgnc_symbols = gene_symbols
         else:
             chrom = variant_obj.CHROM
             start = variant_obj.start
@@ -24,6 +37,41 @@ class GeneExtras(object):
         #Make unique ids
         variant_obj.gene_symbols = list(hgnc_symbols)
         
+    def _batch_gene_symbols(self, variants, batch_size=GENE_BATCH_SIZE):
+        """Yield variants with the symbols of the genes they overlap
+
+            Structural variants have no transcripts, the genes that they
+            overlap are found for a batch of variants at a time with
+            get_gene_symbols_batch. Other variants get their symbols from
+            the transcripts and are yielded with None.
+
+            Args:
+                variants (iterable): (key, variant) tuples where variant is
+                                     a cyvcf2.Variant
+                batch_size (int): The number of variants to look up at once
+
+            Yields:
+                key, variant (cyvcf2.Variant), gene_symbols (set)
+        """
+        if self.variant_type != 'sv':
+            for key, variant in variants:
+                yield key, variant, None
+            return
+
+        variants = iter(variants)
+        while True:
+            batch = list(itertools.islice(variants, batch_size))
+            if not batch:
+                return
+            # The same interval as _format_variants gives the variant
+            batch_symbols = get_gene_symbols_batch(
+                [variant.CHROM for _, variant in batch],
+                [variant.POS for _, variant in batch],
+                [int(variant.INFO.get('END', variant.POS)) for _, variant
+                 in batch])
+            for (key, variant), gene_symbols in zip(batch, batch_symbols):
+                yield key, variant, gene_symbols
+
     def _add_genes(self, variant_obj):
         """Add the Gene objects for a variant"""
         genes = []
@@ -1,16 +1,22 @@
+import itertools
 import logging
 
-from vcftoolbox import (get_vcf_handle,get_variant_id)
-
 from cyvcf2 import VCF
 
+from puzzle.log import LazyFormat
 from puzzle.plugins import BaseVariantMixin
 from puzzle.plugins.constants import Results
 
 from puzzle.models import (Variant)
 
 from puzzle.utils import (get_most_severe_consequence, get_omim_number,
-                          get_csq, IMPACT_SEVERITIES, get_header)
+                          get_csq, IMPACT_SEVERITIES, get_header,
+                          get_variant_id, get_variant_index, get_gene_regions)
+from puzzle.utils.cursor import (encode_cursor, decode_cursor)
+from puzzle.utils.info_filter import (InfoFilter, AnnotationFilter)
+from puzzle.utils.result_cache import VARIANT_RESULTS
+from puzzle.utils.tabix import (get_tabix_path, get_tabix_contigs)
+from puzzle.utils.vcf_handles import VCF_HANDLES
 
 from .variant_extras import VariantExtras
 
@@ -22,6 +28,9 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
     def variant(self, case_id, variant_id):
         """Return a specific variant.
 
+            The variant is located with the variant index of the vcf, the
+            index is built on first access if it does not exist.
+
             Args:
                 case_id (str): Path to vcf file
                 variant_id (str): A variant id
@@ -36,27 +45,52 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
         self.vep_header = self.head.vep_columns
         self.snpeff_header = self.head.snpeff_columns
 
-        handle = VCF(vcf_file_path)
-
-        for index, variant in enumerate(handle):
-            index += 1
-            line_id = get_variant_id(variant_line=str(variant)).lstrip('chrCHR')
-            if line_id == variant_id:
-                return self._format_variants(
-                    variant=variant,
-                    index=index,
-                    case_obj=case_obj,
-                    add_all_info=True
-                    )
+        variant_index = get_variant_index(vcf_file_path,
+                                          index_dir=self.index_dir)
+        entry = variant_index.lookup(variant_id)
+        if entry is None:
+            return None
+
+        index, chrom, pos = entry
+        if case_obj.tabix_index:
+            region = "{0}:{1}-{1}".format(chrom, pos)
+            logger.debug("Fetching variant {0} from region {1}".format(
+                variant_id, region))
+            with VCF_HANDLES.handle(vcf_file_path) as vcf:
+                for variant in vcf(region):
+                    if get_variant_id(variant) == variant_id:
+                        return self._format_variants(
+                            variant=variant,
+                            index=index,
+                            case_obj=case_obj,
+                            add_all_info=True
+                            )
+            return None
+
+        records = itertools.islice(VCF(vcf_file_path), index - 1, index)
+        for variant in records:
+            return self._format_variants(
+                variant=variant,
+                index=index,
+                case_obj=case_obj,
+                add_all_info=True
+                )
 
         return None
 
-    def variants(self, case_id, skip=0, count=1000, filters=None):
+    def variants(self, case_id, skip=0, count=1000, filters=None, cursor=None):
         """Return all variants in the VCF.
 
         This function will apply the given filter and return the 'count' first
         variants. If skip the first 'skip' variants will not be regarded.
 
+        The returned cursor can be given to get the next page, the scan will
+        then continue where the previous page stopped instead of starting
+        from the beginning of the file.
+
+        If a sidecar has been built for the vcf the filters are evaluated on
+        the sidecar and only the returned variants are read from the vcf.
+
             Args:
                 case_id (str): Path to a vcf file (for this adapter)
                 skip (int): Skip first variants
@@ -72,16 +106,173 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
                     genetic_models [] (list of genetic models)
                     sv_type: List (list of sv types),
                 }
+                cursor (str): Cursor from a previous result, skip is ignored
+                              if a cursor is given
             Returns:
-                puzzle.constants.Results : Named tuple with variants and
-                                           nr_of_variants
+                puzzle.constants.Results : Named tuple with variants,
+                                           nr_of_variants and a cursor to
+                                           the next page
 
         """
         filters = filters or {}
         case_obj = self.case(case_id=case_id)
 
-        limit = count + skip
+        vcf_file_path = case_obj.variant_source
+
+        self.head = get_header(vcf_file_path)
+
+        self.vep_header = self.head.vep_columns
+        self.snpeff_header = self.head.snpeff_columns
+
+        position = decode_cursor(cursor)
+
+        sidecar = self._get_sidecar(vcf_file_path)
+        if sidecar:
+            logger.debug("Filter variants with sidecar {0}".format(
+                sidecar.sidecar_path))
+            return self._sidecar_variants(case_obj, sidecar, filters,
+                                          skip=skip, count=count,
+                                          position=position)
+
+        variants = self._variants(case_obj, filters, position)
+        if skip and not position:
+            variants = itertools.islice(variants, skip, None)
+
+        result = []
+        next_position = None
+        for variant_position, variant_obj in variants:
+            result.append(variant_obj)
+            if len(result) >= count:
+                next_position = variant_position
+                break
+
+        next_cursor = encode_cursor(next_position) if next_position else None
+        return Results(result, len(result), next_cursor)
+
+    def iter_variants(self, case_id, filters=None, page_size=None):
+        """Yield the variants that follows the filters
+
+            The variants are yielded as they are read from the vcf, or from
+            the records that the sidecar selected.
+
+            Args:
+                case_id (str): A case id
+                filters (dict): A dictionary with filters
+                page_size (int): Not used, the vcf is read one variant at
+                                 a time
+
+            Yields:
+                variant_obj (puzzle.models.Variant)
+        """
+        filters = filters or {}
+        case_obj = self.case(case_id=case_id)
+        vcf_file_path = case_obj.variant_source
+
+        self.head = get_header(vcf_file_path)
+        self.vep_header = self.head.vep_columns
+        self.snpeff_header = self.head.snpeff_columns
+
+        sidecar = self._get_sidecar(vcf_file_path)
+        if sidecar:
+            records = sidecar.filter(filters)
+            variants = self._get_records(vcf_file_path, records)
+            variants = self._batch_gene_symbols(
+                (index, variant) for index, (_, variant) in
+                enumerate(variants, 1))
+            for index, variant, gene_symbols in variants:
+                yield self._format_variants(
+                    variant=variant,
+                    index=index,
+                    case_obj=case_obj,
+                    gene_symbols=gene_symbols,
+                )
+            return
+
+        for _, variant_obj in self._variants(case_obj, filters):
+            yield variant_obj
+
+    def cached_variants(self, case_id, filters=None, skip=0, count=1000,
+                        cursor=None):
+        """Return a page of variants from the kept offsets of the filters
+
+            The offsets are kept when the variants of the filters are
+            counted, see OffsetMixin.variant_offsets.
+
+            Args:
+                case_id (str): A case id
+                filters (dict): A dictionary with filters
+                skip (int): Skip first variants
+                count (int): The number of variants to return
+                cursor (str): Cursor from a previous result
+
+            Returns:
+                puzzle.constants.Results: None if the variants of the
+                                          filters have not been counted
+        """
+        offsets = VARIANT_RESULTS.get(self._count_key(case_id, filters or {}))
+        if offsets is None:
+            return None
+        logger.debug("Reading variants of case {0} from {1} kept "
+                     "offsets".format(case_id, len(offsets)))
+        return self.variants_from_offsets(case_id, offsets, skip, count,
+                                          cursor=cursor)
+
+    def count_variants(self, case_id, filters=None):
+        """Return the number of variants that follows the filters
+
+            The sidecar is used if it exists, otherwise the vcf is scanned.
+            The offsets of the variants are kept, see
+            OffsetMixin.variant_offsets, so that the pages of the filtered
+            result can be read without scanning the vcf again.
+
+            Args:
+                case_id (str): A case id
+                filters (dict): A dictionary with filters
+
+            Returns:
+                nr_of_variants (int)
+        """
+        return len(self.variant_offsets(case_id, filters))
+
+    def _variants(self, case_obj, filters, position=None):
+        """Yield the variants that follows the filters
 
+            The contigs of a tabix indexed vcf are filtered in parallel if
+            the plugin has more than one process, see ShardMixin.
+
+            Args:
+                case_obj (puzzle.models.Case): A case object
+                filters (dict): A dictionary with filters
+                position (dict): Where to continue a previous scan
+
+            Returns:
+                variants (iterable): (variant_position, variant_obj) tuples
+                                     where variant_position is where the
+                                     scan should continue to get the
+                                     variants after variant_obj
+        """
+        shards = self._get_shards(case_obj, filters, position)
+        if shards:
+            return self._sharded_variants(case_obj, filters, shards,
+                                          position)
+
+        variants = self._get_filtered_variants(
+            case_obj.variant_source, filters, position)
+        return self._format_filtered(case_obj, filters, variants, position)
+
+    def _format_filtered(self, case_obj, filters, variants, position=None):
+        """Format variants and yield the ones that follows the filters
+
+            Args:
+                case_obj (puzzle.models.Case): A case object
+                filters (dict): A dictionary with filters
+                variants (iterable): (variant_position, variant) tuples from
+                                     _get_filtered_variants
+                position (dict): Where the count continues from
+
+            Yields:
+                variant_position (dict), variant_obj (puzzle.models.Variant)
+        """
         genes = set()
         if filters.get('gene_ids'):
             genes = set([gene_id.strip() for gene_id in filters['gene_ids']])
@@ -106,131 +297,290 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
         if filters.get('impact_severities'):
             impact_severities = set(filters['impact_severities'])
 
-        vcf_file_path = case_obj.variant_source
+        position = position or {}
+        nr_of_variants = position.get('count', 0)
+
+        variants = self._batch_gene_symbols(variants)
+        for variant_position, variant, gene_symbols in variants:
+            # The index is the place of the variant in the filtered result
+            variant_obj = self._format_variants(
+                 variant=variant,
+                 index=nr_of_variants + 1,
+                 case_obj=case_obj,
+                 gene_symbols=gene_symbols,
+            )
 
-        self.head = get_header(vcf_file_path)
+            if genes and variant_obj:
+                if not set(variant_obj['gene_symbols']).intersection(genes):
+                    variant_obj = None
 
-        self.vep_header = self.head.vep_columns
-        self.snpeff_header = self.head.snpeff_columns
+            if impact_severities and variant_obj:
+                if not variant_obj['impact_severity'] in impact_severities:
+                    variant_obj = None
 
-        variants = self._get_filtered_variants(vcf_file_path, filters)
+            if frequency and variant_obj:
+                if variant_obj.max_freq > frequency:
+                    variant_obj = None
 
-        result = []
-        skip_index = 0
-        for index, variant in enumerate(variants):
-            index += 1
-            if skip_index >= skip:
-                variant_obj = self._format_variants(
-                     variant=variant,
-                     index=index,
-                     case_obj=case_obj,
-                )
+            if cadd and variant_obj:
+                if variant_obj['cadd_score'] < cadd:
+                    variant_obj = None
 
-                if genes and variant_obj:
-                    if not set(variant_obj['gene_symbols']).intersection(genes):
-                        variant_obj = None
+            if genetic_models and variant_obj:
+                models = set(variant_obj.genetic_models)
+                if not models.intersection(genetic_models):
+                    variant_obj = None
 
-                if impact_severities and variant_obj:
-                    if not variant_obj['impact_severity'] in impact_severities:
-                        variant_obj = None
+            if sv_len and variant_obj:
+                if variant_obj.sv_len < sv_len:
+                    variant_obj = None
 
-                if frequency and variant_obj:
-                    if variant_obj.max_freq > frequency:
-                        variant_obj = None
+            if variant_obj:
+                nr_of_variants += 1
+                variant_position['count'] = nr_of_variants
+                yield variant_position, variant_obj
 
-                if cadd and variant_obj:
-                    if variant_obj['cadd_score'] < cadd:
-                        variant_obj = None
+    def _get_filtered_variants(self, vcf_file_path, filters={}, position=None,
+                               region=None):
+        """Check if variants follows the filters
 
-                if genetic_models and variant_obj:
-                    models = set(variant_obj.genetic_models)
-                    if not models.intersection(genetic_models):
-                        variant_obj = None
+            This function will try to make filters faster for the vcf adapter.
+            Genes, consequences and sv types are checked on the parsed INFO
+            fields. Numeric filters on INFO fields are evaluated in batches
+            of records. Both are done before the variants are formatted.
 
-                if sv_len and variant_obj:
-                    if variant_obj.sv_len < sv_len:
-                        variant_obj = None
+            Genes are filtered with region queries over the genes if the vcf
+            is tabix indexed, see _gene_regions.
 
-                if variant_obj:
-                    skip_index += 1
+            Args:
+                vcf_file_path(str): Path to vcf
+                filters (dict): A dictionary with filters
+                position (dict): Where to continue a previous scan
+                region (tuple): Only read this region, see _scan_variants
 
-                    if skip_index <= limit:
-                        result.append(variant_obj)
-                    else:
-                        break
-            else:
-                skip_index += 1
+            Returns:
+                variants (iterable): (variant_position, variant) tuples, see
+                                     _scan_variants
+        """
+        variants = self._scan_variants(vcf_file_path, filters, position,
+                                       region=region)
 
-        return Results(result, len(result))
+        annotation_filter = AnnotationFilter(
+            filters,
+            vep_columns=self.vep_header,
+            snpeff_columns=self.snpeff_header
+        )
+        if annotation_filter.is_active:
+            variants = annotation_filter.filter(variants)
 
-    def _get_filtered_variants(self, vcf_file_path, filters={}):
-        """Check if variants follows the filters
+        info_filter = InfoFilter(filters, variant_type=self.variant_type)
+        if info_filter.is_active:
+            variants = info_filter.filter(variants)
+
+        return variants
 
-            This function will try to make filters faster for the vcf adapter
+    def _scan_variants(self, vcf_file_path, filters={}, position=None,
+                       region=None):
+        """Read the variants of a vcf
+
+            If a position is given the scan continues after the last record
+            of the previous scan. Tabix indexed files are resumed with region
+            queries, other files by skipping the records already read. Only
+            the regions of the genes are read if genes are filtered on a
+            tabix indexed file.
 
             Args:
                 vcf_file_path(str): Path to vcf
                 filters (dict): A dictionary with filters
+                position (dict): Where to continue a previous scan
+                region (tuple): Only read the records that start in this
+                                (contig, start, end) region of a tabix
+                                indexed vcf
 
             Yields:
-                varian_line (str): A vcf variant line
+                variant_position (dict): The number of records read and the
+                                         position of the variant
+                variant (cyvcf2.Variant): A vcf variant
         """
 
-        genes = set()
-        consequences = set()
-        sv_types = set()
+        logger.info("Get variants from {0}".format(vcf_file_path))
 
-        if filters.get('gene_ids'):
-            genes = set([gene_id.strip() for gene_id in filters['gene_ids']])
+        position = position or {}
+        records = position.get('records', 0)
+        prev_chrom = position.get('chrom')
+        prev_pos = position.get('pos')
+
+        # The chromosome and position where a region query has to skip the
+        # records that were read by the previous scan
+        resume_chrom = None
+        resume_pos = None
+
+        gene_regions = None
+        if not region:
+            gene_regions = self._gene_regions(vcf_file_path, filters)
+
+        regions = None
+        if region:
+            # One shard of a sharded scan, see ShardMixin. The records that
+            # start before the region are read by the shard before it
+            regions = [region]
+            resume_chrom, resume_pos = region[0], region[1]
+        elif filters.get('range'):
+            start = filters['range']['start']
+            if prev_pos:
+                start = max(start, prev_pos)
+                resume_chrom, resume_pos = prev_chrom, prev_pos
+            regions = ["{0}:{1}-{2}".format(
+                filters['range']['chromosome'],
+                start,
+                filters['range']['end'])]
+        elif gene_regions is not None:
+            regions = gene_regions
+            if prev_chrom:
+                regions = self._resume_regions(vcf_file_path, regions,
+                                               prev_chrom, prev_pos)
+                resume_chrom, resume_pos = prev_chrom, prev_pos
+        elif prev_chrom and get_tabix_path(vcf_file_path):
+            contigs = get_tabix_contigs(vcf_file_path)
+            if prev_chrom in contigs:
+                resume_chrom, resume_pos = prev_chrom, prev_pos
+                regions = ["{0}:{1}".format(prev_chrom, prev_pos)]
+                regions.extend(contigs[contigs.index(prev_chrom) + 1:])
+
+        pooled_handle = None
+        if regions is not None:
+            logger.debug("Query {0} regions".format(len(regions)))
+            # Region queries reuse an open handle with the index loaded
+            pooled_handle = VCF_HANDLES.acquire(vcf_file_path)
+            handle = self._query_regions(pooled_handle.vcf, regions)
+        else:
+            handle = VCF(vcf_file_path)
+            if records:
+                handle = itertools.islice(handle, records, None)
 
-        if filters.get('consequence'):
-            consequences = set(filters['consequence'])
+        try:
+            for variant_position, variant in self._read_positions(
+                    handle, position, resume_chrom, resume_pos):
+                yield variant_position, variant
+        finally:
+            if pooled_handle is not None:
+                pooled_handle.release()
 
-        if filters.get('sv_types'):
-            sv_types = set(filters['sv_types'])
+    def _gene_regions(self, vcf_file_path, filters):
+        """Return the regions of the genes of a gene filter
 
-        logger.info("Get variants from {0}".format(vcf_file_path))
+            The genes are only read with region queries if the vcf is tabix
+            indexed and no range is given.
 
-        if filters.get('range'):
-            range_str = "{0}:{1}-{2}".format(
-                filters['range']['chromosome'],
-                filters['range']['start'],
-                filters['range']['end'])
+            Args:
+                vcf_file_path(str): Path to vcf
+                filters (dict): A dictionary with filters
 
-            vcf = VCF(vcf_file_path)
-            handle = vcf(range_str)
-        else:
-            handle = VCF(vcf_file_path)
+            Returns:
+                regions (list): (contig, start, end) tuples, None if the vcf
+                                has to be scanned
+        """
+        if filters.get('range') or not filters.get('gene_ids'):
+            return None
+        if not get_tabix_path(vcf_file_path):
+            return None
+        gene_ids = [gene_id.strip() for gene_id in filters['gene_ids']]
+        return get_gene_regions(gene_ids, get_tabix_contigs(vcf_file_path))
+
+    @staticmethod
+    def _resume_regions(vcf_file_path, regions, prev_chrom, prev_pos):
+        """Return the regions that are left after a position"""
+        contigs = get_tabix_contigs(vcf_file_path)
+        prev_contig = contigs.index(prev_chrom)
+        resumed = []
+        for contig, start, end in regions:
+            contig_index = contigs.index(contig)
+            if contig_index < prev_contig:
+                continue
+            if contig_index == prev_contig:
+                if end < prev_pos:
+                    continue
+                start = max(start, prev_pos)
+            resumed.append((contig, start, end))
+        return resumed
+
+    @staticmethod
+    def _query_regions(vcf, regions):
+        """Yield the records of a number of regions
+
+            Regions are either strings or (contig, start, end) tuples. The
+            tuples are sorted and do not overlap, a record that overlaps two
+            of them, like a large structural variant, is only yielded once.
+
+            Args:
+                vcf (cyvcf2.VCF): An open vcf with the index loaded
+                regions (list): The regions to read
+        """
+        prev_contig = None
+        prev_end = 0
+        for region in regions:
+            if isinstance(region, tuple):
+                contig, start, end = region
+                for variant in vcf("{0}:{1}-{2}".format(contig, start, end)):
+                    if contig == prev_contig and variant.POS <= prev_end:
+                        continue
+                    yield variant
+                prev_contig, prev_end = contig, end
+            else:
+                for variant in vcf(region):
+                    yield variant
+
+    def _read_positions(self, handle, position, resume_chrom, resume_pos):
+        """Yield the records of a handle with their positions
 
+            Records at or before the resume position, that were read by a
+            previous scan, are skipped.
+
+            Args:
+                handle (iterable): cyvcf2 variants
+                position (dict): Where the previous scan stopped
+                resume_chrom (str): The chromosome to resume on, None to
+                                    read all records
+                resume_pos (int): The position to resume on
+
+            Yields:
+                variant_position (dict), variant (cyvcf2.Variant)
+        """
+        records = position.get('records', 0)
+        prev_chrom = position.get('chrom')
+        prev_pos = position.get('pos')
+        at_pos = position.get('at_pos', 0)
+
+        skip_at_pos = at_pos
         for variant in handle:
-            variant_line = str(variant)
-            keep_variant = True
-
-            if genes and keep_variant:
-                keep_variant = False
-                for gene in genes:
-                    if "{0}".format(gene) in variant_line:
-                        keep_variant = True
-                        break
-
-            if consequences and keep_variant:
-                keep_variant = False
-                for consequence in consequences:
-                    if consequence in variant_line:
-                        keep_variant = True
-                        break
-
-            if sv_types and keep_variant:
-                keep_variant = False
-                for sv_type in sv_types:
-                    if sv_type in variant_line:
-                        keep_variant = True
-                        break
-
-            if keep_variant:
-                yield variant
-
-    def _format_variants(self, variant, index, case_obj, add_all_info=False):
+            chrom = variant.CHROM
+            pos = variant.POS
+            if resume_chrom:
+                if chrom == resume_chrom and pos < resume_pos:
+                    continue
+                if (chrom == resume_chrom and pos == resume_pos and
+                        skip_at_pos > 0):
+                    skip_at_pos -= 1
+                    continue
+                resume_chrom = None
+
+            records += 1
+            if chrom == prev_chrom and pos == prev_pos:
+                at_pos += 1
+            else:
+                prev_chrom, prev_pos = chrom, pos
+                at_pos = 1
+
+            variant_position = {
+                'records': records,
+                'chrom': chrom,
+                'pos': pos,
+                'at_pos': at_pos,
+            }
+            yield variant_position, variant
+
+    def _format_variants(self, variant, index, case_obj, add_all_info=False,
+                         gene_symbols=None):
         """Return a Variant object
 
         Format variant make a variant that includes enough information for
@@ -241,6 +591,8 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
             variant (cython2.Variant): A variant object
             index (int): The index of the variant
             case_obj (puzzle.models.Case): A case object
+            gene_symbols (set): The genes of a structural variant if they
+                                are already known, see _batch_gene_symbols
 
         """
         header_line = self.head.header
@@ -265,11 +617,11 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
             )
         variant_obj._set_variant_id()
 
-        logger.debug("Creating a variant object of variant {0}".format(
+        logger.debug(LazyFormat("Creating a variant object of variant {0}",
             variant_obj.variant_id))
 
         variant_obj.index = index
-        logger.debug("Updating index to: {0}".format(
+        logger.debug(LazyFormat("Updating index to: {0}",
             index))
 
         ########### Get the coordinates for the variant ##############
@@ -287,7 +639,7 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
             # SV specific tag for number of occurances
             occurances = info_dict.get('OCC')
             if occurances:
-                logger.debug("Updating occurances to: {0}".format(
+                logger.debug(LazyFormat("Updating occurances to: {0}",
                     occurances))
                 variant_obj['occurances'] = float(occurances)
                 variant_obj.add_frequency('OCC', occurances)
@@ -299,7 +651,7 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
             self._add_transcripts(variant_obj, info_dict)
             self._add_exac(variant_obj, info_dict)
             
-        self._add_hgnc_symbols(variant_obj)
+        self._add_hgnc_symbols(variant_obj, gene_symbols)
 
         if add_all_info:
             self._add_genotype_calls(variant_obj, str(variant), case_obj)
@@ -309,9 +661,7 @@ class VariantMixin(BaseVariantMixin, VariantExtras):
 
 
         ##### Add consequences ####
-        self._add_consequences(variant_obj, str(variant))
-        self._add_most_severe_consequence(variant_obj)
-        self._add_impact_severity(variant_obj)
+        self._add_consequences(variant_obj, info_dict)
         self._add_rank_score(variant_obj, info_dict)
         variant_obj.set_max_freq()
         return variant_obj
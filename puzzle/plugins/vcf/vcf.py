@@ -1,27 +1,33 @@
 # -*- coding: utf-8 -*-
 import os
 import logging
+import threading
 
 from path import path
 
 from puzzle.plugins import Plugin
 from puzzle.models import DotDict
 from puzzle.utils import get_cases
-from .mixins import VariantMixin, CaseMixin
+from .mixins import (VariantMixin, CaseMixin, SidecarMixin, ShardMixin,
+                     OffsetMixin)
 
 logger = logging.getLogger(__name__)
 
 
-class VcfPlugin(VariantMixin, CaseMixin, Plugin):
+class VcfPlugin(VariantMixin, SidecarMixin, ShardMixin, OffsetMixin, CaseMixin,
+                Plugin):
     """docstring for Plugin"""
 
-    def __init__(self, variant_type='snv'):
+    def __init__(self, variant_type='snv', processes=None):
         """Initialize a vcf adapter.
 
             When instansiating all cases are found.
 
             Args:
                 variant_type(str) : 'snv' or 'sv'
+                processes(int) : The number of processes that filter the
+                                 contigs of tabix indexed vcfs, the vcf is
+                                 read in one process if None
         """
         super(VcfPlugin, self).__init__()
 
@@ -33,10 +39,18 @@ class VcfPlugin(VariantMixin, CaseMixin, Plugin):
 
         self.variant_columns = ['CHROM', 'POS', 'ID', 'REF', 'ALT', 'QUAL', 'FILTER']
         
+        # The header of the current case is kept per thread since the
+        # plugin instance is shared between requests
+        self._local = threading.local()
         self.head = None
         self.vep_header = None
         self.snpeff_header = None
-        
+
+        # Where variant indexes and sidecars are stored, a temporary dir is
+        # used if None
+        self.index_dir = None
+
+        self.processes = processes
         
         self.filters.can_filter_gene = True
         self.filters.can_filter_frequency = True
@@ -47,6 +61,33 @@ class VcfPlugin(VariantMixin, CaseMixin, Plugin):
         self.filters.can_filter_sv_len = True
         self.filters.can_filter_inheritance = True
 
+    @property
+    def head(self):
+        """The parsed header of the vcf that is currently read"""
+        return getattr(self._local, 'head', None)
+
+    @head.setter
+    def head(self, value):
+        self._local.head = value
+
+    @property
+    def vep_header(self):
+        """The VEP columns of the vcf that is currently read"""
+        return getattr(self._local, 'vep_header', None)
+
+    @vep_header.setter
+    def vep_header(self, value):
+        self._local.vep_header = value
+
+    @property
+    def snpeff_header(self):
+        """The snpEff columns of the vcf that is currently read"""
+        return getattr(self._local, 'snpeff_header', None)
+
+    @snpeff_header.setter
+    def snpeff_header(self, value):
+        self._local.snpeff_header = value
+
     def init_app(self, app):
         """Initialize plugin via Flask."""
         pass
@@ -1,3 +1,4 @@
 # -*- coding: utf-8 -*-
 from .public import blueprint as public_bp
 from .variants import blueprint as variants_bp
+from .api import blueprint as api_bp
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import itertools
+
+from flask import (abort, Blueprint, current_app as app, request, Response,
+                   stream_with_context)
+
+from puzzle.utils.serialize import to_json_line
+from puzzle.server.blueprints.variants.views import (parse_filters,
+                                                     variant_filters)
+
+BP_NAME = __name__.split('.')[-2]
+blueprint = Blueprint(BP_NAME, __name__, url_prefix='/api')
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+@blueprint.route('/variants/<case_id>')
+def variants(case_id):
+    """Stream the variants of a case as newline delimited JSON.
+
+    Takes the same filters as the variants view. The variants are written
+    as they are read from the plugin, so the whole result is never kept in
+    memory. ``skip`` and ``limit`` select a part of the result.
+    """
+    if app.db.case(case_id) is None:
+        return abort(404, "case not found")
+
+    filters = parse_filters()
+    limit = request.args.get('limit', type=int)
+    variants = app.db.iter_variants(case_id, variant_filters(filters))
+    stop = None if limit is None else filters['skip'] + limit
+    variants = itertools.islice(variants, filters['skip'], stop)
+
+    def generate():
+        for variant_obj in variants:
+            yield to_json_line(variant_obj)
+
+    return Response(stream_with_context(generate()),
+                    mimetype=NDJSON_MIMETYPE)
+
+
+@blueprint.route('/variants/<case_id>/<variant_id>')
+def variant(case_id, variant_id):
+    """Return a single variant as JSON."""
+    variant_obj = app.db.variant(case_id, variant_id)
+    if variant_obj is None:
+        return abort(404, "variant not found")
+    return Response(to_json_line(variant_obj), mimetype='application/json')
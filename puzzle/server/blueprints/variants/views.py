@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
-from flask import (abort, current_app as app, Blueprint, render_template,
-                   request, redirect)
+from flask import (abort, current_app as app, Blueprint, jsonify,
+                   render_template, request, redirect, url_for)
 
 from puzzle._compat import iteritems
 from puzzle.constants import (INHERITANCE_MODELS_SHORT, SO_TERMS, SV_TYPES,
                               IMPACT_LEVELS)
+from puzzle.utils.cursor import decode_cursor
 
 BP_NAME = __name__.split('.')[-2]
 blueprint = Blueprint(BP_NAME, __name__, url_prefix='/variants',
@@ -17,25 +18,37 @@ def variants(case_id):
     """Show all variants for a case."""
     filters = parse_filters()
     values = [value for key, value in iteritems(filters)
-              if not isinstance(value, dict) and key != 'skip']
+              if not isinstance(value, dict) and key not in ('skip', 'cursor')]
     is_active = any(values)
-    variants, nr_of_variants = app.db.variants(
+    variants, nr_of_variants, cursor = app.db.variants(
         case_id,
         skip=filters['skip'],
-        filters={
-            'gene_ids': filters['gene_symbols'],
-            'frequency': filters.get('frequency'),
-            'cadd': filters.get('cadd'),
-            'sv_len': filters.get('sv_len'),
-            'consequence': filters['selected_consequences'],
-            'genetic_models': filters['selected_models'],
-            'sv_types': filters['selected_sv_types'],
-            'gene_lists': filters['gene_lists'],
-            'impact_severities': filters['impact_severities'],
-            'gemini_query': filters['gemini_query'],
-            'range': filters['range'],
-        }
+        cursor=filters['cursor'],
+        filters=variant_filters(filters)
     )
+    # until the exact count is ready show how many variants we know of
+    exact_count = app.db.variant_count(case_id, variant_filters(filters))
+    if exact_count is None:
+        # a cursor knows how many variants the earlier pages had
+        position = decode_cursor(filters['cursor'])
+        if position is None:
+            nr_of_variants = filters['skip'] + nr_of_variants
+        else:
+            nr_of_variants = position.get('count', 0) + nr_of_variants
+    else:
+        nr_of_variants = exact_count
+
+    count_args = {key: value for key, value in
+                  iteritems(request.args.to_dict(flat=False))
+                  if key not in ('skip', 'cursor')}
+    count_url = url_for('.variant_count', case_id=case_id, **count_args)
+
+    # let the next page continue where this one stopped
+    if cursor:
+        filters['query_dict']['cursor'] = cursor
+    else:
+        filters['query_dict'].pop('cursor', None)
+
     gene_lists = ([gene_list.list_id for gene_list in app.db.gene_lists()]
                   if app.config['STORE_ENABLED'] else [])
     queries = ([(query.name or query.query, query.query) for query
@@ -46,6 +59,8 @@ def variants(case_id):
                   inheritance_models=INHERITANCE_MODELS_SHORT,
                   gene_lists=gene_lists, impact_severities=IMPACT_LEVELS,
                   is_active=is_active, nr_of_variants=nr_of_variants,
+                  exact_count=exact_count is not None,
+                  has_more=cursor is not None, count_url=count_url,
                   queries=queries)
 
     if app.db.variant_type == 'sv':
@@ -54,6 +69,14 @@ def variants(case_id):
         return render_template('variants.html', **kwargs)
 
 
+@blueprint.route('/<case_id>/count')
+def variant_count(case_id):
+    """Return the exact number of variants when it has been counted."""
+    filters = parse_filters()
+    nr_of_variants = app.db.variant_count(case_id, variant_filters(filters))
+    return jsonify(nr_of_variants=nr_of_variants)
+
+
 @blueprint.route('/<case_id>/<variant_id>')
 def variant(case_id, variant_id):
     """Show a single variant."""
@@ -68,6 +91,23 @@ def variant(case_id, variant_id):
                            comments=comments, case=case_obj)
 
 
+def variant_filters(filters):
+    """Return the filters that are given to the plugins."""
+    return {
+        'gene_ids': filters['gene_symbols'],
+        'frequency': filters.get('frequency'),
+        'cadd': filters.get('cadd'),
+        'sv_len': filters.get('sv_len'),
+        'consequence': filters['selected_consequences'],
+        'genetic_models': filters['selected_models'],
+        'sv_types': filters['selected_sv_types'],
+        'gene_lists': filters['gene_lists'],
+        'impact_severities': filters['impact_severities'],
+        'gemini_query': filters['gemini_query'],
+        'range': filters['range'],
+    }
+
+
 def parse_filters():
     """Parse variant filters from the request object."""
     genes_str = request.args.get('gene_symbol')
@@ -83,6 +123,7 @@ def parse_filters():
     filters['selected_consequences'] = request.args.getlist('consequences')
     filters['selected_sv_types'] = request.args.getlist('sv_types')
     filters['skip'] = int(request.args.get('skip', 0))
+    filters['cursor'] = request.args.get('cursor')
     filters['gene_lists'] = request.args.getlist('gene_lists')
     filters['gemini_query'] = (request.args.get('gemini_query') or
                                request.args.get('preset_gemini_query'))
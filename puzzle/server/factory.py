@@ -4,6 +4,7 @@ import logging
 from flask import Flask
 
 from .ext import bootstrap, markdown
+from .instrumentation import init_instrumentation
 from .settings import BaseConfig
 
 logger = logging.getLogger(__name__)
@@ -66,3 +67,7 @@ def bind_extensions(app):
     @app.template_filter('islist')
     def islist(object):
         return isinstance(object, (tuple, list))
+
+    # time the requests, opt-in since it adds some overhead
+    if app.config.get('INSTRUMENTATION'):
+        init_instrumentation(app)
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""Opt-in timing of requests
+
+Enabled with the INSTRUMENTATION setting. Each response gets a
+Server-Timing header with the time spent in the plugin, in gene and
+cytoband lookups and in template rendering, and /debug/stats shows rolling
+latency histograms per route. With PROFILE_DIR set every request is also
+profiled and the stats are dumped to that directory.
+
+The latency and the profile of a request are recorded when it is torn
+down, also when the view raised. A streamed response, like the variants of
+the api, is recorded when its body has been sent. Its Server-Timing header
+is sent before the body, so it only covers the time until the body starts.
+"""
+import bisect
+import cProfile
+import logging
+import os
+import threading
+import time
+from collections import deque, OrderedDict
+
+from flask import g, jsonify, request
+from jinja2 import Template
+
+from puzzle.utils.timing import span, start_recording, stop_recording
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets, in milliseconds
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+# The number of requests per route that the stats are made from
+WINDOW = 1000
+
+
+class LatencyStats(object):
+    """Keep the latencies of the last requests to each route"""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    def add(self, route, milliseconds):
+        with self._lock:
+            if route not in self._latencies:
+                self._latencies[route] = deque(maxlen=self.window)
+            self._latencies[route].append(milliseconds)
+
+    def summary(self):
+        """Return the histogram and percentiles of each route
+
+            Returns:
+                stats (dict): route -> count, p50, p95, max and the
+                              number of requests in each bucket
+        """
+        with self._lock:
+            latencies = dict((route, sorted(values)) for route, values in
+                             self._latencies.items())
+
+        stats = {}
+        for route, values in latencies.items():
+            histogram = OrderedDict(
+                ("<={0}".format(bound), 0) for bound in BUCKETS)
+            histogram[">{0}".format(BUCKETS[-1])] = 0
+            keys = list(histogram)
+            for value in values:
+                histogram[keys[bisect.bisect_left(BUCKETS, value)]] += 1
+            stats[route] = {
+                'count': len(values),
+                'p50': _percentile(values, 50),
+                'p95': _percentile(values, 95),
+                'max': values[-1],
+                'histogram': histogram,
+            }
+        return stats
+
+
+def _percentile(values, percent):
+    """Return a percentile of sorted values"""
+    index = int(round(percent / 100.0 * (len(values) - 1)))
+    return values[index]
+
+
+class TimedBackend(object):
+    """Wrap a plugin so that each method call is recorded as a span
+
+        The span of a method is called db_<method>. Other attributes are
+        returned as they are.
+    """
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def __getattr__(self, name):
+        attribute = getattr(self._backend, name)
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+
+        def timed_method(*args, **kwargs):
+            with span("db_{0}".format(name)):
+                return attribute(*args, **kwargs)
+        return timed_method
+
+
+class TimedTemplate(Template):
+    """A jinja template that records its rendering as a span"""
+
+    def render(self, *args, **kwargs):
+        with span('render'):
+            return super(TimedTemplate, self).render(*args, **kwargs)
+
+
+def server_timing(spans, total):
+    """Return the value of a Server-Timing header
+
+        Args:
+            spans (OrderedDict): name -> (seconds, calls)
+            total (float): The seconds of the whole request
+
+        Returns:
+            header (str): Like 'db_case;dur=1.2, render;dur=5.0, ...'
+    """
+    metrics = ["{0};dur={1:.1f}".format(name, seconds * 1000)
+               for name, (seconds, _) in spans.items()]
+    metrics.append("total;dur={0:.1f}".format(total * 1000))
+    return ', '.join(metrics)
+
+
+def init_instrumentation(app):
+    """Time the requests of an app
+
+        Args:
+            app (Flask): initialized Flask app instance, with app.db bound
+    """
+    app.db = TimedBackend(app.db)
+    app.jinja_env.template_class = TimedTemplate
+    app.latency_stats = LatencyStats()
+    profile_dir = app.config.get('PROFILE_DIR')
+    if profile_dir and not os.path.exists(profile_dir):
+        os.makedirs(profile_dir)
+
+    def request_info():
+        """Return what is recorded about the current request"""
+        # Requests that match no route are kept together
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        return (g.request_start, route, request.endpoint or 'unknown',
+                getattr(g, 'profile', None))
+
+    def record_request(start, route, endpoint, profile):
+        """Add the latency of a request and dump its profile"""
+        app.latency_stats.add(route, (time.time() - start) * 1000)
+        if profile is not None:
+            profile.disable()
+            file_name = "{0:.6f}-{1}.prof".format(start, endpoint)
+            profile.dump_stats(os.path.join(profile_dir, file_name))
+
+    @app.before_request
+    def start_timing():
+        start_recording()
+        g.request_start = time.time()
+        if profile_dir:
+            g.profile = cProfile.Profile()
+            g.profile.enable()
+
+    @app.after_request
+    def add_server_timing(response):
+        start = getattr(g, 'request_start', None)
+        if start is None:
+            return response
+        spans = stop_recording()
+        response.headers['Server-Timing'] = server_timing(
+            spans, time.time() - start)
+
+        if response.is_streamed:
+            # The body is sent after the request is torn down
+            info = request_info()
+            g.request_start = None
+            response.call_on_close(lambda: record_request(*info))
+        return response
+
+    @app.teardown_request
+    def stop_timing(exception=None):
+        if getattr(g, 'request_start', None) is None:
+            return
+        # after_request is not called when the view raised
+        stop_recording()
+        record_request(*request_info())
+        g.request_start = None
+
+    @app.route('/debug/stats')
+    def debug_stats():
+        return jsonify(window=app.latency_stats.window,
+                       routes=app.latency_stats.summary())
+
+    logger.info("Instrumentation enabled")
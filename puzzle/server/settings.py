@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from puzzle.plugins import VcfPlugin
-from .blueprints import public_bp, variants_bp
+from .blueprints import public_bp, variants_bp, api_bp
 
 PROJECT_NAME = __name__.split('.')[0]
 
@@ -16,11 +16,16 @@ class BaseConfig:
     STORE_ENABLED = False
 
     # default blueprints
-    BLUEPRINTS = [public_bp, variants_bp]
+    BLUEPRINTS = [public_bp, variants_bp, api_bp]
 
     #Phemonizer credentials
     PHENOMIZER_AUTH = False
 
+    # Server-Timing headers and /debug/stats
+    INSTRUMENTATION = False
+    # dump a cProfile of each request here, needs INSTRUMENTATION
+    PROFILE_DIR = None
+
 class DevConfig(BaseConfig):
     DEBUG = True
 
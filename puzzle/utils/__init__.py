@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
-from .headers import (get_csq, get_header)
+from .headers import (get_csq, get_header, parse_header)
 from .get_info import (get_most_severe_consequence, get_omim_number,
-                       get_cytoband_coord, get_gene_info, get_gene_symbols)
+                       get_cytoband_coord, get_gene_info, get_gene_symbols,
+                       get_variant_id, get_genes, get_gene_symbols_batch,
+                       get_gene_regions)
 from .ped import get_individuals, get_cases
 from .phenomizer import hpo_genes
 from .constants import IMPACT_SEVERITIES
-from .get_file_info import (get_file_type, get_variant_type)
\ No newline at end of file
+from .get_file_info import (get_file_type, get_variant_type,
+                            get_file_fingerprint)
+from .variant_index import (get_variant_index, build_variant_index,
+                            get_index_path)
+from .tabix import get_indexed_vcf
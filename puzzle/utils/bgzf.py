@@ -0,0 +1,84 @@
+import struct
+import zlib
+
+# The most uncompressed data in one block, a block can not be larger than
+# 64 kb even if the data does not compress
+MAX_BLOCK_DATA = 0xff00
+
+# The empty block that ends a bgzf file
+EOF_BLOCK = (b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00\x42\x43'
+             b'\x02\x00\x1b\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00')
+
+
+def make_virtual_offset(block_offset, within_block):
+    """Return a bgzf virtual offset
+
+        Args:
+            block_offset (int): Where the block starts in the compressed file
+            within_block (int): The offset in the uncompressed block
+
+        Returns:
+            virtual_offset (int)
+    """
+    return (block_offset << 16) | within_block
+
+
+class BgzfWriter(object):
+    """Write a blocked gzip file, the format that tabix indexes
+
+        Any gzip reader can read the file. tell() returns the virtual offset
+        of the next byte that is written, which is what a tabix index points
+        to.
+
+        Args:
+            file_path (str): Where to write the file
+            compresslevel (int): zlib compression level
+    """
+    def __init__(self, file_path, compresslevel=6):
+        super(BgzfWriter, self).__init__()
+        self.compresslevel = compresslevel
+        self._handle = open(file_path, 'wb')
+        self._buffer = b''
+        self._block_offset = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, data):
+        """Write data, full blocks are compressed as the data comes in"""
+        self._buffer += data
+        while len(self._buffer) >= MAX_BLOCK_DATA:
+            self._write_block(self._buffer[:MAX_BLOCK_DATA])
+            self._buffer = self._buffer[MAX_BLOCK_DATA:]
+
+    def tell(self):
+        """Return the virtual offset of the next byte"""
+        return make_virtual_offset(self._block_offset, len(self._buffer))
+
+    def flush(self):
+        """Write the buffered data as a block"""
+        if self._buffer:
+            self._write_block(self._buffer)
+            self._buffer = b''
+
+    def close(self):
+        if self._handle.closed:
+            return
+        self.flush()
+        self._handle.write(EOF_BLOCK)
+        self._handle.close()
+
+    def _write_block(self, data):
+        compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+        # The header is 18 bytes and the crc and size are 8 bytes
+        block_size = len(compressed) + 26
+        header = struct.pack('<4BI2BH2BHH', 31, 139, 8, 4, 0, 0, 255, 6,
+                             66, 67, 2, block_size - 1)
+        trailer = struct.pack('<II', zlib.crc32(data) & 0xffffffff,
+                              len(data))
+        self._handle.write(header + compressed + trailer)
+        self._block_offset += block_size
@@ -1,10 +1,6 @@
 # -*- coding: utf-8 -*-
-import codecs
-import json
 import os
 from pkg_resources import resource_filename
-import gzip
-from intervaltree import Interval, IntervalTree
 
 import puzzle
 
@@ -113,26 +109,9 @@ for severity, term in enumerate(SO_TERMS):
     SEVERITY_DICT[term] = severity
 
 resource_package = puzzle.__name__
-hgnc_to_omim_path = os.path.join('utils', 'resources', 'hgnc_to_omim.json')
+hgnc_to_omim_path = os.path.join('utils', 'resources', 'hgnc_to_omim.tsv')
 cytoband_path = os.path.join('utils', 'resources', 'cytoBand.txt.gz')
 
-converter_path = resource_filename(resource_package, hgnc_to_omim_path)
-cytoband_path = resource_filename(resource_package, cytoband_path)
-
-with codecs.open(converter_path, 'r') as stream:
-    HGNC_TO_OMIM = json.load(stream)
-
-CYTOBANDS = {}
-
-with gzip.open(cytoband_path, 'r') as cytobands:
-    for line in cytobands:
-        line = line.rstrip().split('\t')
-        chrom = line[0].strip('chr')
-        start = int(line[1])
-        stop = int(line[2])
-        cytoband = line[3]
-        if chrom in CYTOBANDS:
-            tree = CYTOBANDS[chrom]
-            tree[start:stop] = cytoband
-        else:
-            CYTOBANDS[chrom] = IntervalTree([Interval(start, stop, cytoband)])
+# The files are read on first use, see puzzle.utils.reference
+HGNC_TO_OMIM_PATH = resource_filename(resource_package, hgnc_to_omim_path)
+CYTOBAND_PATH = resource_filename(resource_package, cytoband_path)
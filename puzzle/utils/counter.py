@@ -0,0 +1,148 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+from .lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# The number of counts that are kept
+COUNT_CACHE_SIZE = 256
+# The number of counts that run at the same time
+COUNT_WORKERS = 2
+# The number of counts that wait for a worker
+MAX_QUEUED = 8
+
+
+def get_filter_signature(filters):
+    """Return a string that is the same for equal filters
+
+        Empty filters are left out and lists and sets are sorted, so the
+        order the filters were given in does not matter.
+
+        Args:
+            filters (dict): A dictionary with filters
+
+        Returns:
+            signature (str)
+    """
+    normalized = {}
+    for key, value in (filters or {}).items():
+        if value is None or (not value and
+                             not isinstance(value, (int, float))):
+            continue
+        if isinstance(value, (list, tuple, set, frozenset)):
+            value = sorted(set(value))
+        normalized[key] = value
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+
+class BackgroundCounter(object):
+    """Count things on a small pool of worker threads and keep the counts
+
+        A count is started with submit and can be read with get when it is
+        done. A key that is already counted or being counted is not
+        submitted again.
+
+        The latest submitted counts are run first. When more than
+        max_queued counts are waiting the oldest are dropped, they belong to
+        filters that the user has left and are submitted again if they are
+        asked for. A count that has not started can also be dropped with
+        cancel, counts that are running are not interrupted.
+
+        Args:
+            maxsize (int): The number of counts to keep
+            workers (int): The number of counts that run at the same time
+            max_queued (int): The number of counts that can wait
+    """
+    def __init__(self, maxsize=COUNT_CACHE_SIZE, workers=COUNT_WORKERS,
+                 max_queued=MAX_QUEUED):
+        super(BackgroundCounter, self).__init__()
+        self.counts = LRUCache(maxsize)
+        self.workers = workers
+        self.max_queued = max_queued
+        self._queued = OrderedDict()
+        self._running = set()
+        self._condition = threading.Condition()
+        self._workers = []
+
+    def get(self, key):
+        """Return the count for a key, None if it is not counted yet"""
+        return self.counts.get(key)
+
+    def is_pending(self, key):
+        """Check if a key is waiting to be counted or being counted"""
+        with self._condition:
+            return key in self._queued or key in self._running
+
+    def submit(self, key, count_function):
+        """Count a key on a worker thread
+
+            Args:
+                key (hashable): Where the count is stored
+                count_function (callable): Returns the count
+        """
+        with self._condition:
+            if key in self._running or key in self.counts:
+                return
+            if key in self._queued:
+                # Asked for again, it is moved to the front of the queue
+                del self._queued[key]
+            else:
+                logger.debug("Counting {0} in the background".format(key))
+            self._queued[key] = count_function
+            while len(self._queued) > self.max_queued:
+                dropped_key, _ = self._queued.popitem(last=False)
+                logger.debug("Dropping the count of {0}".format(dropped_key))
+            self._start_workers()
+            self._condition.notify_all()
+
+    def cancel(self, key):
+        """Drop a count that has not started
+
+            Returns:
+                bool: If the count was dropped
+        """
+        with self._condition:
+            if self._queued.pop(key, None) is None:
+                return False
+            self._condition.notify_all()
+            return True
+
+    def _start_workers(self):
+        """Start worker threads until the pool is full"""
+        self._workers = [worker for worker in self._workers
+                         if worker.is_alive()]
+        while len(self._workers) < self.workers:
+            worker = threading.Thread(target=self._work,
+                                      name='puzzle-counter')
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self):
+        """Run the latest submitted counts"""
+        while True:
+            with self._condition:
+                while not self._queued:
+                    self._condition.wait()
+                key, count_function = self._queued.popitem(last=True)
+                self._running.add(key)
+            try:
+                self.counts.set(key, count_function())
+            except Exception:
+                logger.exception("Counting {0} failed".format(key))
+            finally:
+                with self._condition:
+                    self._running.discard(key)
+                    self._condition.notify_all()
+
+    def wait(self):
+        """Block until no counts are waiting or running"""
+        with self._condition:
+            while self._queued or self._running:
+                self._condition.wait()
+
+
+VARIANT_COUNTS = BackgroundCounter()
@@ -0,0 +1,42 @@
+import base64
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(position):
+    """Encode a position in a variant source to an opaque cursor
+
+        Args:
+            position (dict): Plugin specific information about where the
+                             next page of variants starts
+
+        Returns:
+            cursor (str): A url safe string
+    """
+    raw_cursor = json.dumps(position, sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(raw_cursor).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor created with encode_cursor
+
+        Args:
+            cursor (str): A cursor
+
+        Returns:
+            position (dict): The encoded position, None if the cursor is
+                             missing or malformed
+    """
+    if not cursor:
+        return None
+    try:
+        raw_cursor = base64.urlsafe_b64decode(str(cursor))
+        position = json.loads(raw_cursor.decode('utf-8'))
+    except (TypeError, ValueError) as error:
+        logger.warning("Could not decode cursor {0}: {1}".format(cursor, error))
+        return None
+    if not isinstance(position, dict):
+        return None
+    return position
@@ -0,0 +1,138 @@
+import logging
+import threading
+
+import numpy as np
+
+from phizz.database import get_cursor
+
+logger = logging.getLogger(__name__)
+
+
+class GeneIntervalIndex(object):
+    """In memory index of gene intervals
+
+        The genes of each chromosome are stored as arrays sorted on start.
+        An overlap query is two binary searches followed by a check of the
+        genes between them. Only genes that start at most the length of the
+        longest gene before the query can overlap, so the number of checked
+        genes stays close to the number of hits.
+
+        Args:
+            genes (iterable): (chrom, start, stop, hgnc_symbol) tuples
+    """
+    def __init__(self, genes):
+        super(GeneIntervalIndex, self).__init__()
+        intervals = {}
+        for chrom, start, stop, hgnc_symbol in genes:
+            intervals.setdefault(chrom, []).append((start, stop, hgnc_symbol))
+
+        self.chromosomes = {}
+        for chrom, chrom_intervals in intervals.items():
+            chrom_intervals.sort()
+            starts = np.array([interval[0] for interval in chrom_intervals],
+                              dtype=np.int64)
+            stops = np.array([interval[1] for interval in chrom_intervals],
+                             dtype=np.int64)
+            symbols = np.array([interval[2] for interval in chrom_intervals],
+                               dtype=object)
+            max_length = int((stops - starts).max())
+            self.chromosomes[chrom] = (starts, stops, symbols, max_length)
+
+    @staticmethod
+    def _clean_chrom(chrom):
+        """Remove the chr prefix of a chromosome"""
+        if chrom.startswith('chr') or chrom.startswith('CHR'):
+            return chrom[3:]
+        return chrom
+
+    def gene_symbols(self, chrom, start, stop):
+        """Return the symbols of the genes that overlap an interval
+
+            Args:
+                chrom (str): A chromosome
+                start (int): Start of the interval
+                stop (int): Stop of the interval, inclusive
+
+            Returns:
+                gene_symbols (set)
+        """
+        return self.gene_symbols_batch([chrom], [start], [stop])[0]
+
+    def gene_symbols_batch(self, chroms, starts, stops):
+        """Return the symbols of the genes that overlap a number of intervals
+
+            The binary searches for all intervals on a chromosome are done
+            at once.
+
+            Args:
+                chroms (list): Chromosomes
+                starts (list): Starts of the intervals
+                stops (list): Stops of the intervals, inclusive
+
+            Returns:
+                gene_symbols (list(set)): The genes for each interval
+        """
+        chroms = [self._clean_chrom(chrom) for chrom in chroms]
+        starts = np.asarray(starts, dtype=np.int64)
+        stops = np.asarray(stops, dtype=np.int64)
+        result = [set() for chrom in chroms]
+
+        query_indexes = {}
+        for query_index, chrom in enumerate(chroms):
+            query_indexes.setdefault(chrom, []).append(query_index)
+
+        for chrom, indexes in query_indexes.items():
+            if chrom not in self.chromosomes:
+                logger.warning("Chromosome {0} has no genes".format(chrom))
+                continue
+            gene_starts, gene_stops, symbols, max_length = self.chromosomes[
+                chrom]
+            indexes = np.array(indexes)
+            query_starts = starts[indexes]
+            query_stops = stops[indexes]
+
+            first = np.searchsorted(gene_starts, query_starts - max_length,
+                                    side='left')
+            last = np.searchsorted(gene_starts, query_stops, side='right')
+
+            for query_index, query_start, low, high in zip(
+                    indexes, query_starts, first, last):
+                hits = gene_stops[low:high] >= query_start
+                result[query_index] = set(symbols[low:high][hits])
+
+        return result
+
+
+def build_gene_intervals():
+    """Build a gene interval index from the phizz gene table
+
+        Returns:
+            index (GeneIntervalIndex)
+    """
+    logger.info("Building gene interval index")
+    cursor = get_cursor()
+    genes = [
+        (row['chrom'], row['start'], row['stop'], row['hgnc_symbol'])
+        for row in cursor.execute("SELECT chrom, start, stop, hgnc_symbol "
+                                  "FROM gene WHERE hgnc_symbol != ''")
+    ]
+    cursor.connection.close()
+    return GeneIntervalIndex(genes)
+
+
+_gene_intervals = None
+_gene_intervals_lock = threading.Lock()
+
+
+def get_gene_intervals():
+    """Return the gene interval index, it is built on first use
+
+        Returns:
+            index (GeneIntervalIndex)
+    """
+    global _gene_intervals
+    if _gene_intervals is None:
+        with _gene_intervals_lock:
+            if _gene_intervals is None:
+                _gene_intervals = build_gene_intervals()
+    return _gene_intervals
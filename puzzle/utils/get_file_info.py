@@ -1,4 +1,5 @@
 import logging
+import os
 
 from cyvcf2 import VCF
 try:
@@ -8,6 +9,18 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+def get_file_fingerprint(file_path):
+    """Return a fingerprint that changes when a file is modified
+
+        Args:
+            file_path (str): Path to a file
+
+        Returns:
+            fingerprint (str): '<size>:<mtime>'
+    """
+    stat = os.stat(file_path)
+    return "{0}:{1!r}".format(stat.st_size, stat.st_mtime)
+
 def get_file_type(variant_source):
     """Check what kind of file variant source is
     
@@ -1,13 +1,29 @@
 import itertools
 import logging
-from .constants import (SEVERITY_DICT, HGNC_TO_OMIM, CYTOBANDS)
+from .constants import SEVERITY_DICT
 
-from phizz.utils import (query_gene, query_gene_symbol)
+from phizz.database import get_cursor
 
+from puzzle.log import LazyFormat
 from puzzle.models import Gene
 
+from .gene_intervals import get_gene_intervals
+from .reference import get_cytobands, get_omim_index
+from .lru import LRUCache
+from .timing import timed
+
 logger = logging.getLogger(__name__)
 
+# Gene objects keyed on ('ensembl_id', id) or ('hgnc_symbol', symbol)
+GENE_CACHE = LRUCache(maxsize=20000)
+
+# sqlite does not allow more variables than 999 in a query
+MAX_QUERY_VARIABLES = 900
+
+# Annotators give variants this close to a gene the symbol of the gene, like
+# upstream_gene_variant in VEP
+GENE_PADDING = 5000
+
 def get_variant_id(variant):
     """Get a variant id from a cyvcf variant
     
@@ -18,14 +34,34 @@ def get_variant_id(variant):
         Returns:
             variant_id (str): A variant id
     """
-    pass
+    variant_id = '_'.join([
+        variant.CHROM.lstrip('chrCHR'),
+        str(variant.POS),
+        variant.REF,
+        ','.join(variant.ALT) or '.'
+    ])
+    return variant_id
 
 def get_gene_symbols(chrom, start, stop):
     """Get the gene symbols that a interval overlaps"""
-    gene_symbols = query_gene_symbol(chrom, start, stop)
-    logger.debug("Found gene symbols: {0}".format(', '.join(gene_symbols)))
+    gene_symbols = get_gene_intervals().gene_symbols(chrom, start, stop)
+    logger.debug(LazyFormat("Found gene symbols: {0}", gene_symbols))
     return gene_symbols
 
+def get_gene_symbols_batch(chroms, starts, stops):
+    """Get the gene symbols that a number of intervals overlaps
+
+    Args:
+        chroms (list): Chromosomes
+        starts (list): Starts of the intervals
+        stops (list): Stops of the intervals
+
+    Returns:
+        gene_symbols (list(set)): The gene symbols for each interval
+    """
+    return get_gene_intervals().gene_symbols_batch(chroms, starts, stops)
+
+@timed('gene_info')
 def get_gene_info(ensembl_ids=None, hgnc_symbols=None):
     """Return the genes info based on the transcripts found
 
@@ -39,23 +75,60 @@ def get_gene_info(ensembl_ids=None, hgnc_symbols=None):
     uniq_ensembl_ids = set(ensembl_id for ensembl_id in (ensembl_ids or []))
     uniq_hgnc_symbols = set(hgnc_symbol for hgnc_symbol in (hgnc_symbols or []))
     genes = []
-    gene_data = []
-    
+
     if uniq_ensembl_ids:
-        for ensembl_id in uniq_ensembl_ids:
-            for res in query_gene(ensembl_id=ensembl_id):
-                gene_data.append(res) 
-
-    elif uniq_hgnc_symbols:
-        for hgnc_symbol in uniq_hgnc_symbols:
-            query_res = query_gene(hgnc_symbol=hgnc_symbol)
-            if query_res:
-                for res in query_res:
-                    gene_data.append(res)
+        found_genes = get_genes(ensembl_ids=uniq_ensembl_ids)
+    else:
+        found_genes = get_genes(hgnc_symbols=uniq_hgnc_symbols)
+
+    for gene_id in sorted(found_genes):
+        genes.extend(found_genes[gene_id])
+
+    return genes
+
+def get_genes(ensembl_ids=None, hgnc_symbols=None):
+    """Return the Gene objects for a number of genes
+
+    Genes are cached, the genes that are not cached are fetched from phizz
+    with one query. If a hgnc symbol is not found a gene with only the
+    symbol is returned.
+
+    Args:
+        ensembl_ids (Optional[iterable]): Ensembl gene ids
+        hgnc_symbols (Optional[iterable]): HGNC gene symbols
+
+    Returns:
+        genes (dict): A list of `Gene` objects per ensembl id and hgnc symbol
+    """
+    genes = {}
+    for column, gene_ids in (('ensembl_id', ensembl_ids),
+                             ('hgnc_symbol', hgnc_symbols)):
+        missing = []
+        for gene_id in set(gene_ids or []):
+            gene_objs = GENE_CACHE.get((column, gene_id))
+            if gene_objs is None:
+                missing.append(gene_id)
             else:
+                genes[gene_id] = gene_objs
+
+        if column == 'ensembl_id':
+            invalid = [gene_id for gene_id in missing
+                       if not gene_id.startswith('ENSG')]
+            for gene_id in invalid:
+                logger.warning("Invalid ensembl id {0}".format(gene_id))
+            missing = [gene_id for gene_id in missing
+                       if gene_id.startswith('ENSG')]
+
+        if not missing:
+            continue
+
+        gene_data = _query_genes(column, missing)
+        for gene_id in missing:
+            rows = gene_data.get(gene_id)
+            if not rows and column == 'hgnc_symbol':
                 # If no result we add just the symbol
-                gene_data.append({
-                    'hgnc_symbol': hgnc_symbol,
+                rows = [{
+                    'hgnc_symbol': gene_id,
                     'hgnc_id': None,
                     'ensembl_id': None,
                     'description': None,
@@ -64,24 +137,95 @@ def get_gene_info(ensembl_ids=None, hgnc_symbols=None):
                     'stop': 0,
                     'hi_score': None,
                     'constraint_score': None,
-                })
-    for gene in gene_data:
-        genes.append(Gene(
-            symbol=gene ['hgnc_symbol'],
-            hgnc_id=gene['hgnc_id'],
-            ensembl_id=gene['ensembl_id'],
-            description=gene['description'],
-            chrom=gene['chrom'],
-            start=gene['start'],
-            stop=gene['stop'],
-            location=get_cytoband_coord(gene['chrom'], gene['start']),
-            hi_score=gene['hi_score'],
-            constraint_score=gene['constraint_score'],
-            omim_number=get_omim_number(gene['hgnc_symbol'])
-            ))
+                }]
+            gene_objs = [_build_gene(row) for row in rows or []]
+            GENE_CACHE.set((column, gene_id), gene_objs)
+            genes[gene_id] = gene_objs
 
     return genes
 
+def get_gene_regions(hgnc_symbols, contigs, padding=GENE_PADDING):
+    """Return the regions of a number of genes
+
+    The regions are padded so that they hold the variants that are
+    annotated with the genes, and regions that overlap are merged.
+
+    Args:
+        hgnc_symbols (iterable): HGNC gene symbols
+        contigs (list): The contigs of a vcf, the regions are named and
+                        sorted as the contigs
+        padding (int): Bases to add before and after each gene
+
+    Returns:
+        regions (list): (contig, start, end) tuples, None if the
+                        coordinates of a gene are not known
+    """
+    hgnc_symbols = set(hgnc_symbols)
+    genes = get_genes(hgnc_symbols=hgnc_symbols)
+    contig_names = dict((contig.lstrip('chrCHR'), contig) for contig in contigs)
+
+    intervals = []
+    for hgnc_symbol in hgnc_symbols:
+        gene_objs = genes.get(hgnc_symbol)
+        if not gene_objs or any(gene_obj.chrom == 'unknown' for gene_obj
+                                in gene_objs):
+            logger.debug("No coordinates for gene {0}".format(hgnc_symbol))
+            return None
+        for gene_obj in gene_objs:
+            contig = contig_names.get(gene_obj.chrom)
+            if contig is None:
+                continue
+            intervals.append((contigs.index(contig),
+                              max(gene_obj.start - padding, 1),
+                              gene_obj.stop + padding))
+
+    regions = []
+    for contig_index, start, end in sorted(intervals):
+        contig = contigs[contig_index]
+        if regions and regions[-1][0] == contig and start <= regions[-1][2]:
+            regions[-1][2] = max(end, regions[-1][2])
+        else:
+            regions.append([contig, start, end])
+    return [tuple(region) for region in regions]
+
+def _query_genes(column, gene_ids):
+    """Fetch genes from the phizz database
+
+    Args:
+        column (str): 'ensembl_id' or 'hgnc_symbol'
+        gene_ids (list): The ids to look for
+
+    Returns:
+        gene_data (dict): The gene rows per id
+    """
+    logger.debug("Querying {0} genes on {1}".format(len(gene_ids), column))
+    cursor = get_cursor()
+    gene_data = {}
+    for start in range(0, len(gene_ids), MAX_QUERY_VARIABLES):
+        chunk = gene_ids[start:start + MAX_QUERY_VARIABLES]
+        query = "SELECT * FROM gene WHERE {0} IN ({1})".format(
+            column, ', '.join('?' for gene_id in chunk))
+        for row in cursor.execute(query, chunk):
+            gene_data.setdefault(row[column], []).append(row)
+    cursor.connection.close()
+    return gene_data
+
+def _build_gene(gene):
+    """Build a Gene object from phizz gene data"""
+    return Gene(
+        symbol=gene['hgnc_symbol'],
+        hgnc_id=gene['hgnc_id'],
+        ensembl_id=gene['ensembl_id'],
+        description=gene['description'],
+        chrom=gene['chrom'],
+        start=gene['start'],
+        stop=gene['stop'],
+        location=get_cytoband_coord(gene['chrom'], gene['start']),
+        hi_score=gene['hi_score'],
+        constraint_score=gene['constraint_score'],
+        omim_number=get_omim_number(gene['hgnc_symbol'])
+        )
+
 def get_most_severe_consequence(transcripts):
     """Get the most severe consequence
 
@@ -98,13 +242,12 @@ def get_most_severe_consequence(transcripts):
 
     for transcript in transcripts:
         for consequence in transcript['consequence'].split('&'):
-            logger.debug("Checking severity score for consequence: {0}".format(
-                consequence
-            ))
+            logger.debug(LazyFormat(
+                "Checking severity score for consequence: {0}", consequence))
             severity_score = SEVERITY_DICT.get(
                 consequence
             )
-            logger.debug("Severity score found: {0}".format(
+            logger.debug(LazyFormat("Severity score found: {0}",
                 severity_score
             ))
             if severity_score != None:
@@ -118,6 +261,7 @@ def get_most_severe_consequence(transcripts):
 
     return most_severe_consequence
 
+@timed('cytoband')
 def get_cytoband_coord(chrom, pos):
     """Get the cytoband coordinate for a position
 
@@ -131,10 +275,11 @@ def get_cytoband_coord(chrom, pos):
     chrom = chrom.strip('chr')
     pos = int(pos)
     result = None
-    logger.debug("Finding Cytoband for chrom:{0} pos:{1}".format(chrom, pos))
-    if chrom in CYTOBANDS:
-        for interval in CYTOBANDS[chrom][pos]:
-            result = "{0}{1}".format(chrom, interval.data)
+    logger.debug(LazyFormat("Finding Cytoband for chrom:{0} pos:{1}",
+                            chrom, pos))
+    band = get_cytobands().get_band(chrom, pos)
+    if band is not None:
+        result = "{0}{1}".format(chrom, band)
 
     return result
 
@@ -148,6 +293,6 @@ def get_omim_number(hgnc_symbol):
             omim_number (int): The omim number
     """
 
-    omim_number = HGNC_TO_OMIM.get(hgnc_symbol,{}).get('mim_nr', None)
+    omim_number = get_omim_index().get(hgnc_symbol)
 
     return omim_number
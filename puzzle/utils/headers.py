@@ -1,9 +1,17 @@
 import logging
+import os
 
 from vcftoolbox import (HeaderParser, get_vcf_handle)
 
+from .get_file_info import get_file_fingerprint
+from .lru import LRUCache
+from .timing import timed
+
 logger = logging.getLogger(__name__)
 
+# Parsed headers, the key is the absolute path to the vcf
+HEADER_CACHE = LRUCache(maxsize=32)
+
 def get_csq(description):
     """Get the csq columns
     
@@ -17,7 +25,32 @@ def get_csq(description):
     csq_cols = csq_description.split('|')
     return csq_cols
 
+@timed('header')
 def get_header(vcf_file_path):
+    """Return the parsed header of a vcf
+
+        Headers are cached per file, the VEP and snpEff column layouts are
+        parsed with the header so they are also only computed once. A
+        header is parsed again if the size or mtime of the file changes.
+        The returned object is shared and should not be modified.
+
+        Args:
+            vcf_file_path(str): Path to vcf
+
+        Returns:
+            head: A HeaderParser object
+    """
+    abs_path = os.path.abspath(vcf_file_path)
+    fingerprint = get_file_fingerprint(abs_path)
+    cached = HEADER_CACHE.get(abs_path)
+    if cached and cached[0] == fingerprint:
+        return cached[1]
+
+    head = parse_header(vcf_file_path)
+    HEADER_CACHE.set(abs_path, (fingerprint, head))
+    return head
+
+def parse_header(vcf_file_path):
     """Parse the header and return a header object
 
         Args:
@@ -0,0 +1,267 @@
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# INFO fields that are used for the max frequency of a variant, see
+# FrequenciesExtras. If more than one key in a group is found the last one
+# is used.
+FREQUENCY_KEYS = {
+    'snv': (('1000GAF',), ('ExAC', 'EXAC', 'ExACAF', 'EXACAF')),
+    'sv': (('OCC',),),
+}
+
+NAN = float('nan')
+
+
+def get_info_float(info, key):
+    """Return an INFO value as a float
+
+        Values that are missing, 0 or not numbers are NaN, the same values
+        are ignored when variants are formatted.
+
+        Args:
+            info (cyvcf2.INFO): The INFO of a variant
+            key (str): The INFO key
+
+        Returns:
+            value (float)
+    """
+    value = info.get(key)
+    if not value:
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+class InfoFilter(object):
+    """Evaluate numeric filters on the INFO fields of vcf records
+
+        Records are collected in batches and the filters are evaluated on
+        the whole batch with numpy, before any Variant object is built.
+
+        Frequencies found in transcripts are not known before a variant is
+        formatted. The frequency filter only removes records where the
+        frequencies in INFO are too high, the remaining records still has
+        to be checked after formatting.
+
+        Args:
+            filters (dict): A dictionary with filters
+            variant_type (str): 'snv' or 'sv'
+            batch_size (int): The number of records to evaluate at a time
+    """
+    def __init__(self, filters, variant_type='snv', batch_size=1000):
+        super(InfoFilter, self).__init__()
+        self.batch_size = batch_size
+        self.frequency_keys = FREQUENCY_KEYS.get(variant_type, ())
+
+        self.frequency = None
+        if filters.get('frequency'):
+            self.frequency = float(filters['frequency'])
+
+        self.cadd = None
+        if filters.get('cadd') and variant_type == 'snv':
+            self.cadd = float(filters['cadd'])
+
+    @property
+    def is_active(self):
+        """Return True if there are any filters to evaluate"""
+        return self.frequency is not None or self.cadd is not None
+
+    def _column(self, infos, key):
+        """Return the values of an INFO field as an array"""
+        return np.fromiter((get_info_float(info, key) for info in infos),
+                           dtype=float, count=len(infos))
+
+    def mask(self, variants):
+        """Return a mask of the records that pass the filters
+
+            Args:
+                variants (list): cyvcf2 variants
+
+            Returns:
+                mask (numpy.ndarray)
+        """
+        infos = [variant.INFO for variant in variants]
+        mask = np.ones(len(infos), dtype=bool)
+
+        # Comparisons with NaN are False, that is missing values
+        with np.errstate(invalid='ignore'):
+            if self.frequency is not None:
+                for keys in self.frequency_keys:
+                    frequencies = self._column(infos, keys[0])
+                    for key in keys[1:]:
+                        values = self._column(infos, key)
+                        frequencies = np.where(np.isnan(values), frequencies,
+                                               values)
+                    mask &= ~(frequencies > self.frequency)
+
+            if self.cadd is not None:
+                mask &= self._column(infos, 'CADD') >= self.cadd
+
+        return mask
+
+    def filter(self, items):
+        """Yield the items where the variant passes the filters
+
+            Args:
+                items (iterable): Tuples where the last element is a
+                                  cyvcf2 variant
+
+            Yields:
+                item (tuple)
+        """
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                for passed in self._filter_batch(batch):
+                    yield passed
+                batch = []
+
+        for passed in self._filter_batch(batch):
+            yield passed
+
+    def _filter_batch(self, batch):
+        """Return the items in a batch that pass the filters"""
+        if not batch:
+            return []
+        mask = self.mask([item[-1] for item in batch])
+        logger.debug("{0} of {1} records passed the INFO filters".format(
+            mask.sum(), len(batch)))
+        return [item for item, passed in zip(batch, mask) if passed]
+
+
+class AnnotationFilter(object):
+    """Filter vcf records on the genes, consequences and sv types in INFO
+
+        Genes and consequences are read from the VEP (CSQ) or snpEff (ANN)
+        annotations, VEP has precedence like when transcripts are added. The
+        sv type is read from SVTYPE. Values are compared exactly so that a
+        gene does not match other genes that has its name as a prefix.
+
+        Records without VEP or snpEff annotations are kept by the gene
+        filter, the genes of these variants are looked up when the variant
+        is formatted.
+
+        Args:
+            filters (dict): A dictionary with filters
+            vep_columns (list): The VEP columns from the header
+            snpeff_columns (list): The snpEff columns from the header
+    """
+    def __init__(self, filters, vep_columns=None, snpeff_columns=None):
+        super(AnnotationFilter, self).__init__()
+        self.genes = set(gene_id.strip() for gene_id in
+                         filters.get('gene_ids') or [])
+        self.consequences = set(filters.get('consequence') or [])
+        self.sv_types = set(filters.get('sv_types') or [])
+
+        self.vep_fields = self._get_fields(
+            vep_columns, ('SYMBOL', 'Gene'), 'Consequence')
+        self.snpeff_fields = self._get_fields(
+            snpeff_columns, ('Gene_Name', 'Gene_ID'), 'Annotation')
+
+    @staticmethod
+    def _get_fields(columns, gene_columns, consequence_column):
+        """Return the indexes of the gene and consequence columns"""
+        columns = list(columns or [])
+        gene_indexes = [columns.index(column) for column in gene_columns
+                        if column in columns]
+        consequence_index = None
+        if consequence_column in columns:
+            consequence_index = columns.index(consequence_column)
+        return gene_indexes, consequence_index
+
+    @property
+    def is_active(self):
+        """Return True if there are any filters to evaluate"""
+        return bool(self.genes or self.consequences or self.sv_types)
+
+    def _get_annotations(self, info):
+        """Return the parsed annotations of a record
+
+            Returns:
+                annotations (list), fields (tuple): The splitted annotations
+                and the indexes of the gene and consequence columns, or None
+                if the record is not annotated
+        """
+        vep_string = info.get('CSQ')
+        if vep_string:
+            fields = self.vep_fields
+            raw_annotations = vep_string
+        else:
+            raw_annotations = info.get('ANN')
+            fields = self.snpeff_fields
+
+        if not raw_annotations:
+            return None
+
+        annotations = [annotation.split('|') for annotation in
+                       raw_annotations.split(',')]
+        return annotations, fields
+
+    def _has_gene(self, annotations, gene_indexes):
+        """Check if any annotation is in one of the genes"""
+        for annotation in annotations:
+            for index in gene_indexes:
+                if index < len(annotation) and annotation[index] in self.genes:
+                    return True
+        return False
+
+    def _has_consequence(self, annotations, consequence_index):
+        """Check if any annotation has one of the consequences"""
+        if consequence_index is None:
+            return False
+        for annotation in annotations:
+            if consequence_index < len(annotation):
+                terms = annotation[consequence_index].split('&')
+                if self.consequences.intersection(terms):
+                    return True
+        return False
+
+    def passes(self, variant):
+        """Check if a record passes the filters
+
+            Args:
+                variant (cyvcf2.Variant): A vcf variant
+
+            Returns:
+                bool
+        """
+        info = variant.INFO
+        if self.sv_types and info.get('SVTYPE') not in self.sv_types:
+            return False
+
+        if not (self.genes or self.consequences):
+            return True
+
+        parsed = self._get_annotations(info)
+        if parsed is None:
+            return not self.consequences
+
+        annotations, (gene_indexes, consequence_index) = parsed
+        if self.genes and not self._has_gene(annotations, gene_indexes):
+            return False
+
+        if (self.consequences and
+                not self._has_consequence(annotations, consequence_index)):
+            return False
+
+        return True
+
+    def filter(self, items):
+        """Yield the items where the variant passes the filters
+
+            Args:
+                items (iterable): Tuples where the last element is a
+                                  cyvcf2 variant
+
+            Yields:
+                item (tuple)
+        """
+        for item in items:
+            if self.passes(item[-1]):
+                yield item
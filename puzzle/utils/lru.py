@@ -0,0 +1,59 @@
+import threading
+
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """Thread safe mapping that holds a limited number of items
+
+        When the cache is full the least recently used item is evicted.
+
+        Args:
+            maxsize (int): The maximum number of items to keep
+    """
+    def __init__(self, maxsize=128):
+        super(LRUCache, self).__init__()
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        """Return the value for key and mark it as recently used"""
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                return default
+            self._items[key] = value
+            return value
+
+    def set(self, key, value):
+        """Add a value, evict the least recently used item if full"""
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Remove a key and return its value"""
+        with self._lock:
+            return self._items.pop(key, default)
+
+    def clear(self):
+        """Remove all items"""
+        with self._lock:
+            self._items.clear()
+
+    def keys(self):
+        """Return the keys, least recently used first"""
+        with self._lock:
+            return list(self._items.keys())
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
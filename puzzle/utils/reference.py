@@ -0,0 +1,160 @@
+import gzip
+import logging
+import threading
+
+import numpy as np
+
+from .constants import CYTOBAND_PATH, HGNC_TO_OMIM_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class CytobandIndex(object):
+    """The cytobands of each chromosome as arrays sorted on start
+
+        Bands do not overlap, so the band of a position is found with one
+        binary search.
+
+        Args:
+            bands (iterable): (chrom, start, stop, name) tuples
+    """
+    def __init__(self, bands):
+        super(CytobandIndex, self).__init__()
+        chrom_bands = {}
+        for chrom, start, stop, name in bands:
+            chrom_bands.setdefault(chrom, []).append((start, stop, name))
+
+        self.chromosomes = {}
+        for chrom, intervals in chrom_bands.items():
+            intervals.sort()
+            starts = np.array([interval[0] for interval in intervals],
+                              dtype=np.int64)
+            stops = np.array([interval[1] for interval in intervals],
+                             dtype=np.int64)
+            names = [interval[2] for interval in intervals]
+            self.chromosomes[chrom] = (starts, stops, names)
+
+    def get_band(self, chrom, pos):
+        """Return the name of the band that a position is in
+
+            Args:
+                chrom (str): A chromosome without the chr prefix
+                pos (int): The position
+
+            Returns:
+                name (str): The band, None if the position is in no band
+        """
+        if chrom not in self.chromosomes:
+            return None
+        starts, stops, names = self.chromosomes[chrom]
+        index = np.searchsorted(starts, pos, side='right') - 1
+        if index < 0 or pos >= stops[index]:
+            return None
+        return names[index]
+
+
+class OmimIndex(object):
+    """Map hgnc symbols to omim numbers
+
+        The symbols are kept sorted in a numpy string array next to an
+        array with the omim numbers.
+
+        Args:
+            symbols (list): Hgnc symbols, sorted
+            mim_numbers (list): The omim number of each symbol
+    """
+    def __init__(self, symbols, mim_numbers):
+        super(OmimIndex, self).__init__()
+        self.symbols = np.array(symbols, dtype=str)
+        self.mim_numbers = np.array(mim_numbers, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def get(self, hgnc_symbol):
+        """Return the omim number of a hgnc symbol
+
+            Args:
+                hgnc_symbol (str): A hgnc symbol
+
+            Returns:
+                omim_number (int): The omim number, None if not found
+        """
+        if not hgnc_symbol or not len(self.symbols):
+            return None
+        index = np.searchsorted(self.symbols, hgnc_symbol)
+        if index < len(self.symbols) and self.symbols[index] == hgnc_symbol:
+            return int(self.mim_numbers[index])
+        return None
+
+
+def load_cytobands(cytoband_path=CYTOBAND_PATH):
+    """Read the cytobands from a gzipped UCSC cytoBand file
+
+        Returns:
+            cytobands (CytobandIndex)
+    """
+    logger.debug("Loading cytobands from {0}".format(cytoband_path))
+    bands = []
+    with gzip.open(cytoband_path, 'r') as cytobands:
+        for line in cytobands:
+            line = line.rstrip().split('\t')
+            bands.append(
+                (line[0].strip('chr'), int(line[1]), int(line[2]), line[3]))
+    return CytobandIndex(bands)
+
+
+def load_omim_index(omim_path=HGNC_TO_OMIM_PATH):
+    """Read the hgnc symbol to omim number file
+
+        The file has one tab separated symbol and omim number per line,
+        sorted on symbol.
+
+        Returns:
+            omim_index (OmimIndex)
+    """
+    logger.debug("Loading omim numbers from {0}".format(omim_path))
+    symbols = []
+    mim_numbers = []
+    with open(omim_path, 'r') as stream:
+        for line in stream:
+            if line.startswith('#'):
+                continue
+            symbol, mim_number = line.rstrip().split('\t')
+            symbols.append(symbol)
+            mim_numbers.append(int(mim_number))
+    return OmimIndex(symbols, mim_numbers)
+
+
+_resources = {}
+_resources_lock = threading.Lock()
+
+
+def _get_resource(name, loader):
+    """Return a resource, it is loaded on first use"""
+    resource = _resources.get(name)
+    if resource is None:
+        with _resources_lock:
+            resource = _resources.get(name)
+            if resource is None:
+                resource = loader()
+                _resources[name] = resource
+    return resource
+
+
+def get_cytobands():
+    """Return the cytoband index
+
+        Returns:
+            cytobands (CytobandIndex)
+    """
+    return _get_resource('cytobands', load_cytobands)
+
+
+def get_omim_index():
+    """Return the hgnc symbol to omim number index
+
+        Returns:
+            omim_index (OmimIndex)
+    """
+    return _get_resource('omim', load_omim_index)
@@ -0,0 +1,50 @@
+from .lru import LRUCache
+
+# The number of variant offsets that are kept for all filters
+MAX_OFFSETS = 500000
+
+
+class ResultCache(LRUCache):
+    """Keep the offsets of the variants that follow a set of filters
+
+        An offset tells a plugin where to read a variant, so that a page of
+        a filtered result can be read without scanning the variant source
+        again. The results are evicted, least recently used first, when
+        the total number of offsets is more than max_offsets.
+
+        Args:
+            max_offsets (int): The number of offsets to keep
+    """
+    def __init__(self, max_offsets=MAX_OFFSETS):
+        super(ResultCache, self).__init__(maxsize=max_offsets)
+        self.size = 0
+
+    def set(self, key, value):
+        """Add the offsets of a result, evict results until they fit"""
+        with self._lock:
+            self.pop(key)
+            if len(value) > self.maxsize:
+                return
+            self._items[key] = value
+            self.size += len(value)
+            while self.size > self.maxsize:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def pop(self, key, default=None):
+        """Remove a result and return its offsets"""
+        with self._lock:
+            value = self._items.pop(key, None)
+            if value is None:
+                return default
+            self.size -= len(value)
+            return value
+
+    def clear(self):
+        """Remove all results"""
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+
+VARIANT_RESULTS = ResultCache()
@@ -0,0 +1,130 @@
+import json
+import math
+
+from puzzle.models import Record
+
+
+def json_default(obj):
+    """Return a value that json can encode for models and sets
+
+        Used as the default function of json.dumps.
+    """
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError("{0!r} is not JSON serializable".format(obj))
+
+
+def to_json_line(variant_obj):
+    """Return a variant as one line of JSON
+
+        Infinite numbers, like the length of a translocation, are not valid
+        JSON and are written as null.
+
+        Args:
+            variant_obj (puzzle.models.Variant): A variant
+
+        Returns:
+            json_line (str): The variant as JSON, ending with a newline
+    """
+    variant = dict(
+        (key, None if isinstance(value, float) and (
+            math.isinf(value) or math.isnan(value)) else value)
+        for key, value in variant_obj.items()
+    )
+    return json.dumps(variant, default=json_default, sort_keys=True) + '\n'
+
+
+# The variant fields that are written to a tsv, in order
+TSV_COLUMNS = ('CHROM', 'POS', 'ID', 'REF', 'ALT', 'QUAL', 'FILTER',
+               'variant_id', 'index', 'gene_symbols',
+               'most_severe_consequence', 'impact_severity', 'max_freq',
+               'cadd_score', 'genetic_models', 'sv_type', 'sv_len')
+
+# The INFO fields that are written to a vcf
+VCF_INFO = (
+    ('GENES', 'gene_symbols', '.', 'String', 'Gene symbols'),
+    ('MSC', 'most_severe_consequence', '1', 'String',
+     'Most severe consequence'),
+    ('IMPACT', 'impact_severity', '1', 'String', 'Impact severity'),
+    ('MAX_AF', 'max_freq', '1', 'Float', 'Highest population frequency'),
+    ('CADD', 'cadd_score', '1', 'Float', 'CADD score'),
+    ('GM', 'genetic_models', '.', 'String', 'Genetic models followed'),
+    ('SVTYPE', 'sv_type', '1', 'String', 'Type of structural variant'),
+    ('SVLEN', 'sv_len', '1', 'Integer', 'Length of structural variant'),
+)
+
+
+def _format_value(value, missing):
+    """Return a value as a tsv or vcf field"""
+    if value is None or value == []:
+        return missing
+    if isinstance(value, (list, tuple, set)):
+        return ','.join(str(item) for item in value)
+    if isinstance(value, float) and (math.isinf(value) or math.isnan(value)):
+        return missing
+    return str(value)
+
+
+def get_tsv_header():
+    """Return the header line of a tsv export"""
+    return '#' + '\t'.join(TSV_COLUMNS) + '\n'
+
+
+def to_tsv_line(variant_obj):
+    """Return a variant as a line of tab separated values
+
+        Lists are joined with commas and missing values are empty.
+
+        Args:
+            variant_obj (puzzle.models.Variant): A variant
+
+        Returns:
+            tsv_line (str): The columns of TSV_COLUMNS, ending with a
+                            newline
+    """
+    return '\t'.join(_format_value(variant_obj.get(column), '')
+                     for column in TSV_COLUMNS) + '\n'
+
+
+def get_vcf_header():
+    """Return the header lines of a vcf export
+
+        The export is a sites only vcf, the genotypes are not parsed when
+        variants are filtered.
+
+        Returns:
+            header (str): The meta lines and the column line
+    """
+    lines = ['##fileformat=VCFv4.2']
+    for info_id, _, number, info_type, description in VCF_INFO:
+        lines.append('##INFO=<ID={0},Number={1},Type={2},'
+                     'Description="{3}">'.format(info_id, number, info_type,
+                                                 description))
+    lines.append('\t'.join(['#CHROM', 'POS', 'ID', 'REF', 'ALT', 'QUAL',
+                            'FILTER', 'INFO']))
+    return '\n'.join(lines) + '\n'
+
+
+def to_vcf_line(variant_obj):
+    """Return a variant as a vcf record
+
+        The INFO column holds the annotations of VCF_INFO.
+
+        Args:
+            variant_obj (puzzle.models.Variant): A variant
+
+        Returns:
+            vcf_line (str): The record, ending with a newline
+    """
+    info = []
+    for info_id, key, _, _, _ in VCF_INFO:
+        value = _format_value(variant_obj.get(key), None)
+        if value is not None:
+            info.append("{0}={1}".format(info_id, value.replace(' ', '_')))
+
+    fields = [_format_value(variant_obj.get(key), '.') for key in
+              ('CHROM', 'POS', 'ID', 'REF', 'ALT', 'QUAL', 'FILTER')]
+    fields.append(';'.join(info) or '.')
+    return '\t'.join(fields) + '\n'
@@ -0,0 +1,388 @@
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+
+from .constants import SO_TERMS
+from .variant_index import get_index_path
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_SUFFIX = '.pzc'
+META_FILE = 'meta.json'
+# Sidecars of other versions are built again
+SIDECAR_VERSION = 2
+
+# The columns and their types, the same on all platforms
+COLUMNS = (
+    ('record', np.int64),
+    ('chrom', np.int32),
+    ('pos', np.int64),
+    # The number of the record among the records at the same position
+    ('at_pos', np.int32),
+    # Where the record starts in a plain vcf, -1 for compressed vcfs
+    ('byte_offset', np.int64),
+    ('start', np.int64),
+    ('end', np.int64),
+    ('max_freq', np.float64),
+    ('cadd_score', np.float64),
+    ('rank_score', np.float64),
+    ('impact_severity', np.int8),
+    ('consequences', np.uint64),
+    ('genetic_models', np.uint64),
+    ('sv_type', np.int8),
+    ('sv_len', np.float64),
+    ('gene_offsets', np.int64),
+    ('gene_codes', np.int32),
+)
+
+# Columns where the value is a code in a vocabulary that is stored in the meta
+VOCABULARIES = ('chroms', 'impact_severities', 'sv_types', 'genes',
+                'genetic_models')
+
+MAX_BITS = 64
+
+NAN = float('nan')
+
+
+def get_sidecar_path(vcf_file_path, index_dir=None):
+    """Return the path to the sidecar directory of a vcf
+
+        Args:
+            vcf_file_path (str): Path to vcf
+            index_dir (Optional[str]): Directory where indexes are stored
+
+        Returns:
+            sidecar_path (str): Path to the sidecar directory
+    """
+    return get_index_path(vcf_file_path, index_dir, suffix=SIDECAR_SUFFIX)
+
+
+def get_record_offsets(vcf_file_path):
+    """Yield where each record of a plain vcf starts
+
+        Compressed vcfs can not be read from a byte offset, None is yielded
+        for each of their records.
+
+        Args:
+            vcf_file_path (str): Path to vcf
+
+        Yields:
+            byte_offset (int)
+    """
+    if vcf_file_path.endswith('.gz'):
+        while True:
+            yield None
+
+    byte_offset = 0
+    with open(vcf_file_path, 'rb') as handle:
+        for line in handle:
+            if line.strip() and not line.startswith(b'#'):
+                yield byte_offset
+            byte_offset += len(line)
+
+
+class _Column(object):
+    """A column that is filled one value at a time
+
+        The values are kept in numpy chunks of a fixed type.
+    """
+    chunk_size = 65536
+
+    def __init__(self, dtype):
+        super(_Column, self).__init__()
+        self.dtype = dtype
+        self._chunks = []
+        self._values = []
+
+    def append(self, value):
+        self._values.append(value)
+        if len(self._values) >= self.chunk_size:
+            self._flush()
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self._chunks) + len(self._values)
+
+    def _flush(self):
+        self._chunks.append(np.array(self._values, dtype=self.dtype))
+        self._values = []
+
+    def to_array(self):
+        self._flush()
+        return np.concatenate(self._chunks)
+
+
+def _to_float(value):
+    """Return value as float, missing values are NaN"""
+    if value is None:
+        return NAN
+    return float(value)
+
+
+class SidecarWriter(object):
+    """Collect the filter columns of a vcf, one variant at a time
+
+        Values are kept in compact arrays until the sidecar is written. The
+        sidecar is written to a temporary directory that is moved in place
+        when all columns are saved.
+
+        Args:
+            sidecar_path (str): Where to store the sidecar
+            fingerprint (str): Fingerprint of the vcf
+            variant_type (str): 'snv' or 'sv'
+    """
+    def __init__(self, sidecar_path, fingerprint, variant_type):
+        super(SidecarWriter, self).__init__()
+        self.sidecar_path = sidecar_path
+        self.meta = {
+            'fingerprint': fingerprint,
+            'variant_type': variant_type,
+            'consequences': list(SO_TERMS),
+            'version': SIDECAR_VERSION,
+        }
+        self._codes = dict((name, {}) for name in VOCABULARIES)
+        self._columns = dict((name, _Column(dtype))
+                             for name, dtype in COLUMNS)
+        self._columns['gene_offsets'].append(0)
+        self._prev_position = None
+        self._at_pos = 0
+
+    def _code(self, vocabulary, value):
+        """Return the code of a value, -1 if the value is missing"""
+        if value is None:
+            return -1
+        codes = self._codes[vocabulary]
+        if value not in codes:
+            codes[value] = len(codes)
+        return codes[value]
+
+    def _bitmask(self, vocabulary, values):
+        """Return a bitmask with one bit per value in a vocabulary"""
+        mask = 0
+        for value in values:
+            code = self._code(vocabulary, value)
+            if code >= MAX_BITS:
+                raise ValueError("More than {0} {1} are not supported".format(
+                    MAX_BITS, vocabulary))
+            mask |= 1 << code
+        return mask
+
+    def add(self, record, chrom, pos, variant_obj, byte_offset=None):
+        """Add a variant
+
+            Args:
+                record (int): The 1-based number of the record in the vcf
+                chrom (str): The chromosome as written in the vcf
+                pos (int): The position of the record
+                variant_obj (puzzle.models.Variant): A formatted variant
+                byte_offset (int): Where the record starts in a plain vcf
+        """
+        columns = self._columns
+        columns['record'].append(record)
+        columns['chrom'].append(self._code('chroms', chrom))
+        columns['pos'].append(pos)
+        if (chrom, pos) == self._prev_position:
+            self._at_pos += 1
+        else:
+            self._prev_position = (chrom, pos)
+            self._at_pos = 1
+        columns['at_pos'].append(self._at_pos)
+        columns['byte_offset'].append(
+            -1 if byte_offset is None else byte_offset)
+        columns['start'].append(variant_obj.start)
+        columns['end'].append(variant_obj.stop)
+        columns['max_freq'].append(_to_float(variant_obj.max_freq))
+        columns['cadd_score'].append(_to_float(variant_obj.cadd_score))
+        columns['rank_score'].append(_to_float(variant_obj.rank_score))
+        columns['impact_severity'].append(
+            self._code('impact_severities', variant_obj.impact_severity))
+
+        consequences = 0
+        for consequence in variant_obj.consequences:
+            if consequence in SO_TERMS:
+                consequences |= 1 << SO_TERMS.index(consequence)
+        columns['consequences'].append(consequences)
+
+        columns['genetic_models'].append(
+            self._bitmask('genetic_models', variant_obj.genetic_models))
+        columns['sv_type'].append(self._code('sv_types', variant_obj.sv_type))
+        columns['sv_len'].append(_to_float(variant_obj.sv_len))
+
+        for gene_symbol in variant_obj.gene_symbols:
+            columns['gene_codes'].append(self._code('genes', gene_symbol))
+        columns['gene_offsets'].append(len(columns['gene_codes']))
+
+    def close(self):
+        """Write the sidecar to disk
+
+            Returns:
+                sidecar (VariantSidecar)
+        """
+        tmp_path = "{0}.{1}.tmp".format(self.sidecar_path, os.getpid())
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+
+        for name, _ in COLUMNS:
+            values = self._columns[name].to_array()
+            np.save(os.path.join(tmp_path, "{0}.npy".format(name)), values)
+
+        meta = dict(self.meta)
+        for vocabulary in VOCABULARIES:
+            codes = self._codes[vocabulary]
+            meta[vocabulary] = sorted(codes, key=codes.get)
+        with open(os.path.join(tmp_path, META_FILE), 'w') as handle:
+            json.dump(meta, handle)
+
+        if os.path.exists(self.sidecar_path):
+            shutil.rmtree(self.sidecar_path)
+        os.rename(tmp_path, self.sidecar_path)
+        logger.debug("Sidecar written to {0}".format(self.sidecar_path))
+        return VariantSidecar(self.sidecar_path)
+
+
+class VariantSidecar(object):
+    """Columnar store with the values that variants are filtered on
+
+        The columns are memory mapped and filters are evaluated on all
+        variants at once.
+
+        Args:
+            sidecar_path (str): Path to the sidecar directory
+    """
+    def __init__(self, sidecar_path):
+        super(VariantSidecar, self).__init__()
+        self.sidecar_path = sidecar_path
+        with open(os.path.join(sidecar_path, META_FILE), 'r') as handle:
+            self.meta = json.load(handle)
+        self._columns = {}
+
+    @property
+    def fingerprint(self):
+        """Return the fingerprint of the vcf when the sidecar was built"""
+        return self.meta['fingerprint']
+
+    @property
+    def version(self):
+        """Return the version of the sidecar format"""
+        return self.meta.get('version', 1)
+
+    @property
+    def variant_type(self):
+        """Return the variant type of the vcf"""
+        return self.meta['variant_type']
+
+    def column(self, name):
+        """Return a memory mapped column"""
+        if name not in self._columns:
+            column_path = os.path.join(self.sidecar_path,
+                                       "{0}.npy".format(name))
+            self._columns[name] = np.load(column_path, mmap_mode='r')
+        return self._columns[name]
+
+    def __len__(self):
+        return len(self.column('record'))
+
+    def offsets(self, records):
+        """Return where records are in the vcf
+
+            Args:
+                records (numpy.ndarray): 1-based record numbers
+
+            Returns:
+                offsets (list): (record, chrom, pos, at_pos, byte_offset)
+                                tuples, the offsets of OffsetMixin. The
+                                byte offset is None for compressed vcfs
+        """
+        rows = np.asarray(records, dtype=np.int64) - 1
+        chroms = self.meta['chroms']
+        return [
+            (int(record), chroms[chrom], int(pos), int(at_pos),
+             int(byte_offset) if byte_offset >= 0 else None)
+            for record, chrom, pos, at_pos, byte_offset in zip(
+                records, self.column('chrom')[rows],
+                self.column('pos')[rows], self.column('at_pos')[rows],
+                self.column('byte_offset')[rows])
+        ]
+
+    def _codes(self, vocabulary, values):
+        """Return the codes for the values that are in a vocabulary"""
+        vocabulary = self.meta[vocabulary]
+        return [vocabulary.index(value) for value in values
+                if value in vocabulary]
+
+    def _bitmask(self, vocabulary, values):
+        """Return a bitmask for the values that are in a vocabulary"""
+        mask = 0
+        for code in self._codes(vocabulary, values):
+            mask |= 1 << code
+        return np.uint64(mask)
+
+    def _gene_mask(self, gene_symbols):
+        """Return a mask of the variants in any of the genes"""
+        is_selected = np.zeros(len(self.meta['genes']), dtype=bool)
+        is_selected[self._codes('genes', gene_symbols)] = True
+
+        hits = is_selected[self.column('gene_codes')]
+        hit_counts = np.concatenate(([0], np.cumsum(hits)))
+        offsets = self.column('gene_offsets')
+        return hit_counts[offsets[1:]] > hit_counts[offsets[:-1]]
+
+    def filter(self, filters):
+        """Return the record numbers of the variants that follow the filters
+
+            Args:
+                filters (dict): A dictionary with filters, the same filters
+                                as for VcfPlugin.variants
+
+            Returns:
+                records (numpy.ndarray): Sorted 1-based record numbers
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        # Comparisons with NaN are False, that is missing values
+        with np.errstate(invalid='ignore'):
+            if filters.get('gene_ids'):
+                genes = set(gene_id.strip() for gene_id in filters['gene_ids'])
+                mask &= self._gene_mask(genes)
+
+            if filters.get('consequence'):
+                bits = self._bitmask('consequences', filters['consequence'])
+                mask &= (self.column('consequences') & bits) != 0
+
+            if filters.get('sv_types'):
+                codes = self._codes('sv_types', filters['sv_types'])
+                mask &= np.in1d(self.column('sv_type'), codes)
+
+            if filters.get('impact_severities'):
+                codes = self._codes('impact_severities',
+                                    filters['impact_severities'])
+                mask &= np.in1d(self.column('impact_severity'), codes)
+
+            if filters.get('frequency'):
+                frequency = float(filters['frequency'])
+                mask &= ~(self.column('max_freq') > frequency)
+
+            if filters.get('cadd'):
+                cadd = float(filters['cadd'])
+                mask &= self.column('cadd_score') >= cadd
+
+            if filters.get('genetic_models'):
+                bits = self._bitmask('genetic_models',
+                                     filters['genetic_models'])
+                mask &= (self.column('genetic_models') & bits) != 0
+
+            if filters.get('sv_len'):
+                sv_len = float(filters['sv_len'])
+                mask &= self.column('sv_len') >= sv_len
+
+        if filters.get('range'):
+            region = filters['range']
+            codes = self._codes('chroms', [region['chromosome']])
+            mask &= np.in1d(self.column('chrom'), codes)
+            mask &= self.column('start') < int(region['end'])
+            mask &= self.column('end') >= int(region['start'])
+
+        return self.column('record')[mask]
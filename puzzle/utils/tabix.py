@@ -0,0 +1,441 @@
+import gzip
+import hashlib
+import heapq
+import itertools
+import logging
+import os
+import struct
+import tempfile
+from collections import OrderedDict
+
+from .bgzf import BgzfWriter
+
+logger = logging.getLogger(__name__)
+
+TABIX_MAGIC = b'TBI\x01'
+# The number of bytes of records that are sorted in memory
+SORT_BUFFER_SIZE = 32 * 1024 * 1024
+
+
+def get_tabix_path(vcf_file_path):
+    """Return the path to the tabix index of a vcf
+
+        Args:
+            vcf_file_path (str): Path to vcf
+
+        Returns:
+            tabix_path (str): Path to the index or None if it does not exist
+    """
+    tabix_path = '.'.join([vcf_file_path, 'tbi'])
+    if os.path.exists(tabix_path):
+        return tabix_path
+    return None
+
+
+def get_tabix_contigs(vcf_file_path):
+    """Return the contigs of a tabix indexed vcf
+
+        The contigs are read from the header of the tabix index and are
+        returned in the same order as they appear in the vcf.
+
+        Args:
+            vcf_file_path (str): Path to vcf
+
+        Returns:
+            contigs (list(str)): The contig names, empty if no index is found
+    """
+    tabix_path = get_tabix_path(vcf_file_path)
+    if not tabix_path:
+        logger.debug("No tabix index found for {0}".format(vcf_file_path))
+        return []
+
+    with gzip.open(tabix_path, 'rb') as handle:
+        magic = handle.read(4)
+        if magic != TABIX_MAGIC:
+            raise IOError("{0} is not a tabix index".format(tabix_path))
+        # n_ref, format, col_seq, col_beg, col_end, meta, skip, l_nm
+        header = struct.unpack('<8i', handle.read(32))
+        names = handle.read(header[-1])
+
+    contigs = [name.decode('utf-8') for name in names.split(b'\x00') if name]
+    return contigs
+
+
+def get_tabix_extents(vcf_file_path):
+    """Return how far the records of each contig of a tabix indexed vcf reach
+
+        The extent is read from the linear index of the contig, it is the
+        end of the last 16 kb window that has a record.
+
+        Args:
+            vcf_file_path (str): Path to vcf
+
+        Returns:
+            extents (OrderedDict): contig -> extent, in the same order as
+                                   the contigs appear in the vcf
+    """
+    extents = OrderedDict()
+    tabix_path = get_tabix_path(vcf_file_path)
+    if not tabix_path:
+        logger.debug("No tabix index found for {0}".format(vcf_file_path))
+        return extents
+
+    with gzip.open(tabix_path, 'rb') as handle:
+        magic = handle.read(4)
+        if magic != TABIX_MAGIC:
+            raise IOError("{0} is not a tabix index".format(tabix_path))
+        header = struct.unpack('<8i', handle.read(32))
+        names = handle.read(header[-1])
+        contigs = [name.decode('utf-8') for name in names.split(b'\x00')
+                   if name]
+
+        for contig in contigs:
+            nr_of_bins = struct.unpack('<i', handle.read(4))[0]
+            for _ in range(nr_of_bins):
+                # Each chunk is two virtual offsets
+                nr_of_chunks = struct.unpack('<Ii', handle.read(8))[1]
+                handle.read(16 * nr_of_chunks)
+            nr_of_windows = struct.unpack('<i', handle.read(4))[0]
+            handle.read(8 * nr_of_windows)
+            extents[contig] = nr_of_windows << 14
+
+    return extents
+
+
+def reg2bin(beg, end):
+    """Return the smallest bin of the tabix binning scheme that holds a region
+
+        Args:
+            beg (int): 0-based start
+            end (int): 0-based end, exclusive
+
+        Returns:
+            bin (int)
+    """
+    end -= 1
+    for shift, first_bin in ((14, 4681), (17, 585), (20, 73), (23, 9),
+                             (26, 1)):
+        if beg >> shift == end >> shift:
+            return first_bin + (beg >> shift)
+    return 0
+
+
+def _record_interval(line):
+    """Return the contig and the 0-based interval of a vcf record
+
+        The end is the END of the INFO field if there is one, like for
+        structural variants, otherwise the end of the reference allele.
+    """
+    fields = line.split(b'\t', 8)
+    chrom = fields[0]
+    beg = int(fields[1]) - 1
+    end = beg + len(fields[3])
+    for info in fields[7].split(b';'):
+        if info.startswith(b'END='):
+            try:
+                end = max(end, int(info[4:]))
+            except ValueError:
+                pass
+            break
+    return chrom, beg, max(end, beg + 1)
+
+
+def _natural_key(chrom):
+    """Sort numbered chromosomes before the named ones"""
+    name = chrom[3:] if chrom.lower().startswith(b'chr') else chrom
+    if name.isdigit():
+        return (0, int(name), b'')
+    return (1, 0, name)
+
+
+def _contig_order(header_lines):
+    """Return the rank of the contigs in the ##contig lines of a header"""
+    order = {}
+    for line in header_lines:
+        if line.startswith(b'##contig=<'):
+            for field in line.rstrip()[10:-1].split(b','):
+                if field.startswith(b'ID='):
+                    order.setdefault(field[3:], len(order))
+    return order
+
+
+def _open_vcf(vcf_file_path):
+    if vcf_file_path.endswith('.gz'):
+        return gzip.open(vcf_file_path, 'rb')
+    return open(vcf_file_path, 'rb')
+
+
+def _is_sorted(vcf_file_path):
+    """Check that the contigs are in blocks and the positions are sorted"""
+    seen = set()
+    prev_chrom = None
+    prev_pos = 0
+    with _open_vcf(vcf_file_path) as handle:
+        for line in handle:
+            if line.startswith(b'#'):
+                continue
+            chrom, raw_pos = line.split(b'\t', 2)[:2]
+            pos = int(raw_pos)
+            if chrom != prev_chrom:
+                if chrom in seen:
+                    return False
+                seen.add(chrom)
+                prev_chrom = chrom
+            elif pos < prev_pos:
+                return False
+            prev_pos = pos
+    return True
+
+
+def _terminated(lines):
+    """Yield lines that all end with a newline
+
+        The last record of a vcf may have no newline, it has to get one
+        before the records are sorted, or it is joined with the record
+        that is sorted after it.
+    """
+    for line in lines:
+        if not line.endswith(b'\n'):
+            line += b'\n'
+        yield line
+
+
+def _chunks(lines, buffer_size):
+    """Yield lists of lines of about buffer_size bytes"""
+    chunk = []
+    size = 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= buffer_size:
+            yield chunk
+            chunk = []
+            size = 0
+    if chunk:
+        yield chunk
+
+
+def _sorted_records(handle, contig_order, buffer_size):
+    """Yield the records of a vcf sorted on contig and position
+
+        The records are sorted in chunks that are kept in temporary files
+        and merged, so that large files can be sorted. Records on the same
+        position keep their order.
+
+        Args:
+            handle (file): An open vcf, positioned after the header
+            contig_order (dict): The rank of the contigs in the header,
+                                 other contigs are sorted after them
+            buffer_size (int): The number of bytes of records to sort in
+                               memory
+    """
+    def sort_key(line):
+        chrom, raw_pos = line.split(b'\t', 2)[:2]
+        return (contig_order.get(chrom, len(contig_order)),
+                _natural_key(chrom), int(raw_pos))
+
+    chunk_files = []
+    try:
+        for chunk in _chunks(handle, buffer_size):
+            chunk.sort(key=sort_key)
+            chunk_file = tempfile.TemporaryFile()
+            chunk_file.writelines(chunk)
+            chunk_file.seek(0)
+            chunk_files.append(chunk_file)
+
+        def decorated(number, sorted_file):
+            for line_number, line in enumerate(sorted_file):
+                yield sort_key(line), number, line_number, line
+
+        merged = heapq.merge(*[decorated(number, sorted_file) for
+                               number, sorted_file in enumerate(chunk_files)])
+        for record in merged:
+            yield record[-1]
+    finally:
+        for chunk_file in chunk_files:
+            chunk_file.close()
+
+
+def bgzip_vcf(vcf_file_path, out_path, buffer_size=SORT_BUFFER_SIZE):
+    """Write a vcf as a sorted bgzip file with a tabix index
+
+        Unsorted vcfs are sorted on contig and position, the contigs in the
+        order of the ##contig lines of the header. The files are written to
+        temporary paths and moved in place when they are done, the temporary
+        files are removed if the vcf can not be written.
+
+        Args:
+            vcf_file_path (str): Path to a plain or gzipped vcf
+            out_path (str): Where to write the bgzipped vcf, the index is
+                            written to out_path.tbi
+            buffer_size (int): The number of bytes of records to sort in
+                               memory
+
+        Returns:
+            out_path (str)
+    """
+    logger.info("Writing {0} as {1} with a tabix index".format(
+        vcf_file_path, out_path))
+    out_dir = os.path.dirname(out_path)
+    if out_dir and not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+
+    tmp_path = "{0}.{1}.tmp".format(out_path, os.getpid())
+    tmp_tabix_path = "{0}.tbi.{1}.tmp".format(out_path, os.getpid())
+    is_sorted = _is_sorted(vcf_file_path)
+    if not is_sorted:
+        logger.info("Sorting the records of {0}".format(vcf_file_path))
+
+    try:
+        indexer = _TabixIndexer()
+        with _open_vcf(vcf_file_path) as handle, \
+                BgzfWriter(tmp_path) as writer:
+            header = []
+            line = None
+            for line in handle:
+                if not line.startswith(b'#'):
+                    break
+                header.append(line)
+                writer.write(line)
+            else:
+                line = None
+
+            records = _terminated(
+                itertools.chain([line] if line else [], handle))
+            if not is_sorted:
+                records = _sorted_records(records, _contig_order(header),
+                                          buffer_size)
+            for line in records:
+                start = writer.tell()
+                writer.write(line)
+                indexer.add(_record_interval(line), start, writer.tell())
+
+        indexer.write(tmp_tabix_path)
+        os.rename(tmp_path, out_path)
+        os.rename(tmp_tabix_path, "{0}.tbi".format(out_path))
+    except Exception:
+        # Do not leave partial files behind when a vcf can not be indexed
+        for path in (tmp_path, tmp_tabix_path):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return out_path
+
+
+class _TabixIndexer(object):
+    """Collect the bins and the linear index of a tabix index"""
+
+    def __init__(self):
+        super(_TabixIndexer, self).__init__()
+        self.names = []
+        # The bins, with their chunks, and the linear index of each contig
+        self.bins = []
+        self.linear = []
+        self._prev_bin = None
+
+    def add(self, interval, start, end):
+        """Add a record
+
+            Args:
+                interval (tuple): The contig, 0-based start and end
+                start (int): Virtual offset of the record
+                end (int): Virtual offset after the record
+        """
+        chrom, beg, stop = interval
+        if not self.names or self.names[-1] != chrom:
+            if chrom in self.names:
+                raise ValueError("The records of {0} are not in one "
+                                 "block".format(chrom))
+            self.names.append(chrom)
+            self.bins.append(OrderedDict())
+            self.linear.append([])
+            self._prev_bin = None
+
+        record_bin = reg2bin(beg, stop)
+        chunks = self.bins[-1].setdefault(record_bin, [])
+        if record_bin == self._prev_bin and chunks[-1][1] == start:
+            chunks[-1][1] = end
+        else:
+            chunks.append([start, end])
+        self._prev_bin = record_bin
+
+        linear = self.linear[-1]
+        last_window = (stop - 1) >> 14
+        if len(linear) <= last_window:
+            linear.extend([None] * (last_window + 1 - len(linear)))
+        for window in range(beg >> 14, last_window + 1):
+            if linear[window] is None:
+                linear[window] = start
+
+    def write(self, tabix_path):
+        names = b''.join(name + b'\x00' for name in self.names)
+        # format 2 is vcf, the columns of chrom, start and end, the meta
+        # character and the number of lines to skip
+        data = [TABIX_MAGIC, struct.pack('<8i', len(self.names), 2, 1, 2, 0,
+                                         ord('#'), 0, len(names)), names]
+        for bins, linear in zip(self.bins, self.linear):
+            data.append(struct.pack('<i', len(bins)))
+            for record_bin, chunks in bins.items():
+                data.append(struct.pack('<Ii', record_bin, len(chunks)))
+                for chunk in chunks:
+                    data.append(struct.pack('<QQ', *chunk))
+
+            # Windows without records point to the next record
+            offsets = []
+            next_offset = 0
+            for offset in reversed(linear):
+                next_offset = offset if offset is not None else next_offset
+                offsets.append(next_offset)
+            offsets.reverse()
+            data.append(struct.pack('<i', len(offsets)))
+            data.append(struct.pack('<{0}Q'.format(len(offsets)), *offsets))
+
+        with BgzfWriter(tabix_path) as writer:
+            writer.write(b''.join(data))
+
+
+def get_bgzip_path(vcf_file_path, out_dir):
+    """Return where the bgzipped copy of a vcf is stored
+
+        The name is based on the absolute path of the vcf so that files with
+        the same name in different directories do not collide.
+
+        Args:
+            vcf_file_path (str): Path to vcf
+            out_dir (str): Directory of the bgzipped vcfs
+
+        Returns:
+            bgzip_path (str)
+    """
+    abs_path = os.path.abspath(vcf_file_path)
+    path_hash = hashlib.sha1(abs_path.encode('utf-8')).hexdigest()[:12]
+    name = os.path.basename(abs_path)
+    for suffix in ('.gz', '.vcf'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return os.path.join(out_dir, "{0}.{1}.vcf.gz".format(name, path_hash))
+
+
+def get_indexed_vcf(vcf_file_path, out_dir):
+    """Return a tabix indexed version of a vcf
+
+        A vcf that already has a tabix index is returned as it is. Other
+        vcfs are bgzipped and indexed into out_dir, the copy is reused as
+        long as it is newer than the vcf.
+
+        Args:
+            vcf_file_path (str): Path to vcf
+            out_dir (str): Directory of the bgzipped vcfs
+
+        Returns:
+            indexed_path (str): Path to the tabix indexed vcf
+    """
+    if vcf_file_path.endswith('.gz') and get_tabix_path(vcf_file_path):
+        return vcf_file_path
+
+    bgzip_path = get_bgzip_path(vcf_file_path, out_dir)
+    if (get_tabix_path(bgzip_path) and os.path.getmtime(bgzip_path) >=
+            os.path.getmtime(vcf_file_path)):
+        logger.debug("Using indexed vcf {0}".format(bgzip_path))
+        return bgzip_path
+    return bgzip_vcf(vcf_file_path, bgzip_path)
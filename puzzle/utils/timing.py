@@ -0,0 +1,73 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def start_recording():
+    """Start to record the spans of the current thread
+
+        Spans are only recorded between start_recording and stop_recording,
+        at other times span and timed only call through.
+    """
+    _local.spans = OrderedDict()
+
+
+def stop_recording():
+    """Stop to record spans and return the recorded spans
+
+        Returns:
+            spans (OrderedDict): The name of each span with the total
+                                 seconds and the number of calls, in the
+                                 order they were first seen
+    """
+    spans = getattr(_local, 'spans', None)
+    _local.spans = None
+    return spans or OrderedDict()
+
+
+def record(name, seconds):
+    """Add the time of a call to a span if spans are recorded"""
+    spans = getattr(_local, 'spans', None)
+    if spans is None:
+        return
+    total, calls = spans.get(name, (0.0, 0))
+    spans[name] = (total + seconds, calls + 1)
+
+
+@contextmanager
+def span(name):
+    """Record the time of a with block as a span"""
+    if getattr(_local, 'spans', None) is None:
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        record(name, time.time() - start)
+
+
+def timed(name):
+    """Decorate a function to record its calls as a span
+
+        Example:
+        @timed('gene_info')
+        def get_gene_info(ensembl_ids=None, hgnc_symbols=None):
+            ...
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, 'spans', None) is None:
+                return function(*args, **kwargs)
+            start = time.time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, time.time() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,155 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+
+from contextlib import closing
+
+from cyvcf2 import VCF
+
+from .get_file_info import get_file_fingerprint
+from .get_info import get_variant_id
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = '.pzi'
+DEFAULT_INDEX_DIR = os.path.join(tempfile.gettempdir(), 'puzzle-indexes')
+
+INDEX_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE variant (
+    variant_id TEXT PRIMARY KEY,
+    record INTEGER,
+    chrom TEXT,
+    pos INTEGER
+);
+"""
+
+
+def get_index_path(vcf_file_path, index_dir=None, suffix=INDEX_SUFFIX):
+    """Return the path to the variant index of a vcf
+
+        The name is based on the absolute path of the vcf so that files with
+        the same name in different directories do not collide.
+
+        Args:
+            vcf_file_path (str): Path to vcf
+            index_dir (Optional[str]): Directory where indexes are stored
+            suffix (str): File suffix of the index
+
+        Returns:
+            index_path (str): Path to the index file
+    """
+    index_dir = index_dir or DEFAULT_INDEX_DIR
+    abs_path = os.path.abspath(vcf_file_path)
+    path_hash = hashlib.sha1(abs_path.encode('utf-8')).hexdigest()[:12]
+    file_name = "{0}.{1}{2}".format(os.path.basename(abs_path), path_hash,
+                                    suffix)
+    return os.path.join(index_dir, file_name)
+
+
+def build_variant_index(vcf_file_path, index_path, batch_size=10000):
+    """Build a variant index for a vcf file
+
+        The index maps variant ids to the 1-based record number and the
+        position of the variant. The file is first written to a temporary
+        path and then moved in place so a half built index is never used.
+
+        Args:
+            vcf_file_path (str): Path to vcf
+            index_path (str): Where to store the index
+            batch_size (int): Number of records to insert at a time
+
+        Returns:
+            index (VariantIndex)
+    """
+    logger.info("Building variant index for {0}".format(vcf_file_path))
+    index_dir = os.path.dirname(index_path)
+    if index_dir and not os.path.exists(index_dir):
+        os.makedirs(index_dir)
+
+    tmp_path = "{0}.{1}.tmp".format(index_path, os.getpid())
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    with closing(sqlite3.connect(tmp_path)) as db:
+        db.executescript(INDEX_SCHEMA)
+        batch = []
+        insert = "INSERT OR IGNORE INTO variant VALUES (?, ?, ?, ?)"
+        for record, variant in enumerate(VCF(vcf_file_path), 1):
+            batch.append((get_variant_id(variant), record, variant.CHROM,
+                          variant.POS))
+            if len(batch) >= batch_size:
+                db.executemany(insert, batch)
+                batch = []
+        db.executemany(insert, batch)
+        db.execute("INSERT INTO meta VALUES ('fingerprint', ?)",
+                   (get_file_fingerprint(vcf_file_path),))
+        db.commit()
+
+    os.rename(tmp_path, index_path)
+    logger.debug("Variant index written to {0}".format(index_path))
+    return VariantIndex(index_path)
+
+
+def get_variant_index(vcf_file_path, index_dir=None):
+    """Return an up to date variant index for a vcf
+
+        If no index exists, or if the vcf has changed since the index was
+        built, a new index is built.
+
+        Args:
+            vcf_file_path (str): Path to vcf
+            index_dir (Optional[str]): Directory where indexes are stored
+
+        Returns:
+            index (VariantIndex)
+    """
+    index_path = get_index_path(vcf_file_path, index_dir)
+    if os.path.exists(index_path):
+        index = VariantIndex(index_path)
+        if index.fingerprint == get_file_fingerprint(vcf_file_path):
+            return index
+        logger.info("Variant index {0} is outdated".format(index_path))
+
+    return build_variant_index(vcf_file_path, index_path)
+
+
+class VariantIndex(object):
+    """On-disk index from variant id to the location of the variant
+
+        Args:
+            index_path (str): Path to the index file
+    """
+    def __init__(self, index_path):
+        super(VariantIndex, self).__init__()
+        self.index_path = index_path
+
+    def _connect(self):
+        # sqlite connections can not be shared between threads
+        return closing(sqlite3.connect(self.index_path))
+
+    @property
+    def fingerprint(self):
+        """Return the fingerprint of the vcf when the index was built"""
+        with self._connect() as db:
+            row = db.execute("SELECT value FROM meta WHERE key = "
+                             "'fingerprint'").fetchone()
+        return row[0] if row else None
+
+    def lookup(self, variant_id):
+        """Find where a variant is located
+
+            Args:
+                variant_id (str): A variant id
+
+            Returns:
+                entry (tuple): (record, chrom, pos) or None if not found.
+                               record is the 1-based number of the variant in
+                               the vcf.
+        """
+        with self._connect() as db:
+            row = db.execute("SELECT record, chrom, pos FROM variant WHERE "
+                             "variant_id = ?", (variant_id,)).fetchone()
+        return tuple(row) if row else None
@@ -0,0 +1,122 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from cyvcf2 import VCF
+
+from .get_file_info import get_file_fingerprint
+from .lru import LRUCache
+from .tabix import get_tabix_path
+
+logger = logging.getLogger(__name__)
+
+# The number of vcf files that each thread keeps open
+HANDLES_PER_THREAD = 8
+
+
+class PooledHandle(object):
+    """A cyvcf2 handle that is checked out from a VcfHandlePool
+
+        Args:
+            vcf (cyvcf2.VCF): The open vcf
+            fingerprint (tuple): The fingerprints of the vcf and its index
+                                 when it was opened
+    """
+    def __init__(self, vcf, fingerprint):
+        super(PooledHandle, self).__init__()
+        self.vcf = vcf
+        self.fingerprint = fingerprint
+        self.in_use = False
+
+    def release(self):
+        """Return the handle to the pool"""
+        self.in_use = False
+
+
+class VcfHandlePool(object):
+    """Keep cyvcf2 handles open for region queries
+
+        Each thread has its own handles, a cyvcf2.VCF can not be shared
+        between threads. The tabix index is loaded when a handle is opened
+        and is kept for all region queries on the handle.
+
+        A handle is only used for one query at a time. If the pooled handle
+        of a file is in use a new handle is opened for the query. Handles
+        are opened again when the vcf or its index changes.
+
+        Sequential reads from the start of a file can not be done with a
+        pooled handle, since cyvcf2 can not rewind.
+
+        Args:
+            handles_per_thread (int): The number of files each thread keeps
+                                      open
+    """
+    def __init__(self, handles_per_thread=HANDLES_PER_THREAD):
+        super(VcfHandlePool, self).__init__()
+        self.handles_per_thread = handles_per_thread
+        self._local = threading.local()
+
+    def _handles(self):
+        """Return the handles of the current thread"""
+        handles = getattr(self._local, 'handles', None)
+        if handles is None:
+            handles = LRUCache(self.handles_per_thread)
+            self._local.handles = handles
+        return handles
+
+    @staticmethod
+    def _fingerprint(vcf_file_path):
+        """Return the fingerprints of a vcf and its tabix index"""
+        tabix_path = get_tabix_path(vcf_file_path)
+        return (get_file_fingerprint(vcf_file_path),
+                tabix_path and get_file_fingerprint(tabix_path))
+
+    def acquire(self, vcf_file_path):
+        """Check out a handle for a vcf
+
+            The handle has to be released when the query is done.
+
+            Args:
+                vcf_file_path (str): Path to a vcf
+
+            Returns:
+                handle (PooledHandle)
+        """
+        handles = self._handles()
+        fingerprint = self._fingerprint(vcf_file_path)
+        handle = handles.get(vcf_file_path)
+        if handle is None or handle.fingerprint != fingerprint:
+            logger.debug("Opening pooled handle for {0}".format(
+                vcf_file_path))
+            handle = PooledHandle(VCF(vcf_file_path), fingerprint)
+            handles.set(vcf_file_path, handle)
+        elif handle.in_use:
+            logger.debug("Pooled handle for {0} is in use, opening a new "
+                         "handle".format(vcf_file_path))
+            handle = PooledHandle(VCF(vcf_file_path), fingerprint)
+
+        handle.in_use = True
+        return handle
+
+    @contextmanager
+    def handle(self, vcf_file_path):
+        """Use a pooled handle in a with block
+
+            Args:
+                vcf_file_path (str): Path to a vcf
+
+            Yields:
+                vcf (cyvcf2.VCF)
+        """
+        handle = self.acquire(vcf_file_path)
+        try:
+            yield handle.vcf
+        finally:
+            handle.release()
+
+    def clear(self):
+        """Drop the handles of the current thread"""
+        self._handles().clear()
+
+
+VCF_HANDLES = VcfHandlePool()
@@ -27,6 +27,17 @@ def test():
     run('open htmlcov/index.html')
 
 
+@task
+def bench(sizes='10000,100000,1000000', save=None, compare=None):
+    """bench - measure the variant paths on synthetic variant sources."""
+    command = 'python benchmarks/variant_paths.py --sizes {0}'.format(sizes)
+    if save:
+        command += ' --save {0}'.format(save)
+    if compare:
+        command += ' --compare {0}'.format(compare)
+    run(command, pty=True)
+
+
 @task
 def lint():
     """lint - check style with flake8."""
@@ -1,9 +1,12 @@
+import json
 import os
 import logging
 
 from puzzle.cli import base as cli
 from click.testing import CliRunner
 
+from puzzle.plugins import SqlStore
+
 
 class TestBaseCommand:
     """Test the cli base command"""
@@ -70,6 +73,38 @@ class TestLoadCommand:
 
         assert result.exit_code == 0
 
+    def test_load_command_vcf_with_index(self, puzzle_dir, vcf_file):
+        """Test to load a vcf and build the variant index"""
+
+        logger = logging.getLogger("test_load_command_vcf_with_index")
+        runner = CliRunner()
+        logger.debug("Test load a vcf and build the variant index")
+        result = runner.invoke(cli, ['load','--root', puzzle_dir, '--index',
+                                     vcf_file])
+
+        assert result.exit_code == 0
+        index_files = os.listdir(os.path.join(puzzle_dir, 'indexes'))
+        assert [name for name in index_files if name.endswith('.pzi')]
+        assert [name for name in index_files if name.endswith('.pzc')]
+
+    def test_load_command_vcf_with_tabix(self, puzzle_dir, vcf_file):
+        """Test to load a vcf and bgzip and index it into the root"""
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ['load','--root', puzzle_dir, '--tabix',
+                                     vcf_file])
+
+        assert result.exit_code == 0
+        vcf_files = os.listdir(os.path.join(puzzle_dir, 'vcfs'))
+        assert [name for name in vcf_files if name.endswith('.vcf.gz')]
+        assert [name for name in vcf_files if name.endswith('.vcf.gz.tbi')]
+
+        store = SqlStore(os.path.join(puzzle_dir, 'puzzle_db.sqlite3'))
+        case_obj = store.cases()[0]
+        assert case_obj.tabix_index
+        assert case_obj.variant_source.startswith(
+            os.path.join(puzzle_dir, 'vcfs'))
+
     def test_load_command_gemini(self, puzzle_dir, gemini_db_path):
         """Test to load a gemini db"""
 
@@ -217,3 +252,89 @@ class TestDeleteCommand:
 
         assert result.exit_code == 1
 
+
+class InlinePool(object):
+    """Filter the shards in the test process and count the held results"""
+
+    def __init__(self):
+        self.submitted = 0
+        self.held = 0
+        self.max_held = 0
+
+    def apply_async(self, function, args):
+        self.submitted += 1
+        self.held += 1
+        self.max_held = max(self.max_held, self.held)
+        return InlineResult(self, function(*args))
+
+
+class InlineResult(object):
+
+    def __init__(self, pool, value):
+        self.pool = pool
+        self.value = value
+
+    def get(self):
+        self.pool.held -= 1
+        return self.value
+
+
+class TestExportCommand:
+    """Test the cli export command"""
+
+    def _export(self, tmpdir, arguments):
+        outfile = str(tmpdir.join('export.txt'))
+        runner = CliRunner()
+        result = runner.invoke(cli, ['export', '-o', outfile] + arguments)
+        assert result.exit_code == 0
+        with open(outfile) as handle:
+            return handle.read().splitlines()
+
+    def test_export_tsv(self, vcf_file, tmpdir):
+        lines = self._export(tmpdir, [vcf_file])
+
+        assert lines[0].startswith('#CHROM\tPOS')
+        assert len(lines) == 109
+
+    def test_export_filters(self, vcf_file, tmpdir):
+        lines = self._export(tmpdir, [vcf_file, '--format', 'json',
+                                      '--impact-severity', 'HIGH'])
+
+        variants = [json.loads(line) for line in lines]
+        assert variants
+        for variant in variants:
+            assert variant['impact_severity'] == 'HIGH'
+
+    def test_export_vcf_processes(self, indexed_vcf_file, tmpdir):
+        lines = self._export(tmpdir, [indexed_vcf_file, '--format', 'vcf',
+                                      '--processes', '2'])
+
+        records = [line for line in lines if not line.startswith('#')]
+        assert lines[0] == '##fileformat=VCFv4.2'
+        assert len(records) == 108
+        assert records[0].split('\t')[:2] == ['1', '1771129']
+
+    def test_export_processes_holds_few_regions(self, indexed_vcf_file,
+                                                tmpdir, monkeypatch):
+        from puzzle.plugins.vcf.mixins import shard_mixin
+        pool = InlinePool()
+        monkeypatch.setattr(shard_mixin, 'get_shard_pool',
+                            lambda processes: pool)
+
+        lines = self._export(tmpdir, [indexed_vcf_file, '--processes', '2'])
+
+        assert len(lines) == 109
+        assert pool.submitted > 2 * shard_mixin.SHARDS_AHEAD
+        assert pool.max_held <= 2 * shard_mixin.SHARDS_AHEAD
+
+    def test_export_database(self, populated_puzzle_db, case_obj, tmpdir):
+        lines = self._export(tmpdir, ['--root', populated_puzzle_db,
+                                      '--case-id', case_obj.case_id])
+
+        assert len(lines) == 109
+
+    def test_export_database_no_case(self, populated_puzzle_db):
+        runner = CliRunner()
+        result = runner.invoke(cli, ['export', '--root', populated_puzzle_db])
+
+        assert result.exit_code == 1
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from puzzle.models import Transcript, Genotype
+
+
+def test_transcript_access():
+    transcript = Transcript(hgnc_symbol='ADK', transcript_id='1',
+                            consequence='missense_variant')
+
+    assert transcript.hgnc_symbol == transcript['hgnc_symbol'] == 'ADK'
+    assert transcript.get('sift') is None
+    assert transcript.get('unknown', 'default') == 'default'
+    assert transcript.unknown is None
+    assert 'consequence' in transcript
+    assert 'unknown' not in transcript
+
+
+def test_transcript_set():
+    transcript = Transcript(hgnc_symbol='ADK', transcript_id='1',
+                            consequence='missense_variant')
+    transcript['sift'] = 'deleterious'
+    transcript.polyphen = 'benign'
+
+    assert transcript.sift == 'deleterious'
+    assert transcript['polyphen'] == 'benign'
+    with pytest.raises(KeyError):
+        transcript['unknown'] = 1
+    with pytest.raises(AttributeError):
+        transcript.unknown = 1
+
+
+def test_record_has_no_dict():
+    genotype = Genotype(sample_id='ADM1059A1', genotype='0/1', phenotype='2')
+
+    assert not hasattr(genotype, '__dict__')
+    assert genotype.is_affected
+    assert genotype.to_dict() == dict(genotype.items())
+    assert genotype == genotype.to_dict()
@@ -106,4 +106,24 @@ class TestTranscripts:
         assert first_transcript.biotype == 'protein_coding'
         assert first_transcript.sift == 'deleterious'
         assert first_transcript.polyphen == 'probably_damaging'
-    
\ No newline at end of file
+    
+    def test_get_transcripts(self, gemini_case_obj):
+        adapter = GeminiPlugin()
+        adapter.add_case(gemini_case_obj)
+        adapter.db = gemini_case_obj.variant_source
+
+        transcripts = adapter._get_transcripts([1, 2])
+
+        assert len(transcripts[1]) == 2
+        assert transcripts[1][0].transcript_id == 'ENST00000370383'
+
+    def test_add_fetched_transcripts(self, gemini_case_obj, variant):
+        adapter = GeminiPlugin()
+        adapter.add_case(gemini_case_obj)
+        adapter.db = gemini_case_obj.variant_source
+
+        gemini_variant = {'variant_id': 1}
+        transcripts = adapter._get_transcripts([1])[1]
+        adapter._add_transcripts(variant, gemini_variant, transcripts)
+
+        assert variant.transcripts == transcripts
@@ -250,3 +250,27 @@ class TestFilters:
             assert variant_obj.stop <= end
         
         assert nr_of_variants == 1
+
+def test_get_variants_cursor(gemini_case_obj):
+    """Test to page through the variants with a cursor"""
+    plugin = GeminiPlugin()
+    plugin.add_case(gemini_case_obj)
+
+    variant_ids = []
+    cursor = None
+    while True:
+        result = plugin.variants('643594', count=5, cursor=cursor)
+        variant_ids.extend(variant.variant_id for variant in result.variants)
+        cursor = result.cursor
+        if not cursor:
+            break
+
+    assert len(variant_ids) == 14
+    assert variant_ids == sorted(set(variant_ids))
+
+def test_consequence_clause():
+    plugin = GeminiPlugin()
+    clause = plugin._consequence_clause('stop_gained')
+
+    assert "i.impact_so = 'stop_gained'" in clause
+    assert "i.impact_so LIKE '%&stop_gained&%'" in clause
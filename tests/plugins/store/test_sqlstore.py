@@ -10,3 +10,45 @@ def test_select_plugin(test_db, case_obj):
     plugin, case_id = test_db.select_plugin(case_obj)
     assert isinstance(plugin, VcfPlugin)
     assert case_id == case_obj.case_id
+
+
+def test_select_plugin_reused(test_db, case_obj):
+    plugin, case_id = test_db.select_plugin(case_obj)
+    same_plugin, _ = test_db.select_plugin(case_obj)
+    assert same_plugin is plugin
+
+    # the plugin is built again when the case changes
+    case_obj.name = 'renamed'
+    new_plugin, _ = test_db.select_plugin(case_obj)
+    assert new_plugin is not plugin
+    assert new_plugin.case(case_id).name == 'renamed'
+
+
+def test_select_plugin_source_changed(test_db, case_obj, monkeypatch):
+    plugin, case_id = test_db.select_plugin(case_obj)
+    monkeypatch.setattr('puzzle.plugins.sql.store.get_file_fingerprint',
+                        lambda path: 'changed')
+    new_plugin, _ = test_db.select_plugin(case_obj)
+    assert new_plugin is not plugin
+
+
+def test_invalidate_plugin(test_db, case_obj):
+    plugin, case_id = test_db.select_plugin(case_obj)
+    test_db.invalidate_plugin(case_id)
+    new_plugin, _ = test_db.select_plugin(case_obj)
+    assert new_plugin is not plugin
+
+
+def test_variants_from_cached_result(test_db, case_obj, monkeypatch):
+    filters = {'impact_severities': ['HIGH']}
+    expected = test_db.variants(case_obj.case_id, filters=filters).variants
+    plugin, case_id = test_db.select_plugin(case_obj)
+    plugin.count_variants(case_id, test_db._add_gene_lists(filters))
+
+    def scan(*args, **kwargs):
+        raise AssertionError("the variants should not be scanned")
+
+    monkeypatch.setattr(plugin, 'variants', scan)
+    result = test_db.variants(case_obj.case_id, filters=filters)
+    assert ([variant.variant_id for variant in result.variants] ==
+            [variant.variant_id for variant in expected])
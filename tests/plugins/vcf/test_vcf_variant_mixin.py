@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 from puzzle.plugins import VcfPlugin
+from puzzle.utils.counter import VARIANT_COUNTS
+from puzzle.utils.result_cache import VARIANT_RESULTS
 
 
 def test_variants_case(case_obj):
@@ -194,3 +196,435 @@ class TestFilters:
             assert variant_obj.stop <= end
         
         assert nr_of_variants == 1
+
+    def test_filters_gene_ids_tabix(self, case_obj, indexed_vcf_file):
+        plugin = VcfPlugin()
+        plugin.add_case(case_obj)
+        filters = {'gene_ids': ['POF1B', 'TECTA', 'AR', 'ADK']}
+        expected = [variant_obj.variant_id for variant_obj in
+                    plugin.variants(case_obj.case_id, filters=filters).variants]
+
+        case_obj.variant_source = indexed_vcf_file
+        case_obj.compressed = True
+        case_obj.tabix_index = True
+        plugin = VcfPlugin()
+        plugin.add_case(case_obj)
+        assert plugin._gene_regions(indexed_vcf_file, filters)
+
+        result = plugin.variants(case_obj.case_id, filters=filters)
+        assert (sorted(variant_obj.variant_id for variant_obj in
+                       result.variants) == sorted(expected))
+
+        # One variant at a time, resumed from the cursor
+        variant_ids = []
+        cursor = None
+        while True:
+            result = plugin.variants(case_obj.case_id, filters=filters,
+                                     count=1, cursor=cursor)
+            variant_ids.extend(variant_obj.variant_id for variant_obj
+                               in result.variants)
+            cursor = result.cursor
+            if not cursor:
+                break
+        assert sorted(variant_ids) == sorted(expected)
+
+class TestCursor:
+
+    def _pages(self, plugin, case_id, filters, count):
+        """Fetch all pages by following the cursors"""
+        pages = []
+        cursor = None
+        while True:
+            result = plugin.variants(case_id, filters=filters, count=count,
+                                     cursor=cursor)
+            pages.append(result.variants)
+            cursor = result.cursor
+            if cursor is None:
+                return pages
+
+    def test_cursor_pages(self, case_obj):
+        plugin = VcfPlugin()
+        plugin.add_case(case_obj)
+        case_id = case_obj.case_id
+
+        all_variants = plugin.variants(case_id, count=1000).variants
+        pages = self._pages(plugin, case_id, filters={}, count=10)
+
+        assert len(pages) == 11
+        variants = [variant for page in pages for variant in page]
+        assert ([variant.variant_id for variant in variants] ==
+                [variant.variant_id for variant in all_variants])
+        assert ([variant.index for variant in variants] ==
+                [variant.index for variant in all_variants])
+
+    def test_cursor_pages_filters(self, case_obj):
+        plugin = VcfPlugin()
+        plugin.add_case(case_obj)
+        case_id = case_obj.case_id
+
+        filters = {'frequency': '0.001'}
+        all_variants = plugin.variants(case_id, filters=filters,
+                                       count=1000).variants
+        pages = self._pages(plugin, case_id, filters=filters, count=7)
+
+        variants = [variant for page in pages for variant in page]
+        assert ([variant.variant_id for variant in variants] ==
+                [variant.variant_id for variant in all_variants])
+
+    def test_cursor_pages_tabix(self, case_obj, indexed_vcf_file):
+        case_obj.variant_source = indexed_vcf_file
+        case_obj.compressed = True
+        case_obj.tabix_index = True
+        plugin = VcfPlugin()
+        plugin.add_case(case_obj)
+        case_id = case_obj.case_id
+
+        all_variants = plugin.variants(case_id, count=1000).variants
+        pages = self._pages(plugin, case_id, filters={}, count=4)
+
+        variants = [variant for page in pages for variant in page]
+        assert ([variant.variant_id for variant in variants] ==
+                [variant.variant_id for variant in all_variants])
+        assert ([variant.index for variant in variants] ==
+                [variant.index for variant in all_variants])
+
+    def test_skip_counts_filtered_variants(self, case_obj):
+        plugin = VcfPlugin()
+        plugin.add_case(case_obj)
+        case_id = case_obj.case_id
+
+        filters = {'cadd': '20'}
+        all_variants = plugin.variants(case_id, filters=filters,
+                                       count=1000).variants
+        result = plugin.variants(case_id, filters=filters, skip=10, count=5)
+
+        assert ([variant.variant_id for variant in result.variants] ==
+                [variant.variant_id for variant in all_variants[10:15]])
+
+
+class TestSidecar:
+
+    def _plugin(self, case_obj, index_dir):
+        vcf_plugin = VcfPlugin()
+        vcf_plugin.index_dir = index_dir
+        vcf_plugin.add_case(case_obj)
+        return vcf_plugin
+
+    def _variant_ids(self, vcf_plugin, case_id, filters, count=1000):
+        result = vcf_plugin.variants(case_id, count=count, filters=filters)
+        return [variant['variant_id'] for variant in result.variants]
+
+    def test_sidecar_gives_same_variants(self, case_obj, dir_path):
+        vcf_plugin = self._plugin(case_obj, dir_path)
+        all_filters = [
+            {},
+            {'frequency': '0.01'},
+            {'cadd': '10'},
+            {'consequence': ['missense_variant']},
+            {'gene_ids': ['TECTA', 'AR']},
+            {'impact_severities': ['HIGH', 'MEDIUM']},
+            {'genetic_models': ['AR_hom']},
+        ]
+        expected = [self._variant_ids(vcf_plugin, case_obj.case_id, filters)
+                    for filters in all_filters]
+
+        sidecar = vcf_plugin.build_sidecar(case_obj.variant_source)
+        assert vcf_plugin._get_sidecar(case_obj.variant_source)
+        assert len(sidecar) == 108
+
+        for filters, variant_ids in zip(all_filters, expected):
+            assert self._variant_ids(
+                vcf_plugin, case_obj.case_id, filters) == variant_ids
+
+    def test_sidecar_pages(self, case_obj, dir_path):
+        vcf_plugin = self._plugin(case_obj, dir_path)
+        vcf_plugin.build_sidecar(case_obj.variant_source)
+
+        variant_ids = []
+        cursor = None
+        while True:
+            result = vcf_plugin.variants(case_obj.case_id, count=10,
+                                         cursor=cursor)
+            variant_ids.extend(variant['variant_id']
+                               for variant in result.variants)
+            cursor = result.cursor
+            if not cursor:
+                break
+
+        assert len(variant_ids) == 108
+        assert len(set(variant_ids)) == 108
+
+        result = vcf_plugin.variants(case_obj.case_id, skip=100, count=10)
+        assert [variant['index'] for variant in result.variants] == list(
+            range(101, 109))
+        assert result.cursor is None
+
+    def test_sidecar_reads_only_the_page(self, case_obj, dir_path,
+                                         monkeypatch):
+        vcf_plugin = self._plugin(case_obj, dir_path)
+        vcf_plugin.build_sidecar(case_obj.variant_source)
+        filters = {'impact_severities': ['HIGH', 'MEDIUM']}
+        expected = vcf_plugin.variants(case_obj.case_id, filters=filters,
+                                       count=1000).variants
+
+        def read_from_start(*args):
+            raise AssertionError("The vcf was read from the start")
+        monkeypatch.setattr(vcf_plugin, '_get_records', read_from_start)
+
+        result = vcf_plugin.variants(case_obj.case_id, filters=filters,
+                                     skip=3, count=2)
+        assert ([variant.variant_id for variant in result.variants] ==
+                [variant.variant_id for variant in expected[3:5]])
+
+    def test_sidecar_index(self, case_obj, dir_path):
+        filters = {'impact_severities': ['HIGH', 'MEDIUM']}
+        scanned = self._plugin(case_obj, dir_path).variants(
+            case_obj.case_id, filters=filters, count=1000).variants
+
+        vcf_plugin = self._plugin(case_obj, dir_path)
+        vcf_plugin.build_sidecar(case_obj.variant_source)
+        variants = vcf_plugin.variants(case_obj.case_id, filters=filters,
+                                       count=1000).variants
+
+        # The index is the place of the variant in the filtered result
+        assert [variant.index for variant in variants] == list(
+            range(1, len(variants) + 1))
+        assert ([variant.index for variant in variants] ==
+                [variant.index for variant in scanned])
+
+    def test_sidecar_count(self, case_obj, dir_path):
+        vcf_plugin = self._plugin(case_obj, dir_path)
+        vcf_plugin.build_sidecar(case_obj.variant_source)
+
+        filters = {'impact_severities': ['HIGH']}
+        assert vcf_plugin.count_variants(case_obj.case_id, filters) == len(
+            vcf_plugin.variants(case_obj.case_id, filters=filters).variants)
+
+
+class TestCount:
+
+    def test_count_variants(self, case_obj):
+        vcf_plugin = VcfPlugin()
+        vcf_plugin.add_case(case_obj)
+
+        assert vcf_plugin.count_variants(case_obj.case_id) == 108
+
+        filters = {'impact_severities': ['HIGH']}
+        result = vcf_plugin.variants(case_obj.case_id, filters=filters)
+        assert vcf_plugin.count_variants(
+            case_obj.case_id, filters) == len(result.variants)
+
+    def test_variant_count_in_background(self, case_obj):
+        vcf_plugin = VcfPlugin()
+        vcf_plugin.add_case(case_obj)
+        filters = {'cadd': 20}
+
+        # the first call starts the count
+        nr_of_variants = vcf_plugin.variant_count(case_obj.case_id, filters)
+        VARIANT_COUNTS.wait()
+
+        assert vcf_plugin.variant_count(case_obj.case_id, filters) == len(
+            vcf_plugin.variants(case_obj.case_id, filters=filters).variants)
+        assert nr_of_variants in (None, vcf_plugin.variant_count(
+            case_obj.case_id, filters))
+
+
+class TestShards:
+
+    def _plugin(self, case_obj, indexed_vcf_file, processes=None):
+        case_obj.variant_source = indexed_vcf_file
+        case_obj.compressed = True
+        case_obj.tabix_index = True
+        vcf_plugin = VcfPlugin(processes=processes)
+        vcf_plugin.add_case(case_obj)
+        return vcf_plugin
+
+    def test_shards(self, case_obj, indexed_vcf_file):
+        vcf_plugin = self._plugin(case_obj, indexed_vcf_file, processes=2)
+        shards = vcf_plugin._get_shards(case_obj, {})
+        regions = [region for region, _ in shards]
+
+        assert regions[:2] == [('1', 1, 5000000), ('1', 5000001, 10000000)]
+        # the regions cover the contigs in the order of the vcf
+        contigs = [contig for contig, _, _ in regions]
+        assert contigs == sorted(contigs, key=contigs.index)
+        assert contigs[0] == '1' and contigs[-1] == 'X'
+        assert vcf_plugin._get_shards(case_obj, {'range': {
+            'chromosome': '1', 'start': 1, 'end': 100}}) is None
+
+    def test_shards_resume(self, case_obj, indexed_vcf_file):
+        vcf_plugin = self._plugin(case_obj, indexed_vcf_file, processes=2)
+        position = {'chrom': '2', 'pos': 1000, 'at_pos': 1, 'index': 9,
+                    'count': 9, 'records': 9}
+        shards = vcf_plugin._get_shards(case_obj, {}, position)
+
+        assert shards[0] == (('2', 1000, 5000999),
+                             {'chrom': '2', 'pos': 1000, 'at_pos': 1,
+                              'records': 9})
+        assert shards[1] == (('2', 5001000, 10000999), None)
+
+    def test_no_shards_with_one_process(self, case_obj, indexed_vcf_file):
+        vcf_plugin = self._plugin(case_obj, indexed_vcf_file)
+        assert vcf_plugin._get_shards(case_obj, {}) is None
+
+    def test_sharded_variants(self, case_obj, indexed_vcf_file):
+        filters = {'frequency': '0.001'}
+        sequential = self._plugin(case_obj, indexed_vcf_file).variants(
+            case_obj.case_id, filters=filters, count=1000).variants
+        sharded = self._plugin(
+            case_obj, indexed_vcf_file, processes=3).variants(
+                case_obj.case_id, filters=filters, count=1000).variants
+
+        assert len(sharded) > 0
+        assert ([variant.variant_id for variant in sharded] ==
+                [variant.variant_id for variant in sequential])
+        assert ([variant.index for variant in sharded] ==
+                [variant.index for variant in sequential])
+
+    def test_sharded_pages(self, case_obj, indexed_vcf_file):
+        vcf_plugin = self._plugin(case_obj, indexed_vcf_file, processes=2)
+        all_variants = vcf_plugin.variants(case_obj.case_id,
+                                           count=1000).variants
+        pages = TestCursor()._pages(vcf_plugin, case_obj.case_id,
+                                    filters={}, count=7)
+
+        variants = [variant for page in pages for variant in page]
+        assert len(variants) == 108
+        assert ([variant.index for variant in variants] ==
+                [variant.index for variant in all_variants])
+
+    def test_sharded_small_regions(self, case_obj, indexed_vcf_file):
+        sequential = self._plugin(case_obj, indexed_vcf_file).variants(
+            case_obj.case_id, count=1000).variants
+        vcf_plugin = self._plugin(case_obj, indexed_vcf_file, processes=2)
+        # more regions than are filtered ahead of the reader
+        vcf_plugin.shard_size = 1000000
+        sharded = vcf_plugin.variants(case_obj.case_id, count=1000).variants
+
+        assert ([variant.variant_id for variant in sharded] ==
+                [variant.variant_id for variant in sequential])
+        assert ([variant.index for variant in sharded] ==
+                [variant.index for variant in sequential])
+
+    def test_shard_pool_is_kept(self):
+        from puzzle.plugins.vcf.mixins.shard_mixin import get_shard_pool
+        assert get_shard_pool(2) is get_shard_pool(2)
+
+    def test_sharded_count(self, case_obj, indexed_vcf_file):
+        vcf_plugin = self._plugin(case_obj, indexed_vcf_file, processes=2)
+        assert vcf_plugin.count_variants(case_obj.case_id) == 108
+
+
+class TestOffsets:
+
+    def _pages(self, vcf_plugin, case_id, offsets, count):
+        pages = []
+        cursor = None
+        while True:
+            result = vcf_plugin.variants_from_offsets(
+                case_id, offsets, count=count, cursor=cursor)
+            pages.append(result.variants)
+            cursor = result.cursor
+            if cursor is None:
+                return pages
+
+    def _assert_same_variants(self, vcf_plugin, case_id, filters):
+        expected = vcf_plugin.variants(case_id, filters=filters,
+                                       count=1000).variants
+        offsets = vcf_plugin.variant_offsets(case_id, filters)
+        pages = self._pages(vcf_plugin, case_id, offsets, count=7)
+        variants = [variant for page in pages for variant in page]
+
+        assert len(offsets) == len(expected)
+        assert ([variant.variant_id for variant in variants] ==
+                [variant.variant_id for variant in expected])
+        assert ([variant.index for variant in variants] ==
+                [variant.index for variant in expected])
+
+    def test_offsets(self, case_obj):
+        vcf_plugin = VcfPlugin()
+        vcf_plugin.add_case(case_obj)
+
+        for filters in ({}, {'frequency': '0.001'}):
+            self._assert_same_variants(vcf_plugin, case_obj.case_id, filters)
+
+    def test_offsets_tabix(self, case_obj, indexed_vcf_file):
+        case_obj.variant_source = indexed_vcf_file
+        case_obj.compressed = True
+        case_obj.tabix_index = True
+        vcf_plugin = VcfPlugin()
+        vcf_plugin.add_case(case_obj)
+
+        for filters in ({}, {'frequency': '0.001'}):
+            self._assert_same_variants(vcf_plugin, case_obj.case_id, filters)
+
+    def test_offsets_sidecar(self, case_obj, dir_path):
+        vcf_plugin = VcfPlugin()
+        vcf_plugin.index_dir = dir_path
+        vcf_plugin.add_case(case_obj)
+        vcf_plugin.build_sidecar(case_obj.variant_source)
+
+        self._assert_same_variants(vcf_plugin, case_obj.case_id,
+                                   {'impact_severities': ['HIGH']})
+
+    def test_cached_variants(self, case_obj):
+        vcf_plugin = VcfPlugin()
+        vcf_plugin.add_case(case_obj)
+        filters = {'cadd': '20'}
+        VARIANT_RESULTS.clear()
+
+        assert vcf_plugin.cached_variants(case_obj.case_id, filters) is None
+
+        vcf_plugin.count_variants(case_obj.case_id, filters)
+        expected = vcf_plugin.variants(case_obj.case_id, skip=2, count=3,
+                                       filters=filters).variants
+        result = vcf_plugin.cached_variants(case_obj.case_id, filters,
+                                            skip=2, count=3)
+        assert ([variant.variant_id for variant in result.variants] ==
+                [variant.variant_id for variant in expected])
+
+    def test_offsets_cursor_continues_scan(self, case_obj):
+        vcf_plugin = VcfPlugin()
+        vcf_plugin.add_case(case_obj)
+        offsets = vcf_plugin.variant_offsets(case_obj.case_id)
+
+        # a cursor from the offsets can be used by a scan
+        cursor = vcf_plugin.variants_from_offsets(
+            case_obj.case_id, offsets, count=10).cursor
+        result = vcf_plugin.variants(case_obj.case_id, count=10,
+                                     cursor=cursor)
+        assert [variant.index for variant in result.variants] == list(
+            range(11, 21))
+
+
+class TestGeneSymbols:
+
+    def test_sv_gene_symbols_batched(self, case_obj, vcf_file_sv,
+                                     monkeypatch):
+        from puzzle.plugins.vcf.mixins.variant_extras import genes
+        from puzzle.utils import get_gene_symbols
+        case_obj.variant_source = vcf_file_sv
+        case_obj.compressed = True
+        vcf_plugin = VcfPlugin('sv')
+        vcf_plugin.add_case(case_obj)
+
+        batches = []
+        def get_gene_symbols_batch(chroms, starts, stops):
+            batches.append(len(chroms))
+            return get_gene_symbols_batch.original(chroms, starts, stops)
+        get_gene_symbols_batch.original = genes.get_gene_symbols_batch
+
+        def one_interval(*args):
+            raise AssertionError("Genes looked up one variant at a time")
+        monkeypatch.setattr(genes, 'get_gene_symbols', one_interval)
+        monkeypatch.setattr(genes, 'get_gene_symbols_batch',
+                            get_gene_symbols_batch)
+
+        variants = vcf_plugin.variants(case_obj.case_id, count=5).variants
+
+        assert len(variants) == 5
+        assert len(batches) == 1
+        for variant in variants:
+            assert set(variant['gene_symbols']) == set(get_gene_symbols(
+                variant['CHROM'], variant['start'], variant['stop']))
+        assert any(variant['gene_symbols'] for variant in variants)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from puzzle.server import create_app
+from puzzle.server.settings import TestConfig
+
+
+@pytest.fixture(scope='function')
+def client(test_db):
+    class ApiConfig(TestConfig):
+        PUZZLE_BACKEND = test_db
+        STORE_ENABLED = True
+
+    app = create_app(config_obj=ApiConfig)
+    return app.test_client()
+
+
+def _variants(response):
+    return [json.loads(line) for line in
+            response.get_data(as_text=True).splitlines()]
+
+
+def test_variants(client, case_obj, test_db):
+    response = client.get("/api/variants/{0}".format(case_obj.case_id))
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    variants = _variants(response)
+    assert len(variants) == 108
+    assert variants[0]['index'] == 1
+    assert variants[0]['transcripts'][0]['hgnc_symbol']
+
+
+def test_variants_filters(client, case_obj, test_db):
+    response = client.get("/api/variants/{0}?impact_severities=HIGH"
+                          "&skip=1&limit=2".format(case_obj.case_id))
+    expected = test_db.variants(case_obj.case_id, skip=1, count=2, filters={
+        'impact_severities': ['HIGH']}).variants
+
+    assert ([variant['variant_id'] for variant in _variants(response)] ==
+            [variant.variant_id for variant in expected])
+
+
+def test_variants_unknown_case(client):
+    response = client.get("/api/variants/unknown")
+    assert response.status_code == 404
+
+
+def test_variant(client, case_obj, test_db):
+    variant_id = test_db.variants(case_obj.case_id,
+                                  count=1).variants[0].variant_id
+    response = client.get("/api/variants/{0}/{1}".format(
+        case_obj.case_id, variant_id))
+
+    assert response.status_code == 200
+    assert json.loads(response.get_data(as_text=True))['variant_id'] == (
+        variant_id)
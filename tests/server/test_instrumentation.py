@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from puzzle.server import create_app
+from puzzle.server.instrumentation import LatencyStats, server_timing
+from puzzle.server.settings import TestConfig
+from puzzle.utils import timing
+
+
+@pytest.fixture(scope='function')
+def instrumented_app(test_db):
+    class InstrumentedConfig(TestConfig):
+        PUZZLE_BACKEND = test_db
+        STORE_ENABLED = True
+        INSTRUMENTATION = True
+
+    return create_app(config_obj=InstrumentedConfig)
+
+
+def _metrics(response):
+    return [metric.split(';')[0] for metric in
+            response.headers['Server-Timing'].split(', ')]
+
+
+def test_server_timing(instrumented_app, case_obj):
+    client = instrumented_app.test_client()
+    response = client.get("/cases/{0}".format(case_obj.case_id))
+
+    assert response.status_code == 200
+    metrics = _metrics(response)
+    assert 'db_case' in metrics
+    assert 'render' in metrics
+    assert metrics[-1] == 'total'
+
+
+def test_server_timing_disabled(test_db, case_obj):
+    class PlainConfig(TestConfig):
+        PUZZLE_BACKEND = test_db
+        STORE_ENABLED = True
+
+    client = create_app(config_obj=PlainConfig).test_client()
+    response = client.get("/cases/{0}".format(case_obj.case_id))
+
+    assert 'Server-Timing' not in response.headers
+    assert client.get('/debug/stats').status_code == 404
+
+
+def test_debug_stats(instrumented_app, case_obj):
+    client = instrumented_app.test_client()
+    for _ in range(3):
+        client.get("/cases/{0}".format(case_obj.case_id))
+
+    response = client.get('/debug/stats')
+    assert response.status_code == 200
+    stats = json.loads(response.get_data(as_text=True))
+    route = stats['routes']['/cases/<case_id>']
+    assert route['count'] == 3
+    assert sum(route['histogram'].values()) == 3
+    assert route['p50'] <= route['p95'] <= route['max']
+
+
+def test_profile_dir(test_db, case_obj, tmpdir):
+    class ProfileConfig(TestConfig):
+        PUZZLE_BACKEND = test_db
+        STORE_ENABLED = True
+        INSTRUMENTATION = True
+        PROFILE_DIR = str(tmpdir.join('profiles'))
+
+    client = create_app(config_obj=ProfileConfig).test_client()
+    client.get("/cases/{0}".format(case_obj.case_id))
+
+    profiles = tmpdir.join('profiles').listdir()
+    assert len(profiles) == 1
+    assert profiles[0].basename.endswith('-public.case.prof')
+
+
+def test_latency_stats():
+    stats = LatencyStats(window=2)
+    stats.add('/', 1)
+    stats.add('/', 30)
+    stats.add('/', 7000)
+
+    summary = stats.summary()['/']
+    assert summary['count'] == 2
+    assert summary['max'] == 7000
+    assert summary['histogram']['<=50'] == 1
+    assert summary['histogram']['>5000'] == 1
+
+
+def test_server_timing_header():
+    header = server_timing({'render': (0.002, 1)}, 0.01)
+    assert header == 'render;dur=2.0, total;dur=10.0'
+
+
+def test_profile_on_error(test_db, tmpdir):
+    class ProfileConfig(TestConfig):
+        PUZZLE_BACKEND = test_db
+        STORE_ENABLED = True
+        INSTRUMENTATION = True
+        PROFILE_DIR = str(tmpdir.join('profiles'))
+        # tear the request down as outside of the tests
+        PRESERVE_CONTEXT_ON_EXCEPTION = False
+
+    app = create_app(config_obj=ProfileConfig)
+
+    @app.route('/error')
+    def error():
+        raise ValueError("error in view")
+
+    client = app.test_client()
+    with pytest.raises(ValueError):
+        client.get('/error')
+
+    # the recording is stopped and the request is recorded
+    assert getattr(timing._local, 'spans', None) is None
+    assert app.latency_stats.summary()['/error']['count'] == 1
+    profiles = tmpdir.join('profiles').listdir()
+    assert len(profiles) == 1
+    assert profiles[0].basename.endswith('-error.prof')
+
+
+def test_streamed_response(instrumented_app, case_obj):
+    client = instrumented_app.test_client()
+    response = client.get("/api/variants/{0}".format(case_obj.case_id))
+
+    assert 'total' in _metrics(response)
+    # the request is recorded when the body has been sent
+    assert '/api/variants/<case_id>' not in (
+        instrumented_app.latency_stats.summary())
+    assert len(response.get_data().splitlines()) == 108
+    response.close()
+    stats = instrumented_app.latency_stats.summary()
+    assert stats['/api/variants/<case_id>']['count'] == 1
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from puzzle.log import LazyFormat
+
+
+class Unformattable(object):
+    def __format__(self, format_spec):
+        raise AssertionError("Formatted a message that was not logged")
+
+
+def test_lazy_format():
+    message = LazyFormat("Adding {0} to {variant}", 'ADK', variant='1_100_A_T')
+    assert str(message) == "Adding ADK to 1_100_A_T"
+
+
+def test_lazy_format_not_logged():
+    logger = logging.getLogger('puzzle.test_log')
+    logger.setLevel(logging.WARNING)
+    logger.debug(LazyFormat("Not logged {0}", Unformattable()))
@@ -1,8 +1,10 @@
-from puzzle.utils.constants import HGNC_TO_OMIM, SEVERITY_DICT
+from puzzle.utils.constants import SEVERITY_DICT
+from puzzle.utils.reference import get_omim_index
 
 def test_HGNC_TO_OMIM():
-    assert HGNC_TO_OMIM['CACNA1F'].get('mim_nr') == 300110
-    assert HGNC_TO_OMIM['ADK'].get('mim_nr') == 102750
+    omim_index = get_omim_index()
+    assert omim_index.get('CACNA1F') == 300110
+    assert omim_index.get('ADK') == 102750
 
 def test_SEVERITY_DICT():
     assert SEVERITY_DICT['transcript_ablation'] == 0
@@ -0,0 +1,95 @@
+import threading
+
+from puzzle.utils.counter import BackgroundCounter, get_filter_signature
+
+
+def test_get_filter_signature():
+    signature = get_filter_signature(
+        {'gene_ids': ['TECTA', 'AR'], 'cadd': None, 'consequence': []})
+
+    assert signature == get_filter_signature({'gene_ids': set(['AR', 'TECTA'])})
+    assert signature != get_filter_signature({'gene_ids': ['AR']})
+    assert get_filter_signature({'frequency': 0.0}) != get_filter_signature({})
+
+
+def test_background_counter():
+    counter = BackgroundCounter()
+    calls = []
+
+    def count():
+        calls.append(threading.current_thread().name)
+        return 42
+
+    counter.submit('key', count)
+    counter.wait()
+
+    assert counter.get('key') == 42
+    assert not counter.is_pending('key')
+    assert calls == ['puzzle-counter']
+
+    # a counted key is not counted again
+    counter.submit('key', count)
+    counter.wait()
+    assert len(calls) == 1
+
+
+def test_background_counter_error():
+    counter = BackgroundCounter()
+
+    def count():
+        raise ValueError("no count")
+
+    counter.submit('key', count)
+    counter.wait()
+
+    assert counter.get('key') is None
+    assert not counter.is_pending('key')
+
+
+def test_background_counter_drops_oldest():
+    counter = BackgroundCounter(workers=1, max_queued=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_count():
+        started.set()
+        release.wait()
+        return 1
+
+    counter.submit('running', blocking_count)
+    started.wait()
+    counter.submit('old', lambda: 2)
+    counter.submit('new', lambda: 3)
+
+    assert not counter.is_pending('old')
+    assert counter.is_pending('new')
+
+    release.set()
+    counter.wait()
+    assert counter.get('running') == 1
+    assert counter.get('old') is None
+    assert counter.get('new') == 3
+
+
+def test_background_counter_cancel():
+    counter = BackgroundCounter(workers=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_count():
+        started.set()
+        release.wait()
+        return 1
+
+    counter.submit('running', blocking_count)
+    started.wait()
+    counter.submit('waiting', lambda: 2)
+
+    assert counter.cancel('waiting')
+    # a running count is not interrupted
+    assert not counter.cancel('running')
+
+    release.set()
+    counter.wait()
+    assert counter.get('running') == 1
+    assert counter.get('waiting') is None
@@ -0,0 +1,35 @@
+from puzzle.utils.gene_intervals import GeneIntervalIndex
+from puzzle.utils import get_gene_symbols, get_gene_symbols_batch
+
+GENES = [
+    ('1', 100, 200, 'A'),
+    ('1', 150, 1000, 'B'),
+    ('1', 500, 600, 'C'),
+    ('2', 100, 200, 'D'),
+]
+
+
+def test_gene_symbols():
+    index = GeneIntervalIndex(GENES)
+
+    assert index.gene_symbols('1', 10, 99) == set()
+    assert index.gene_symbols('1', 10, 100) == set(['A'])
+    assert index.gene_symbols('1', 190, 300) == set(['A', 'B'])
+    assert index.gene_symbols('chr1', 700, 800) == set(['B'])
+    assert index.gene_symbols('X', 100, 200) == set()
+
+
+def test_gene_symbols_batch():
+    index = GeneIntervalIndex(GENES)
+
+    result = index.gene_symbols_batch(
+        ['1', '2', '1'], [550, 150, 1001], [560, 150, 2000])
+
+    assert result == [set(['B', 'C']), set(['D']), set()]
+
+
+def test_get_gene_symbols():
+    # ADK spans chromosome 10 from 75910943 to 76469061
+    assert 'ADK' in get_gene_symbols('10', 76000000, 76000100)
+    assert get_gene_symbols_batch(['10'], [76000000], [76000100]) == [
+        get_gene_symbols('10', 76000000, 76000100)]
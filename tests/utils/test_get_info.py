@@ -1,5 +1,6 @@
 from puzzle.utils import (get_most_severe_consequence, get_cytoband_coord,
-                          get_omim_number, get_gene_info)
+                          get_omim_number, get_gene_info, get_genes,
+                          get_gene_regions)
 
 
 def test_get_gene_info():
@@ -75,3 +76,29 @@ def test_get_omim_number():
     assert get_omim_number('MCCRP2') != get_omim_number('PLK4')
     assert get_omim_number('MCCRP2') is None
     assert get_omim_number('PLK4') == 605031
+
+def test_get_genes():
+    genes = get_genes(ensembl_ids=['ENSG00000156110'],
+                      hgnc_symbols=['CHAT', 'NOTAGENE'])
+
+    assert genes['ENSG00000156110'][0].symbol == 'ADK'
+    assert genes['CHAT'][0].ensembl_id == 'ENSG00000070748'
+    # Symbols that are not found gives a gene with only the symbol
+    assert genes['NOTAGENE'][0].symbol == 'NOTAGENE'
+    assert genes['NOTAGENE'][0].ensembl_id is None
+
+def test_get_genes_cached():
+    first_genes = get_genes(hgnc_symbols=['ADK'])
+    assert get_genes(hgnc_symbols=['ADK'])['ADK'] is first_genes['ADK']
+
+def test_get_gene_regions():
+    gene = get_genes(hgnc_symbols=['ADK'])['ADK'][0]
+    regions = get_gene_regions(['ADK', 'AR'], ['chr10', 'chrX'], padding=100)
+
+    assert regions[0] == ('chr10', gene.start - 100, gene.stop + 100)
+    assert regions[1][0] == 'chrX'
+    # Genes on contigs that are not given have no regions
+    assert get_gene_regions(['ADK'], ['1']) == []
+
+def test_get_gene_regions_unknown_gene():
+    assert get_gene_regions(['ADK', 'NOTAGENE'], ['10']) is None
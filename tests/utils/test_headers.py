@@ -1,6 +1,28 @@
-from puzzle.utils import get_csq
+import os
+import shutil
+
+from puzzle.utils import get_csq, get_header
 
 def test_get_csq():
     description = '"Consequence annotations from Ensembl VEP. Format: Allele|Consequence"'
     csq_cols = get_csq(description)
-    assert csq_cols == ['Allele', 'Consequence']
\ No newline at end of file
+    assert csq_cols == ['Allele', 'Consequence']
+
+def test_get_header_is_cached(vcf_file):
+    head = get_header(vcf_file)
+    assert get_header(vcf_file) is head
+    assert head.individuals == ['ADM1059A1', 'ADM1059A2', 'ADM1059A3']
+
+
+def test_get_header_changed_file(vcf_file, dir_path):
+    os.makedirs(dir_path)
+    vcf_copy = os.path.join(dir_path, 'copy.vcf')
+    shutil.copy(vcf_file, vcf_copy)
+    head = get_header(vcf_copy)
+
+    with open(vcf_copy, 'a') as f:
+        f.write('\n')
+
+    new_head = get_header(vcf_copy)
+    assert new_head is not head
+    assert new_head.individuals == head.individuals
@@ -0,0 +1,81 @@
+from puzzle.models import DotDict
+from puzzle.utils.info_filter import (InfoFilter, AnnotationFilter,
+                                      get_info_float)
+
+
+def _variant(**info):
+    return DotDict(INFO=info)
+
+
+def test_get_info_float():
+    assert get_info_float({'CADD': '12.5'}, 'CADD') == 12.5
+    assert get_info_float({}, 'CADD') != get_info_float({}, 'CADD')
+
+
+def test_info_filter_inactive():
+    assert not InfoFilter({}).is_active
+    assert InfoFilter({'frequency': '0.01'}).is_active
+
+
+def test_info_filter_frequency():
+    variants = [
+        _variant(**{'1000GAF': '0.2'}),
+        _variant(**{'1000GAF': '0.001', 'ExAC': '0.3'}),
+        _variant(**{'ExAC': '0.3', 'EXACAF': '0.001'}),
+        _variant(),
+    ]
+    info_filter = InfoFilter({'frequency': '0.01'})
+    assert list(info_filter.mask(variants)) == [False, False, True, True]
+
+
+def test_info_filter_cadd():
+    variants = [_variant(CADD='25'), _variant(CADD='5'), _variant()]
+    info_filter = InfoFilter({'cadd': '10'})
+    assert list(info_filter.mask(variants)) == [True, False, False]
+
+
+def test_info_filter_batches():
+    items = [(index, _variant(CADD=str(index))) for index in range(25)]
+    info_filter = InfoFilter({'cadd': '10'}, batch_size=4)
+    assert [index for index, variant in info_filter.filter(items)] == list(
+        range(10, 25))
+
+
+VEP_COLUMNS = ['Allele', 'Consequence', 'SYMBOL', 'Gene']
+
+
+def test_annotation_filter_genes():
+    variants = [
+        _variant(CSQ='C|missense_variant|BRCA1|ENSG00000012048'),
+        _variant(CSQ='C|intron_variant|BRCA1P1|ENSG00000267595'),
+        _variant(CSQ='C|intron_variant|ADK|ENSG00000156110,'
+                     'C|missense_variant|BRCA1|ENSG00000012048'),
+    ]
+    annotation_filter = AnnotationFilter({'gene_ids': ['BRCA1']},
+                                         vep_columns=VEP_COLUMNS)
+    assert [annotation_filter.passes(variant) for variant in variants] == [
+        True, False, True]
+
+
+def test_annotation_filter_consequences():
+    variants = [
+        _variant(CSQ='C|missense_variant&splice_region_variant|ADK|'),
+        _variant(CSQ='C|intron_variant|ADK|'),
+        _variant(ANN='C|splice_region_variant|HIGH|ADK|ENSG00000156110'),
+        _variant(),
+    ]
+    annotation_filter = AnnotationFilter(
+        {'consequence': ['splice_region_variant']},
+        vep_columns=VEP_COLUMNS,
+        snpeff_columns=['Allele', 'Annotation', 'Annotation_Impact',
+                        'Gene_Name', 'Gene_ID']
+    )
+    assert [annotation_filter.passes(variant) for variant in variants] == [
+        True, False, True, False]
+
+
+def test_annotation_filter_sv_types():
+    variants = [_variant(SVTYPE='DEL'), _variant(SVTYPE='DUP'), _variant()]
+    annotation_filter = AnnotationFilter({'sv_types': ['DEL']})
+    assert [annotation_filter.passes(variant) for variant in variants] == [
+        True, False, False]
@@ -0,0 +1,21 @@
+from puzzle.utils.lru import LRUCache
+
+
+def test_lru_cache_get_set():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert 'a' in cache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # Touch 'a' so that 'b' is the oldest entry
+    cache.get('a')
+    cache.set('c', 3)
+    assert len(cache) == 2
+    assert 'b' not in cache
+    assert cache.keys() == ['a', 'c']
@@ -0,0 +1,29 @@
+from puzzle.utils.reference import CytobandIndex, OmimIndex
+
+BANDS = [
+    ('1', 100, 200, 'p2'),
+    ('1', 0, 100, 'p1'),
+    ('1', 300, 400, 'q1'),
+]
+
+
+def test_get_band():
+    cytobands = CytobandIndex(BANDS)
+
+    assert cytobands.get_band('1', 0) == 'p1'
+    assert cytobands.get_band('1', 99) == 'p1'
+    assert cytobands.get_band('1', 100) == 'p2'
+    assert cytobands.get_band('1', 250) is None
+    assert cytobands.get_band('1', 400) is None
+    assert cytobands.get_band('2', 50) is None
+
+
+def test_omim_index():
+    omim_index = OmimIndex(['ADK', 'AR', 'TECTA'], [102750, 313700, 602574])
+
+    assert len(omim_index) == 3
+    assert omim_index.get('AR') == 313700
+    assert omim_index.get(u'TECTA') == 602574
+    assert omim_index.get('A') is None
+    assert omim_index.get('TECTB') is None
+    assert omim_index.get(None) is None
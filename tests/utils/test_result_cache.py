@@ -0,0 +1,34 @@
+from puzzle.utils.result_cache import ResultCache
+
+
+def test_result_cache():
+    cache = ResultCache(max_offsets=5)
+    cache.set('first', [1, 2])
+    cache.set('second', [3, 4])
+
+    assert cache.get('first') == [1, 2]
+    assert cache.size == 4
+
+    # the least recently used result is evicted when the offsets do not fit
+    cache.set('third', [5, 6])
+    assert 'second' not in cache
+    assert cache.get('first') == [1, 2]
+    assert cache.size == 4
+
+
+def test_result_cache_replace():
+    cache = ResultCache(max_offsets=5)
+    cache.set('first', [1, 2, 3])
+    cache.set('first', [1])
+
+    assert cache.size == 1
+    assert cache.pop('first') == [1]
+    assert cache.size == 0
+
+
+def test_result_cache_too_large():
+    cache = ResultCache(max_offsets=2)
+    cache.set('first', [1, 2, 3])
+
+    assert 'first' not in cache
+    assert cache.size == 0
@@ -0,0 +1,89 @@
+import numpy as np
+
+from puzzle.models import Variant
+from puzzle.utils.sidecar import (get_sidecar_path, get_record_offsets,
+                                  SidecarWriter, SIDECAR_VERSION)
+
+
+def _variant(pos, max_freq=None, cadd_score=None, gene_symbols=[],
+             consequences=[], genetic_models=[]):
+    variant_obj = Variant(CHROM='1', POS=pos, ID='.', REF='A', ALT='C',
+                          QUAL=100, FILTER='PASS')
+    variant_obj.start = pos - 1
+    variant_obj.stop = pos
+    variant_obj.max_freq = max_freq
+    variant_obj.cadd_score = cadd_score
+    variant_obj.gene_symbols = gene_symbols
+    variant_obj.consequences = consequences
+    variant_obj.genetic_models = genetic_models
+    return variant_obj
+
+
+def _sidecar(dir_path):
+    writer = SidecarWriter(get_sidecar_path('test.vcf', dir_path),
+                           fingerprint='1:1.0', variant_type='snv')
+    writer.add(1, '1', 10, _variant(10, max_freq=0.2, cadd_score=10,
+                                    gene_symbols=['BRCA1'],
+                                    consequences=['missense_variant'],
+                                    genetic_models=['AR_hom']),
+               byte_offset=100)
+    writer.add(2, '1', 20, _variant(20, cadd_score=25,
+                                    gene_symbols=['BRCA1P1', 'ADK'],
+                                    consequences=['intron_variant']),
+               byte_offset=200)
+    writer.add(3, '1', 20, _variant(20, max_freq=0.001,
+                                    genetic_models=['AD']),
+               byte_offset=300)
+    return writer.close()
+
+
+def test_get_sidecar_path(dir_path):
+    sidecar_path = get_sidecar_path('tests/fixtures/hapmap.vcf', dir_path)
+    assert sidecar_path.startswith(dir_path)
+    assert sidecar_path.endswith('.pzc')
+
+
+def test_sidecar_meta(dir_path):
+    sidecar = _sidecar(dir_path)
+    assert len(sidecar) == 3
+    assert sidecar.fingerprint == '1:1.0'
+    assert sidecar.variant_type == 'snv'
+    assert sidecar.version == SIDECAR_VERSION
+    assert sidecar.column('consequences').dtype == np.uint64
+    assert sidecar.column('genetic_models').dtype == np.uint64
+
+
+def test_sidecar_offsets(dir_path):
+    sidecar = _sidecar(dir_path)
+
+    assert sidecar.offsets(sidecar.filter({})) == [
+        (1, '1', 10, 1, 100), (2, '1', 20, 1, 200), (3, '1', 20, 2, 300)]
+
+
+def test_get_record_offsets(vcf_file):
+    byte_offsets = get_record_offsets(vcf_file)
+    with open(vcf_file, 'rb') as handle:
+        for _ in range(3):
+            handle.seek(next(byte_offsets))
+            assert not handle.readline().startswith(b'#')
+
+
+def test_sidecar_filters(dir_path):
+    sidecar = _sidecar(dir_path)
+
+    assert list(sidecar.filter({})) == [1, 2, 3]
+    assert list(sidecar.filter({'gene_ids': ['BRCA1']})) == [1]
+    assert list(sidecar.filter({'gene_ids': ['ADK', 'NOTAGENE']})) == [2]
+    # Variants without a frequency are kept
+    assert list(sidecar.filter({'frequency': 0.01})) == [2, 3]
+    # Variants without a cadd score are removed
+    assert list(sidecar.filter({'cadd': 20})) == [2]
+    assert list(sidecar.filter(
+        {'consequence': ['missense_variant', 'intron_variant']})) == [1, 2]
+    assert list(sidecar.filter({'genetic_models': ['AD']})) == [3]
+    assert list(sidecar.filter({'range': {
+        'chromosome': '1', 'start': 15, 'end': 30}})) == [2, 3]
+    assert list(sidecar.filter({'range': {
+        'chromosome': '1', 'start': 15, 'end': 18}})) == []
+    assert list(sidecar.filter({'range': {
+        'chromosome': '2', 'start': 15, 'end': 30}})) == []
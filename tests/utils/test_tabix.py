@@ -0,0 +1,130 @@
+import gzip
+import os
+
+import pytest
+
+from cyvcf2 import VCF
+
+from puzzle.utils import get_indexed_vcf
+from puzzle.utils.tabix import (bgzip_vcf, get_bgzip_path, get_tabix_contigs,
+                                get_tabix_extents, get_tabix_path, reg2bin,
+                                _chunks)
+
+
+def _records(vcf_file_path):
+    return [(variant.CHROM, variant.POS) for variant in VCF(vcf_file_path)]
+
+
+def test_get_tabix_contigs(indexed_vcf_file):
+    contigs = get_tabix_contigs(indexed_vcf_file)
+    assert contigs[0] == '1'
+    assert contigs[-1] == 'X'
+
+
+def test_get_tabix_extents(indexed_vcf_file):
+    extents = get_tabix_extents(indexed_vcf_file)
+    assert list(extents) == get_tabix_contigs(indexed_vcf_file)
+    last_positions = {}
+    for chrom, pos in _records(indexed_vcf_file):
+        last_positions[chrom] = max(pos, last_positions.get(chrom, 0))
+    # the extent is the end of the 16 kb window of the last record
+    for chrom, pos in last_positions.items():
+        assert pos <= extents[chrom] < pos + (1 << 14)
+
+
+def test_reg2bin():
+    assert reg2bin(0, 1) == 4681
+    assert reg2bin(0, 1 << 14) == 4681
+    assert reg2bin(0, (1 << 14) + 1) == 585
+    assert reg2bin(0, 1 << 29) == 0
+
+
+def test_chunks_by_size():
+    lines = [b'12345\n'] * 5
+    assert [len(chunk) for chunk in _chunks(lines, 12)] == [2, 2, 1]
+    assert list(_chunks([], 12)) == []
+
+
+def test_bgzip_vcf_sorts(vcf_file, tmpdir):
+    # sort the records in many chunks
+    out_path = bgzip_vcf(vcf_file, str(tmpdir.join('hapmap.vcf.gz')),
+                         buffer_size=10000)
+
+    assert get_tabix_path(out_path)
+    records = _records(out_path)
+    assert len(records) == 108
+    contigs = get_tabix_contigs(out_path)
+    assert records == sorted(records, key=lambda record: (
+        contigs.index(record[0]), record[1]))
+    # the header is kept
+    with gzip.open(out_path) as handle:
+        assert handle.readline().startswith(b'##fileformat=VCF')
+
+
+def test_bgzip_vcf_no_trailing_newline(tmpdir):
+    vcf_path = tmpdir.join('unsorted.vcf')
+    vcf_path.write_binary(
+        b'##fileformat=VCFv4.2\n'
+        b'##contig=<ID=1>\n'
+        b'#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n'
+        b'1\t300\t.\tG\tC\t.\t.\t.\n'
+        b'1\t100\t.\tA\tG\t.\t.\t.\n'
+        b'1\t200\t.\tA\tT\t.\t.\t.')
+    out_path = bgzip_vcf(str(vcf_path), str(tmpdir.join('sorted.vcf.gz')))
+
+    assert [(variant.POS, variant.REF, variant.ALT[0]) for variant in
+            VCF(out_path)] == [(100, 'A', 'G'), (200, 'A', 'T'),
+                               (300, 'G', 'C')]
+    assert [variant.POS for variant in VCF(out_path)('1:250-350')] == [300]
+
+
+def test_bgzip_vcf_removes_temporary_files(tmpdir):
+    vcf_path = tmpdir.join('truncated.vcf')
+    vcf_path.write_binary(
+        b'##fileformat=VCFv4.2\n'
+        b'#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n'
+        b'1\t100\t.\tA\tG\t.\t.\t.\n'
+        b'1\t200\n')
+    out_dir = tmpdir.mkdir('vcfs')
+
+    # the truncated record fails when it is indexed
+    with pytest.raises(IndexError):
+        bgzip_vcf(str(vcf_path), str(out_dir.join('malformed.vcf.gz')))
+    assert out_dir.listdir() == []
+
+
+def test_bgzip_vcf_regions(vcf_file_sv, tmpdir):
+    out_path = bgzip_vcf(vcf_file_sv, str(tmpdir.join('sv.vcf.gz')))
+    variants = [(variant.CHROM, variant.POS, variant.end) for variant
+                in VCF(out_path)]
+    vcf = VCF(out_path)
+
+    for chrom, start, end in (('1', 1, 10000000), ('2', 50000000, 50100000),
+                              ('X', 1, 300000000)):
+        expected = [(variant[0], variant[1]) for variant in variants
+                    if variant[0] == chrom and variant[2] >= start and
+                    variant[1] <= end]
+        region = "{0}:{1}-{2}".format(chrom, start, end)
+        assert [(variant.CHROM, variant.POS) for variant
+                in vcf(region)] == expected
+
+
+def test_get_bgzip_path(vcf_file, tmpdir):
+    bgzip_path = get_bgzip_path(vcf_file, str(tmpdir))
+    assert os.path.dirname(bgzip_path) == str(tmpdir)
+    assert os.path.basename(bgzip_path).startswith('hapmap.')
+    assert bgzip_path.endswith('.vcf.gz')
+
+
+def test_get_indexed_vcf(vcf_file, tmpdir):
+    indexed_path = get_indexed_vcf(vcf_file, str(tmpdir))
+    assert indexed_path == get_bgzip_path(vcf_file, str(tmpdir))
+
+    mtime = os.path.getmtime(indexed_path)
+    assert get_indexed_vcf(vcf_file, str(tmpdir)) == indexed_path
+    assert os.path.getmtime(indexed_path) == mtime
+
+
+def test_get_indexed_vcf_indexed(indexed_vcf_file, tmpdir):
+    assert get_indexed_vcf(indexed_vcf_file, str(tmpdir)) == indexed_vcf_file
+    assert tmpdir.listdir() == []
@@ -0,0 +1,43 @@
+from puzzle.utils.timing import (record, span, start_recording,
+                                 stop_recording, timed)
+
+
+@timed('double')
+def double(number):
+    return number * 2
+
+
+def test_timed_without_recording():
+    assert double(2) == 4
+    assert stop_recording() == {}
+
+
+def test_timed():
+    start_recording()
+    double(1)
+    double(2)
+    spans = stop_recording()
+
+    assert list(spans) == ['double']
+    assert spans['double'][1] == 2
+
+
+def test_span():
+    start_recording()
+    with span('block'):
+        pass
+    record('block', 1.0)
+    spans = stop_recording()
+
+    total, calls = spans['block']
+    assert total >= 1.0
+    assert calls == 2
+
+
+def test_stop_recording():
+    start_recording()
+    stop_recording()
+    with span('block'):
+        pass
+
+    assert stop_recording() == {}
@@ -0,0 +1,35 @@
+import os
+
+from puzzle.utils import (get_variant_index, build_variant_index,
+                          get_index_path)
+
+
+def test_get_index_path(vcf_file, dir_path):
+    index_path = get_index_path(vcf_file, index_dir=dir_path)
+    assert os.path.dirname(index_path) == dir_path
+    assert os.path.basename(index_path).startswith('hapmap.vcf.')
+
+
+def test_build_variant_index(vcf_file, dir_path):
+    index_path = get_index_path(vcf_file, index_dir=dir_path)
+    index = build_variant_index(vcf_file, index_path)
+
+    assert os.path.exists(index_path)
+    # first variant in the file
+    assert index.lookup('X_84563218_C_G') == (1, 'X', 84563218)
+    # 10th variant in the file
+    assert index.lookup('3_124998098_C_A')[0] == 10
+    assert index.lookup('1_880086_T_C') is None
+
+
+def test_get_variant_index_rebuilds_outdated(vcf_file, dir_path):
+    index = get_variant_index(vcf_file, index_dir=dir_path)
+    fingerprint = index.fingerprint
+
+    # make the index look like it was built from another version of the file
+    with index._connect() as db:
+        db.execute("UPDATE meta SET value = 'outdated'")
+        db.commit()
+
+    index = get_variant_index(vcf_file, index_dir=dir_path)
+    assert index.fingerprint == fingerprint
@@ -0,0 +1,52 @@
+import threading
+
+from puzzle.utils.vcf_handles import VcfHandlePool
+
+VCF_PATH = 'tests/fixtures/hapmap_pos.vcf.gz'
+
+
+def test_handle_reused():
+    pool = VcfHandlePool()
+    with pool.handle(VCF_PATH) as vcf:
+        positions = [variant.POS for variant in vcf('1:1771129-1771129')]
+    with pool.handle(VCF_PATH) as same_vcf:
+        assert same_vcf is vcf
+        positions.extend(variant.POS for variant in
+                         same_vcf('1:32645911-33502381'))
+
+    assert positions == [1771129, 32645911, 33502381]
+
+
+def test_handle_in_use():
+    pool = VcfHandlePool()
+    handle = pool.acquire(VCF_PATH)
+    other_handle = pool.acquire(VCF_PATH)
+    assert other_handle.vcf is not handle.vcf
+
+    handle.release()
+    other_handle.release()
+    assert pool.acquire(VCF_PATH) is handle
+
+
+def test_handle_per_thread():
+    pool = VcfHandlePool()
+    handle = pool.acquire(VCF_PATH)
+    handle.release()
+
+    thread_handles = []
+    thread = threading.Thread(
+        target=lambda: thread_handles.append(pool.acquire(VCF_PATH)))
+    thread.start()
+    thread.join()
+
+    assert thread_handles[0] is not handle
+
+
+def test_handle_file_changed(monkeypatch):
+    pool = VcfHandlePool()
+    handle = pool.acquire(VCF_PATH)
+    handle.release()
+
+    monkeypatch.setattr('puzzle.utils.vcf_handles.get_file_fingerprint',
+                        lambda path: 'changed')
+    assert pool.acquire(VCF_PATH) is not handle